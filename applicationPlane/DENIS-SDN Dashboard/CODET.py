@@ -4,7 +4,8 @@ Is a network administration tool that operates at the SDN Application-layer.
 Its primary responsibility is to ensure the minimum connectivity
 requirements are met within each slice by verifying that every
 node has at least one viable path connecting it to the border
-router.
+router. With several border routers a node is connected when it reaches any
+of them: every function takes tN as one border router or a list of them.
 
 Author: Tryfon Theodorou
 Website: www.theodorou.edu.gr
@@ -25,8 +26,259 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 import queue
+import heapq
+from collections import deque
+import numpy as np
 
+from compact_topology import CompactTopology
+from topology import border_routers
+
+# Compatibility wrapper, the disconnected nodes are found with a single pass
 def run_CODET(G, tN):  # G Graph, tN Target Node
+    return run_CODET_single_pass(G, tN)
+
+# Single traversal out of the border router, O(N+E)
+# With per_slice=True the same pass also returns {slice: [disconnected nodes]},
+# a node of a slice is connected only through nodes of its own slice
+def run_CODET_single_pass(G, tN, per_slice=False):  # G Graph, tN Target Node
+    if isinstance(G, CompactTopology):
+        return run_CODET_compact(G, tN, per_slice)
+
+    targets = set(border_routers(tN))
+    sources = [node for node in targets if node in G]
+    reachable = set(sources)    # nodes with a path to tN over the whole graph
+    s_reachable = set(sources)  # nodes with a path to tN inside their own slice
+
+    q = deque(sources)
+    while q:
+        current = q.popleft()
+        for node in G.neighbors(current):
+            if node not in reachable:
+                reachable.add(node)
+                q.append(node)
+
+    if per_slice:
+        slices = G.nodes(data='slice', default=1)
+        q = deque(sources)
+        while q:
+            current = q.popleft()
+            for node in G.neighbors(current):
+                if node in s_reachable:
+                    continue
+                # The border routers are members of every slice
+                if current in targets or slices[node] == slices[current]:
+                    s_reachable.add(node)
+                    q.append(node)
+
+    dN = [node for node in G if node not in targets and node not in reachable]
+    if not per_slice:
+        return dN
+
+    sN = {}  # disconnected nodes per slice
+    for node, node_slice in G.nodes(data='slice', default=1):
+        if node in targets:
+            continue
+        sN.setdefault(node_slice, [])
+        if node not in s_reachable:
+            sN[node_slice].append(node)
+    return dN, sN
+
+# Vectorized CODET on a CompactTopology, BFS frontiers over the CSR adjacency
+def run_CODET_compact(T, tN, per_slice=False):  # T CompactTopology, tN Target Node
+    targets = set(border_routers(tN))
+    others = np.array([node not in targets for node in T.ids], dtype=bool)
+    ids = T.ids
+    dN = [ids[row] for row in np.nonzero(others & ~T.reachable(tN))[0].tolist()]
+    if not per_slice:
+        return dN
+
+    sN = {}  # disconnected nodes per slice
+    s_reachable = T.reachable(tN, per_slice=True)
+    values = T.slice_values
+    for code in np.unique(T.slice[others]).tolist():
+        sN[values[code]] = []
+    for row in np.nonzero(others & ~s_reachable)[0].tolist():
+        sN[values[T.slice[row]]].append(ids[row])
+    return dN, sN
+
+# Check every slice on its own induced subgraph, the border router is a member of all slices
+# Returns {slice_id: [disconnected nodes]}, all the slices are checked by the same single pass
+def run_CODET_per_slice(G, tN):  # G Graph, tN Target Node
+    return run_CODET_single_pass(G, tN, per_slice=True)[1]
+
+# Weighted CODET
+# A node that depends on a single weak link is as good as disconnected. Every
+# link gets the quality of a metric (e.g. LQI), a link with no metric does not
+# limit a path. For every node the report has:
+#   quality - quality of the best path to tN, the weakest link of the widest
+#             path (one Dijkstra with a max-heap from tN), None when unknown
+#   paths   - edge-disjoint paths to tN: 0, 1 (a bridge is on every path) or 2 (2 or more)
+# and for the network the bridges and the articulation points (Tarjan).
+# With per_slice=True paths stay inside the slice of the node, like run_CODET_per_slice.
+# With several border routers the paths go to any of them: they all hang from a
+# virtual root with links that do not limit a path and are never bridges.
+def run_CODET_weighted(G, tN, metric='LQI', min_quality=None, per_slice=False):  # G Graph, tN Target Node
+    targets = set(border_routers(tN))
+    adj = quality_adjacency(G, tN, metric, per_slice)
+    root = next(iter(targets)) if len(targets) == 1 else VIRTUAL_ROOT
+    if root == VIRTUAL_ROOT:
+        adj[root] = [(target, INF_QUALITY) for target in targets if target in adj]
+        for target, _ in adj[root]:
+            adj[target].append((root, INF_QUALITY))
+    quality = widest_paths(adj, root)
+    bridges, articulation_points = bridges_and_articulation_points(adj, root)
+    bridges = [(u, v) for u, v in bridges if u != VIRTUAL_ROOT and v != VIRTUAL_ROOT]
+    articulation_points = [node for node in articulation_points if node != VIRTUAL_ROOT]
+
+    # 2 edge-disjoint paths: the nodes of the 2-edge-connected component of tN
+    paths = dict.fromkeys(quality, 1)
+    if root in adj:
+        bridge_set = set(bridges) | set((v, u) for u, v in bridges)
+        paths[root] = 2
+        q = deque([root])
+        while q:
+            current = q.popleft()
+            for node, _ in adj[current]:
+                if paths[node] == 1 and (current, node) not in bridge_set:
+                    paths[node] = 2
+                    q.append(node)
+    targets.add(VIRTUAL_ROOT)
+
+    report = {
+        'quality': {node: (None if q == INF_QUALITY else q) for node, q in quality.items() if node not in targets},
+        'paths': {node: paths.get(node, 0) for node in adj if node not in targets},
+        'bridges': bridges,
+        'articulation_points': articulation_points,
+    }
+    report['disconnected'] = [node for node, n in report['paths'].items() if n == 0]
+    report['single_path'] = [node for node, n in report['paths'].items() if n == 1]
+    report['weak'] = [] if min_quality is None else \
+        [node for node, q in report['quality'].items() if q is not None and q < min_quality]
+
+    if per_slice:
+        # Summary of every slice
+        slices = dict(G.nodes(data='slice', default=1))
+        report['slices'] = {}
+        for node in adj:
+            if node in targets:
+                continue
+            summary = report['slices'].setdefault(slices[node], {'nodes': 0, 'disconnected': [], 'single_path': [],
+                                                                 'weak': [], 'min_quality': None})
+            summary['nodes'] += 1
+            n = report['paths'][node]
+            if n == 0:
+                summary['disconnected'].append(node)
+            elif n == 1:
+                summary['single_path'].append(node)
+            q = report['quality'].get(node)
+            if q is not None:
+                if summary['min_quality'] is None or q < summary['min_quality']:
+                    summary['min_quality'] = q
+                if min_quality is not None and q < min_quality:
+                    summary['weak'].append(node)
+    return report
+
+# Quality of a link with no metric, it does not limit a path
+INF_QUALITY = float('inf')
+
+# Node id of the virtual root of several border routers, not a valid node address
+VIRTUAL_ROOT = "*"
+
+# Adjacency {node: [(neighbor, quality)]}, with per_slice=True only the links
+# inside a slice and the links of the border routers (members of every slice)
+def quality_adjacency(G, tN, metric, per_slice):
+    targets = set(border_routers(tN))
+    if isinstance(G, CompactTopology):
+        rows = np.repeat(np.arange(len(G.ids)), np.diff(G.indptr))
+        cols = G.indices
+        values = G.link_metrics.get(metric)
+        values = np.full(len(cols), np.nan) if values is None else values.astype(float)
+        values = np.where(np.isnan(values), INF_QUALITY, values)
+        keep = np.ones(len(cols), dtype=bool)
+        if per_slice:
+            is_target = np.zeros(len(G.ids), dtype=bool)
+            is_target[[G.index[node] for node in targets if node in G.index]] = True
+            keep = (G.slice[rows] == G.slice[cols]) | is_target[rows] | is_target[cols]
+        adj = {node: [] for node in G.ids}
+        ids = G.ids
+        for u, v, q in zip(rows[keep].tolist(), cols[keep].tolist(), values[keep].tolist()):
+            adj[ids[u]].append((ids[v], q))
+        return adj
+
+    slices = dict(G.nodes(data='slice', default=1)) if per_slice else None
+    adj = {node: [] for node in G}
+    for u, v, q in G.edges(data=metric):
+        if u == v:
+            continue
+        if per_slice and u not in targets and v not in targets and slices[u] != slices[v]:
+            continue
+        try:
+            q = float(q) if q is not None else INF_QUALITY
+        except (TypeError, ValueError):
+            q = INF_QUALITY
+        adj[u].append((v, q))
+        adj[v].append((u, q))
+    return adj
+
+# Widest path from tN to every reachable node: the largest possible weakest link
+# Dijkstra with a max-heap, O(E log N)
+def widest_paths(adj, tN):
+    quality = {}
+    if tN not in adj:
+        return quality
+    heap = [(-INF_QUALITY, tN)]
+    while heap:
+        q, node = heapq.heappop(heap)
+        if node in quality:
+            continue
+        quality[node] = -q
+        for other, link_q in adj[node]:
+            if other not in quality:
+                heapq.heappush(heap, (-min(-q, link_q), other))
+    return quality
+
+# Bridges and articulation points of the component of tN, iterative Tarjan, O(N+E)
+def bridges_and_articulation_points(adj, tN):
+    bridges = []
+    articulation_points = []
+    if tN not in adj:
+        return bridges, articulation_points
+    disc = {tN: 0}
+    low = {tN: 0}
+    root_children = 0
+    stack = [(tN, None, iter(adj[tN]))]
+    while stack:
+        node, parent, neighbors = stack[-1]
+        advanced = False
+        for other, _ in neighbors:
+            if other == parent:
+                continue
+            if other in disc:
+                low[node] = min(low[node], disc[other])
+            else:
+                disc[other] = low[other] = len(disc)
+                stack.append((other, node, iter(adj[other])))
+                advanced = True
+                break
+        if advanced:
+            continue
+        stack.pop()
+        if parent is None:
+            continue
+        low[parent] = min(low[parent], low[node])
+        if low[node] > disc[parent]:
+            bridges.append((parent, node))
+        if parent == tN:
+            root_children += 1
+        elif low[node] >= disc[parent]:
+            articulation_points.append(parent)
+    if root_children > 1:
+        articulation_points.append(tN)
+    return bridges, list(dict.fromkeys(articulation_points))
+
+# Original CODET engine, one BFS from every node towards the target node
+# Kept as a reference for the benchmark
+def run_CODET_per_node(G, tN):  # G Graph, tN Target Node
     dN = [] # disconnected_nodes_list
 
     for node in G:
@@ -49,4 +301,146 @@ def BFS(start, target, visited, G):
             visited.append(current)
             for node in list(G.neighbors(current)):
                 q.put(node)
-    return False
\ No newline at end of file
+    return False
+
+
+# Incremental CODET
+# Keeps the set of nodes reachable from the target nodes up to date while the
+# topology changes. Every change is applied to G and returns the nodes that
+# were (disconnected, reconnected) by it. A BFS forest rooted at the target
+# nodes (tN and the border routers added later) is kept, so deleting a link
+# outside the forest costs nothing and deleting a tree link only searches the
+# subtree that hung from it.
+class IncrementalCODET:
+    def __init__(self, G, tN):  # G Graph, tN Target Node or list of them
+        self.G = G
+        self.targets = set(border_routers(tN))
+        self.tN = border_routers(tN)[0]  # the primary target
+        self.rebuild()
+
+    # Full recomputation of the BFS forest
+    def rebuild(self):
+        self.parent = {}    # BFS tree, node -> parent node
+        self.children = {}  # BFS tree, node -> set of child nodes
+        roots = [target for target in self.targets if target in self.G]
+        for target in roots:
+            self.parent[target] = None
+            self.children[target] = set()
+        self.attach(roots)
+
+    # One more target, e.g. a border router that was announced
+    # Returns the newly reachable nodes
+    def add_target(self, node):
+        if node in self.targets:
+            return []
+        self.targets.add(node)
+        if node not in self.G:
+            return []
+        if node in self.parent:
+            # Already in the tree of another target, it becomes a root
+            self.children[self.parent[node]].discard(node)
+            self.parent[node] = None
+            return []
+        self.parent[node] = None
+        self.children[node] = set()
+        return self.attach([node])
+
+    # Nodes with no path to any target node
+    def disconnected(self):
+        return [node for node in self.G if node not in self.targets and node not in self.parent]
+
+    # Extend the BFS tree from the given reachable nodes to the unreachable ones
+    # Returns the newly reachable nodes
+    def attach(self, sources):
+        reached = []
+        q = deque(sources)
+        while q:
+            current = q.popleft()
+            for node in self.G.neighbors(current):
+                if node not in self.parent:
+                    self.parent[node] = current
+                    self.children[node] = set()
+                    self.children[current].add(node)
+                    reached.append(node)
+                    q.append(node)
+        return reached
+
+    # Remove the subtrees hanging from the nodes and hang them again from any reachable neighbor
+    # Returns the nodes of the subtrees that are no longer reachable
+    def detach(self, *nodes):
+        subtree = []
+        q = deque(nodes)
+        while q:
+            current = q.popleft()
+            subtree.append(current)
+            q.extend(self.children[current])
+        for current in subtree:
+            del self.parent[current]
+            del self.children[current]
+
+        # Neighbors of the subtree that are still reachable
+        sources = []
+        for current in subtree:
+            if current not in self.G:
+                continue
+            for other in self.G.neighbors(current):
+                if other in self.parent:
+                    sources.append(other)
+        reached = set(self.attach(sources))
+        return [current for current in subtree if current not in reached and current in self.G]
+
+    def add_node(self, node, **attr):
+        new = node not in self.G
+        self.G.add_node(node, **attr)
+        if not new:
+            return [], []
+        if node in self.targets:
+            self.parent[node] = None
+            self.children[node] = set()
+            return [], self.attach([node])
+        return [node], []
+
+    def remove_node(self, node):
+        if node not in self.G:
+            return [], []
+        reachable = node in self.parent
+        self.G.remove_node(node)
+        if not reachable:
+            return [], []
+        if self.parent[node] is None:
+            # A target, its subtrees hang again from the other targets when they can
+            children = self.children.pop(node)
+            del self.parent[node]
+            return self.detach(*children), []
+        self.children[self.parent[node]].discard(node)
+        disconnected = self.detach(node)
+        return disconnected, []
+
+    # The ends of the link that are not in G are added, a target added this way is a root
+    def add_edge(self, u, v, **attr):
+        self.G.add_edge(u, v, **attr)
+        reconnected = []
+        for node in (u, v):
+            if node in self.targets and node not in self.parent:
+                self.parent[node] = None
+                self.children[node] = set()
+                reconnected += self.attach([node])
+        if u in self.parent and v not in self.parent:
+            reconnected += self.attach([u])
+        elif v in self.parent and u not in self.parent:
+            reconnected += self.attach([v])
+        return [], reconnected
+
+    def remove_edge(self, u, v):
+        if not self.G.has_edge(u, v):
+            return [], []
+        self.G.remove_edge(u, v)
+        # Only the removal of a tree link can disconnect nodes
+        if self.parent.get(v, None) == u and v in self.parent:
+            child = v
+        elif self.parent.get(u, None) == v and u in self.parent:
+            child = u
+        else:
+            return [], []
+        self.children[self.parent[child]].discard(child)
+        return self.detach(child), []
@@ -0,0 +1,132 @@
+"""
+CODET Benchmark
+Compares the original CODET engine (one BFS from every node) with the
+single-pass engine on generated dense and ultra-dense topologies.
+
+Usage: python benchmark_CODET.py [--sizes 100 200 500] [--degree 12] [--repeat 3]
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import math
+import random
+import time
+import networkx as nx
+
+from CODET import run_CODET_per_node, run_CODET_single_pass
+
+# Degree distributions of the generated topologies
+DISTRIBUTIONS = ("uniform", "clustered", "scale-free")
+
+# Nodes per hotspot of the clustered topologies, and the nodes spread between them
+CLUSTER_SIZE = 500
+CLUSTER_SPREAD = 0.05
+UNCLUSTERED = 0.2
+
+# Generate a dense topology with node IDs in the "NN.00" format of the controller
+# uniform: nodes placed in the unit square, linked when closer than the radio radius
+# clustered: the same, with most nodes around hotspots, so the degrees vary widely
+# scale-free: preferential attachment, a few hubs with very many neighbors
+def generate_topology(n_nodes, avg_degree, n_slices=4, seed=1, distribution="uniform"):
+    rnd = random.Random(seed)
+    radius = math.sqrt(avg_degree / (math.pi * n_nodes))
+    if distribution == "clustered":
+        hotspots = [(rnd.random(), rnd.random()) for _ in range(max(1, n_nodes // CLUSTER_SIZE))]
+        points = []
+        for _ in range(n_nodes):
+            if rnd.random() < UNCLUSTERED:
+                points.append((rnd.random(), rnd.random()))
+            else:
+                cx, cy = rnd.choice(hotspots)
+                points.append((min(max(rnd.gauss(cx, CLUSTER_SPREAD), 0.0), 0.999999),
+                               min(max(rnd.gauss(cy, CLUSTER_SPREAD), 0.0), 0.999999)))
+    elif distribution == "uniform":
+        points = [(rnd.random(), rnd.random()) for _ in range(n_nodes)]
+    elif distribution != "scale-free":
+        raise ValueError("Unknown degree distribution: " + str(distribution))
+
+    G = nx.Graph()
+    for node in range(n_nodes):
+        node_id = "{:02d}.00".format(node)
+        G.add_node(node_id, desc=node_id, slice=node % n_slices + 1, n_class="Node")
+
+    if distribution == "scale-free":
+        links = nx.barabasi_albert_graph(n_nodes, max(1, min(avg_degree // 2, n_nodes - 1)), seed=seed).edges()
+        G.add_edges_from(("{:02d}.00".format(u), "{:02d}.00".format(v)) for u, v in links)
+        return G
+
+    # Grid buckets of radius size, only the 9 surrounding cells are compared
+    cells = {}
+    for node, (x, y) in enumerate(points):
+        cells.setdefault((int(x / radius), int(y / radius)), []).append(node)
+    r2 = radius * radius
+    for (cx, cy), bucket in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in cells.get((cx + dx, cy + dy), ()):
+                    for node in bucket:
+                        if node < other:
+                            x1, y1 = points[node]
+                            x2, y2 = points[other]
+                            if (x1 - x2) ** 2 + (y1 - y2) ** 2 <= r2:
+                                G.add_edge("{:02d}.00".format(node), "{:02d}.00".format(other))
+    return G
+
+# Best time of a number of runs
+def time_engine(engine, G, tN, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = engine(G, tN)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="CODET engines benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200, 500, 1000])
+    parser.add_argument("--degree", type=int, default=12, help="average node degree")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-per-node", type=int, default=1000,
+                        help="do not run the per-node engine above this number of nodes")
+    args = parser.parse_args()
+
+    print("{:>8} {:>10} {:>14} {:>14} {:>10}".format("nodes", "edges", "per-node (s)", "single (s)", "speedup"))
+    for n_nodes in args.sizes:
+        G = generate_topology(n_nodes, args.degree)
+        tN = "00.00"
+
+        single_time, single_dN = time_engine(run_CODET_single_pass, G, tN, args.repeat)
+        if n_nodes <= args.skip_per_node:
+            per_node_time, per_node_dN = time_engine(run_CODET_per_node, G, tN, 1)
+            if per_node_dN != single_dN:
+                print("Engines disagree on", n_nodes, "nodes")
+            speedup = "{:.1f}x".format(per_node_time / single_time) if single_time else "-"
+            per_node = "{:.4f}".format(per_node_time)
+        else:
+            per_node = "skipped"
+            speedup = "-"
+
+        print("{:>8} {:>10} {:>14} {:>14.4f} {:>10}".format(
+            n_nodes, G.number_of_edges(), per_node, single_time, speedup))
+
+if __name__ == "__main__":
+    main()
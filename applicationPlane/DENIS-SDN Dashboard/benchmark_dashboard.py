@@ -0,0 +1,177 @@
+"""
+Dashboard Benchmark
+End-to-end benchmark of the dashboard core driven by the synthetic controller,
+for every network size:
+  snapshot    time from sending the node-link snapshot to its processing
+  events/s    ingest throughput of the churn events (decode, process, place)
+  process     p99 time of processing one message
+  CODET       per-slice and weighted CODET on a snapshot of the model
+  classifier  full rebuild and classification of the Node Density Classifier
+  frame       first frame and update frame of the renderer (Agg, no window)
+  push        auto partition pushed to the controller until acknowledged
+
+Usage: python benchmark_dashboard.py [--sizes 100 1000 10000] [--degree 12] [--border-routers 1]
+                                     [--distribution uniform] [--events 5000] [--json results.json]
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import json
+import time
+
+from benchmark_CODET import DISTRIBUTIONS
+from dashboard_core import DashboardCore
+from slice_assign import auto_partition
+from synthetic_controller import SyntheticController
+
+# Seconds to wait for the dashboard to process what was sent
+WAIT_TIMEOUT = 600.0
+
+# Processed messages of the core
+def processed(core):
+    stage = core.instruments.stages.get('process')
+    return 0 if stage is None else stage.count
+
+# Poll the core until done() or the timeout, returns the elapsed time or None
+def poll_until(core, done, timeout=WAIT_TIMEOUT):
+    start = time.perf_counter()
+    while not done():
+        if time.perf_counter() - start > timeout:
+            return None
+        core.poll()
+    return time.perf_counter() - start
+
+# Best time of a number of runs
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+# Time of the first frame (artists built) and of an update frame (positions moved)
+def frame_times(core):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from renderer import GraphRenderer
+
+    figure = Figure(figsize=(6, 5))
+    renderer = GraphRenderer(figure, FigureCanvasAgg(figure), fps=1e9)  # no throttling
+    start = time.perf_counter()
+    renderer.draw(core.G, core.pos, core.node_colors)
+    first = time.perf_counter() - start
+    moved = {node: (x + 0.01, y) for node, (x, y) in core.pos.items()}
+    start = time.perf_counter()
+    renderer.draw(core.G, moved, core.node_colors)
+    update = time.perf_counter() - start
+    return first, update
+
+def run_size(n_nodes, args):
+    controller = SyntheticController(n_nodes, args.degree, args.distribution, args.slices, port=args.port, seed=args.seed,
+                                     n_border_routers=args.border_routers)
+    core = DashboardCore(port=args.port, snapshot_path=None)
+    core.controller_link.start()
+    result = {'nodes': n_nodes, 'links': controller.G.number_of_edges()}
+    try:
+        controller.connect()
+
+        # Snapshot and border router announcements
+        controller.send_snapshot()
+        announced = controller.sent
+        result['snapshot'] = poll_until(core, lambda: processed(core) >= controller.sent)
+
+        # Churn events as fast as they can be sent
+        start = time.perf_counter()
+        controller.run(events=args.events)
+        elapsed = poll_until(core, lambda: processed(core) >= controller.sent)
+        events = controller.sent - announced
+        result['events_per_s'] = None if elapsed is None else events / (time.perf_counter() - start)
+        result['process_p99'] = core.instruments.stages['process'].summary()['p99']
+
+        version, snapshot = core.model.snapshot()
+        result['codet'] = best_time(lambda: core.execute_CODET(snapshot), args.repeat)
+
+        classifier = core.density_classifier
+        def classify():
+            classifier.rebuild(core.G)
+            classifier.classify()
+            classifier.neighbors_list()
+        result['classifier'] = best_time(classify, args.repeat)
+        core.node_colors = core.set_node_colors()
+
+        if n_nodes <= args.frame_limit:
+            result['frame'], result['update_frame'] = frame_times(core)
+        else:
+            result['frame'] = result['update_frame'] = None
+
+        # Slice configuration round trip through the synthetic controller
+        assignment, unreachable = auto_partition(snapshot, args.slices, core.model.border_routers())
+        start = time.perf_counter()
+        core.apply_slice_assignment(assignment)
+        core.push_slices("Logically-Sliced")
+        pushed = poll_until(core, lambda: not core.slice_pusher.dirty, timeout=args.push_timeout)
+        result['push'] = None if pushed is None else time.perf_counter() - start
+        result['push_acked'] = controller.slice_updates
+    finally:
+        controller.close()
+        core.controller_link.stop()
+    return result
+
+# Seconds, "-" when not measured
+def seconds(value):
+    return "-" if value is None else "{:.4f}".format(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="DENIS-SDN Dashboard end-to-end benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--degree", type=int, default=12, help="average node degree")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--slices", type=int, default=4)
+    parser.add_argument("--border-routers", type=int, default=1)
+    parser.add_argument("--events", type=int, default=5000, help="churn events sent per size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--frame-limit", type=int, default=20000, help="do not render above this number of nodes")
+    parser.add_argument("--push-timeout", type=float, default=60.0)
+    parser.add_argument("--port", type=int, default=18993, help="feed port of the benchmarked dashboard")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the results to a JSON file")
+    args = parser.parse_args()
+
+    columns = ("nodes", "links", "snapshot (s)", "events/s", "process p99", "CODET (s)", "classifier (s)",
+               "frame (s)", "update (s)", "push (s)")
+    print("{:>8} {:>9} {:>12} {:>10} {:>12} {:>10} {:>14} {:>10} {:>10} {:>10}".format(*columns))
+    results = []
+    for n_nodes in args.sizes:
+        result = run_size(n_nodes, args)
+        results.append(result)
+        print("{:>8} {:>9} {:>12} {:>10} {:>12} {:>10} {:>14} {:>10} {:>10} {:>10}".format(
+            result['nodes'], result['links'], seconds(result['snapshot']),
+            "-" if result['events_per_s'] is None else "{:.0f}".format(result['events_per_s']),
+            seconds(result['process_p99']), seconds(result['codet']), seconds(result['classifier']),
+            seconds(result['frame']), seconds(result['update_frame']), seconds(result['push'])))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'arguments': vars(args), 'results': results}, f, indent=1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+CODET scheduler
+Runs the Connectivity Detector in a worker thread on a snapshot of the
+topology model. Runs are periodic (every `interval` seconds), triggered by
+topology changes (after `debounce` seconds without further changes) or on
+demand. The thread waits on a condition, so stop, interval changes and
+on-demand runs take effect immediately. Periodic and triggered runs are
+skipped when the graph has not changed since the last check.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+
+# Default period (s) of the periodic runs
+CODET_INTERVAL = 600
+
+# Quiet time (s) after the last topology change before a triggered run
+CODET_DEBOUNCE = 2.0
+
+class CODETScheduler:
+    # model:     TopologyModel, the runs use its snapshots
+    # run:       run(snapshot) -> result, e.g. run_CODET_per_slice
+    # on_result: on_result(result, version, duration, reason), called by the worker thread
+    def __init__(self, model, run, on_result, interval=CODET_INTERVAL, debounce=CODET_DEBOUNCE):
+        self.model = model
+        self.run = run
+        self.on_result = on_result
+        self.interval = interval
+        self.debounce = debounce
+
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.next_run = None        # time of the next periodic run
+        self.triggered_at = None    # time of the last topology change not checked yet
+        self.requested = False      # on-demand run
+        self.checked_version = None # model version of the last check
+        self.thread = None
+
+    def start(self):
+        with self.condition:
+            self.stopping = False
+            if self.thread is not None and self.thread.is_alive():
+                return  # stopped while a check was running, it keeps going
+            self.next_run = time.monotonic() + self.interval
+            self.thread = threading.Thread(target=self.loop, daemon=True)
+            self.thread.start()
+        print("Starting CODET for every", self.interval, "s")
+
+    def stop(self):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        print("Stoping CODET...")
+
+    # New period (s), the next periodic run is counted from now
+    def set_interval(self, interval):
+        with self.condition:
+            self.interval = interval
+            self.next_run = time.monotonic() + interval
+            self.condition.notify()
+        print("CODET refresh time set to", interval, "s")
+
+    # The topology changed, run after `debounce` seconds without changes
+    def trigger(self):
+        with self.condition:
+            self.triggered_at = time.monotonic()
+            self.condition.notify()
+
+    # Run as soon as possible, even if the graph has not changed
+    def run_now(self):
+        with self.condition:
+            self.requested = True
+            self.condition.notify()
+
+    # Reason of the run that is due, or the time to wait for it
+    def due(self, now):
+        if self.requested:
+            return 'on demand', 0
+        wait = self.next_run - now
+        if wait <= 0:
+            return 'periodic', 0
+        if self.triggered_at is not None:
+            trigger_wait = self.triggered_at + self.debounce - now
+            if trigger_wait <= 0:
+                return 'topology change', 0
+            wait = min(wait, trigger_wait)
+        return None, wait
+
+    def loop(self):
+        while True:
+            with self.condition:
+                while True:
+                    if self.stopping:
+                        return
+                    reason, wait = self.due(time.monotonic())
+                    if reason is not None:
+                        break
+                    self.condition.wait(wait)
+
+                forced = self.requested
+                self.requested = False
+                self.triggered_at = None
+                if reason == 'periodic':
+                    self.next_run = time.monotonic() + self.interval
+
+            self.check(reason, forced)
+
+    def check(self, reason, forced):
+        version, snapshot = self.model.snapshot()
+        if not forced and version == self.checked_version:
+            print("CODET skipped (" + reason + "), the graph has not changed")
+            return
+        print("Running CODET (" + reason + ")...")
+        start = time.perf_counter()
+        result = self.run(snapshot)
+        duration = time.perf_counter() - start
+        self.checked_version = version
+        print("CODET took {:.1f} ms".format(duration * 1000))
+        self.on_result(result, version, duration, reason)
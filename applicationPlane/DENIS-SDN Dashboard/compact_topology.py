@@ -0,0 +1,256 @@
+"""
+Compact topology
+Array-backed, read-only store of the network graph for very large networks.
+Nodes are numbered 0..N-1 (rows), the links are kept as a CSR adjacency
+(indptr, indices) and the node attributes as NumPy columns:
+  slice    int32 index in `slice_values`, the slice of the node as it was given
+  n_class  int8  index in `classes`, e.g. "Node", "Border Router"
+  degree   int32 number of neighbors
+and the link metrics (RSS, SSS, LQI) as float32 columns by CSR entry.
+Only the descriptions that differ from the node ID are stored, and the other
+node attributes (e.g. BID, ENG) only for the nodes that have them.
+A CompactTopology is the read-only copy of a large live graph handed to the
+worker threads (CODET, the snapshot store), in place of a full graph copy.
+It has a networkx-compatible read-only view (iteration, `in`, nodes, edges,
+neighbors, degree, has_edge, number_of_nodes), so the existing code paths work
+on it unchanged, and CODET has a vectorized path that uses the arrays directly.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+
+from topology import LINK_METRICS, border_routers
+
+# Networks with at least this many nodes are snapshot as a CompactTopology
+COMPACT_NODES = 5000
+
+# Node attributes kept as columns, the others are kept by node
+COLUMN_ATTRIBUTES = ('desc', 'slice', 'n_class')
+
+# CSR adjacency of an undirected graph from the (E,2) array of its links
+# Self loops and duplicate links are dropped
+# Returns indptr, indices and the link (row of `edges`) of every CSR entry
+def csr_adjacency(n, edges):
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    link = np.nonzero(edges[:, 0] != edges[:, 1])[0]
+    edges, first = np.unique(np.sort(edges[link], axis=1), axis=0, return_index=True)
+    link = link[first]
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32), np.concatenate([link, link])[order]
+
+# Rows of the CSR entries, the source row of every adjacency
+def csr_rows(indptr):
+    return np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+
+# Vectorized BFS over a CSR adjacency, returns the boolean mask of the reached rows
+def csr_reachable(indptr, indices, sources):
+    visited = np.zeros(len(indptr) - 1, dtype=bool)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    visited[frontier] = True
+    while frontier.size:
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            break
+        # Positions of all the adjacencies of the frontier in `indices`
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        reached = indices[offsets]
+        frontier = np.unique(reached[~visited[reached]])
+        visited[frontier] = True
+    return visited
+
+class CompactTopology:
+    def __init__(self, ids, edges, slices=None, classes=None, descs=None, link_metrics=None, attrs=None):
+        # ids: node IDs by row, edges: (E,2) rows of the linked nodes
+        # slices: slice by row, classes: class name by row, descs: {node: desc}
+        # link_metrics: {metric: value by link in the order of edges}, NaN when unknown
+        # attrs: {node: {attribute: value}} of the other node attributes
+        self.ids = list(ids)
+        self.index = {node: row for row, node in enumerate(self.ids)}
+        n = len(self.ids)
+        self.indptr, self.indices, entry_link = csr_adjacency(n, edges)
+        # Link metrics by CSR entry, the same value for both directions of a link
+        self.link_metrics = {metric: np.asarray(values, dtype=np.float32)[entry_link]
+                             for metric, values in (link_metrics or {}).items()}
+        self.degree_column = np.diff(self.indptr).astype(np.int32)
+        if slices is None:
+            self.slice_values = [1]
+            self.slice = np.zeros(n, dtype=np.int32)
+        else:
+            # Equal slices share a code, whatever their type
+            codes = {}
+            self.slice = np.array([codes.setdefault(node_slice, len(codes)) for node_slice in slices], dtype=np.int32)
+            self.slice_values = list(codes)
+        if classes is None:
+            self.classes = ["Node"]
+            self.n_class = np.zeros(n, dtype=np.int8)
+        else:
+            self.classes, codes = np.unique(np.asarray(classes, dtype=object).astype(str), return_inverse=True)
+            self.classes = [str(name) for name in self.classes]
+            self.n_class = codes.astype(np.int8)
+        self.descs = {node: desc for node, desc in (descs or {}).items() if desc != node}
+        self.attrs = {node: dict(attr) for node, attr in (attrs or {}).items() if attr}
+
+    @classmethod
+    def from_graph(cls, G):
+        ids = list(G)
+        index = {node: row for row, node in enumerate(ids)}
+        edges = np.fromiter((index[node] for edge in G.edges() for node in edge),
+                            dtype=np.int64, count=2 * G.number_of_edges())
+        attrs = [G.nodes[node] for node in ids]
+        link_attrs = [attr for _, _, attr in G.edges(data=True)]
+        link_metrics = {metric: [attr.get(metric, np.nan) for attr in link_attrs] for metric in LINK_METRICS
+                        if any(metric in attr for attr in link_attrs)}
+        return cls(ids, edges,
+                   slices=[attr.get('slice', 1) for attr in attrs],
+                   classes=[attr.get('n_class', "Node") for attr in attrs],
+                   descs={node: attr['desc'] for node, attr in zip(ids, attrs) if 'desc' in attr},
+                   link_metrics=link_metrics,
+                   attrs={node: {key: value for key, value in attr.items() if key not in COLUMN_ATTRIBUTES}
+                          for node, attr in zip(ids, attrs)})
+
+    def attributes(self, row):
+        node = self.ids[row]
+        return dict(self.attrs.get(node, {}), desc=self.descs.get(node, node),
+                    slice=self.slice_values[self.slice[row]], n_class=self.classes[self.n_class[row]])
+
+    # Slice of every row
+    def slices(self):
+        values = self.slice_values
+        return [values[code] for code in self.slice.tolist()]
+
+    # (E,2) array of the linked rows, every link once
+    def edge_array(self):
+        rows = csr_rows(self.indptr)
+        keep = rows < self.indices
+        return np.stack([rows[keep], self.indices[keep]], axis=1)
+
+    # Rows linked to a row
+    def neighbor_rows(self, row):
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    # Rows reachable from tN (one border router or a list), over all the links or,
+    # with per_slice=True, over the links inside a slice (the border routers are
+    # members of every slice)
+    def reachable(self, tN, per_slice=False):
+        targets = [self.index[node] for node in border_routers(tN) if node in self.index]
+        if not targets:
+            return np.zeros(len(self.ids), dtype=bool)
+        if not per_slice:
+            return csr_reachable(self.indptr, self.indices, targets)
+        rows = csr_rows(self.indptr)
+        is_target = np.zeros(len(self.ids), dtype=bool)
+        is_target[targets] = True
+        keep = (self.slice[rows] == self.slice[self.indices]) | is_target[rows] | is_target[self.indices]
+        indptr = np.zeros_like(self.indptr)
+        np.cumsum(np.bincount(rows[keep], minlength=len(self.ids)), out=indptr[1:])
+        return csr_reachable(indptr, self.indices[keep], targets)
+
+    # networkx-compatible read-only view
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def number_of_nodes(self):
+        return len(self.ids)
+
+    def number_of_edges(self):
+        return len(self.indices) // 2
+
+    def neighbors(self, node):
+        ids = self.ids
+        return iter([ids[row] for row in self.neighbor_rows(self.index[node]).tolist()])
+
+    def has_edge(self, u, v):
+        if u not in self.index or v not in self.index:
+            return False
+        return bool(np.any(self.neighbor_rows(self.index[u]) == self.index[v]))
+
+    def edges(self):
+        ids = self.ids
+        return [(ids[u], ids[v]) for u, v in self.edge_array().tolist()]
+
+    @property
+    def nodes(self):
+        return NodeView(self)
+
+    @property
+    def degree(self):
+        return DegreeView(self)
+
+class NodeView:
+    def __init__(self, topology):
+        self.topology = topology
+
+    def __iter__(self):
+        return iter(self.topology.ids)
+
+    def __len__(self):
+        return len(self.topology.ids)
+
+    def __contains__(self, node):
+        return node in self.topology.index
+
+    # Attributes of a node, a copy
+    def __getitem__(self, node):
+        return self.topology.attributes(self.topology.index[node])
+
+    def __call__(self, data=False, default=None):
+        topology = self.topology
+        if data is False:
+            return iter(topology.ids)
+        if data is True:
+            return ((node, topology.attributes(row)) for row, node in enumerate(topology.ids))
+        if data == 'slice':
+            return zip(topology.ids, topology.slices())
+        if data == 'n_class':
+            return zip(topology.ids, [topology.classes[code] for code in topology.n_class.tolist()])
+        if data == 'desc':
+            return ((node, topology.descs.get(node, node)) for node in topology.ids)
+        return ((node, topology.attrs.get(node, {}).get(data, default)) for node in topology.ids)
+
+class DegreeView:
+    def __init__(self, topology):
+        self.topology = topology
+
+    def __getitem__(self, node):
+        return int(self.topology.degree_column[self.topology.index[node]])
+
+    def __iter__(self):
+        return zip(self.topology.ids, self.topology.degree_column.tolist())
+
+    def __call__(self, nbunch=None):
+        if nbunch is None:
+            return iter(self)
+        try:
+            if nbunch in self.topology.index:
+                return self[nbunch]
+        except TypeError:
+            pass  # a list of nodes
+        return ((node, self[node]) for node in nbunch)
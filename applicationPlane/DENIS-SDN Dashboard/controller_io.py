@@ -0,0 +1,208 @@
+"""
+Controller I/O
+Asyncio networking core of the DENIS-SDN Dashboard. It runs its own event loop
+in a background thread and:
+  - accepts any number of controller and border-router feeds on the dashboard
+    port, every feed is split in JSON messages by its own JSONStreamDecoder
+  - hands the messages to the GUI through the thread-safe queue `updates`
+    as (peer, message) tuples
+  - sends the slice commands over one persistent channel: the most recent
+    controller feed, or an outbound connection to the controller that is
+    opened on demand and reopened when it breaks
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import queue
+import threading
+
+from ingest import JSONStreamDecoder
+
+# Outbound connection attempts before a slice command is dropped
+SEND_RETRIES = 5
+
+class ControllerLink:
+    def __init__(self, host='localhost', port=8993, controller=('localhost', 8993), framing="auto", instruments=None):
+        self.host = host
+        self.port = port
+        self.controller = controller  # (host, port) of the outbound channel
+        self.framing = framing
+        self.updates = queue.Queue()  # (peer, message) for the GUI
+        self.loop = None
+        self.thread = None
+        self.stopped = None
+        self.feeds = {}        # peer -> StreamWriter of the connected feeds
+        self.outbound = None   # StreamWriter of the outbound channel
+        self.send_lock = None
+        self.instruments = instruments  # ingest time and message sizes, optional
+
+    # Start the event loop thread
+    def start(self):
+        if self.thread is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Stop the event loop thread, closes every connection
+    # Can be called again after the link stopped, e.g. Stop and then closing the window
+    def stop(self):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            self.loop = None
+            self.stopped = None
+            self.thread = None
+            return
+        if self.stopped is not None:
+            try:
+                loop.call_soon_threadsafe(self.stopped.set)
+            except RuntimeError:
+                pass  # the loop closed in the meantime
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=5)
+        self.thread = None
+        self.loop = None
+        self.stopped = None
+
+    def run(self):
+        loop = self.loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self.serve())
+        finally:
+            loop.close()
+            print("Closing Communication thread with DENIS-SDN Controller...")
+
+    async def serve(self):
+        self.stopped = asyncio.Event()
+        self.send_lock = asyncio.Lock()
+        server = await asyncio.start_server(self.handle_feed, self.host, self.port)
+        print(f"Listening for JSON messages on port {self.port}...")
+
+        async with server:
+            await self.stopped.wait()
+
+        for writer in list(self.feeds.values()):
+            writer.close()
+        if self.outbound is not None:
+            self.outbound.close()
+
+        # Finish the feed readers and the pending slice commands
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # A controller or border-router feed
+    async def handle_feed(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        print('Connected:', peer)
+        self.feeds[peer] = writer
+        decoder = JSONStreamDecoder(self.framing)
+        try:
+            while not self.stopped.is_set():
+                data = await reader.read(65536)
+                if not data:
+                    break
+                if self.instruments is None:
+                    messages = decoder.feed(data)
+                else:
+                    with self.instruments.timer('ingest'):
+                        messages = decoder.feed(data)
+                    self.instruments.count('bytes', len(data))
+                    self.instruments.count('messages', len(messages))
+                    for size in decoder.sizes:
+                        self.instruments.sample('msg bytes', size)
+                for message in messages:
+                    self.updates.put((peer, message))
+        except ConnectionError as e:
+            print('Connection lost:', peer, e)
+        except asyncio.CancelledError:
+            pass  # the dashboard stops while the feed is connected
+        finally:
+            self.feeds.pop(peer, None)
+            writer.close()
+            print('Disconnected:', peer)
+
+    # Send a message to the controller, can be called from any thread
+    # Returns a concurrent.futures.Future with True when the message was sent
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        if self.loop is None or not self.loop.is_running():
+            print("DENIS-SDN Dashboard is not started, message not sent")
+            return None
+        return asyncio.run_coroutine_threadsafe(self.send_async(data), self.loop)
+
+    async def send_async(self, data):
+        async with self.send_lock:
+            delay = 0.5
+            for attempt in range(SEND_RETRIES):
+                writer = await self.channel()
+                if writer is not None:
+                    try:
+                        writer.write(data)
+                        await writer.drain()
+                        if self.instruments is not None:
+                            self.instruments.count('sent messages')
+                        return True
+                    except ConnectionError as e:
+                        print("Slice channel lost:", e)
+                        if writer is self.outbound:
+                            self.outbound = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5)
+            print("Connection refused. Make sure the server is running and the port is correct.")
+            return False
+
+    # The persistent channel for the slice commands
+    async def channel(self):
+        # Reuse the connection of the most recent controller feed
+        for writer in reversed(list(self.feeds.values())):
+            if not writer.is_closing():
+                return writer
+        if self.outbound is not None and not self.outbound.is_closing():
+            return self.outbound
+        if tuple(self.controller) == (self.host, self.port):
+            # The controller has to connect first, the dashboard does not talk to itself
+            return None
+        try:
+            reader, self.outbound = await asyncio.open_connection(*self.controller)
+        except OSError:
+            self.outbound = None
+            return None
+        asyncio.ensure_future(self.read_channel(reader, self.outbound))
+        return self.outbound
+
+    # Replies of the controller on the outbound channel
+    async def read_channel(self, reader, writer):
+        decoder = JSONStreamDecoder(self.framing)
+        try:
+            while not self.stopped.is_set():
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for message in decoder.feed(data):
+                    self.updates.put((self.controller, message))
+        except ConnectionError:
+            pass
+        finally:
+            if self.outbound is writer:
+                self.outbound = None
+            writer.close()
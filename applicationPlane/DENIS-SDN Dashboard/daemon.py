@@ -0,0 +1,249 @@
+"""
+DENIS-SDN Dashboard daemon
+Runs the DashboardCore without a window and serves its results as JSON over a
+local HTTP API, on a TCP port or a Unix socket, so one backend process can
+serve many viewers:
+  GET  /status                        version, nodes, links, disconnected nodes
+  GET  /topology                      nodes (slice, class, color, position) and links
+  GET  /codet                         disconnected nodes and the last CODET report
+  GET  /density                       Node Density Classifier list
+  GET  /regions                       the region of every border router (BID)
+  GET  /slices                        slice of every node and the edits not pushed yet
+  GET  /metrics/link?u=&v=&field=     time series of a link metric (since=, max_points=)
+  GET  /metrics/node?node=&field=     time series of a node metric
+  GET  /metrics/degrading?field=&drop= links whose metric fell by more than drop, worst first
+  GET  /instrumentation               latency of the stages, message sizes, queue depth, rates
+  POST /slices                        {"assignment": {node: slice}} or {"rule": .., "value": .., "slice": ..}
+  POST /slices/push                   {"type": "Logically-Sliced"} sends the edits to the controller
+  POST /codet/run                     runs CODET now
+  POST /profiler                      {"path": "poll.prof"} switches the profiler of the poll loop on or off
+The requests are served by the threads of the HTTP server, but the core is
+changed and read only by the poll loop: the handlers queue their work to it.
+The JSON of the GET requests is cached until the next change of the core, so
+many viewers polling the same state cost one serialization.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import queue
+import socketserver
+import stat
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Period (s) of the poll loop when there is nothing to do
+POLL_INTERVAL = 0.05
+
+# Time (s) a request waits for the poll loop
+REQUEST_TIMEOUT = 10.0
+
+# HTTP server on a Unix socket
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class DashboardDaemon:
+    # Serves on host:port, or on the Unix socket at unix_socket when it is given
+    def __init__(self, core, host='127.0.0.1', port=8080, unix_socket=None):
+        self.core = core
+        self.commands = queue.Queue()  # (function, args, future) run by the poll loop
+        self.generation = 0            # changes of the core, the key of the cached JSON
+        self.cache = {}                # path -> (generation, body)
+        self.stop_flag = threading.Event()
+        if unix_socket is not None:
+            # Only a stale socket of an earlier run is removed, never another file
+            if os.path.lexists(unix_socket):
+                if not stat.S_ISSOCK(os.lstat(unix_socket).st_mode):
+                    raise FileExistsError(unix_socket + " exists and is not a socket")
+                os.remove(unix_socket)
+            self.server = UnixHTTPServer(unix_socket, RequestHandler)
+            self.address = unix_socket
+        else:
+            self.server = ThreadingHTTPServer((host, port), RequestHandler)
+            self.address = "http://{}:{}".format(*self.server.server_address[:2])
+        self.server.dashboard = self
+
+    # Run until stop() or Ctrl+C
+    def run(self):
+        self.core.load_snapshot()
+        self.core.start()
+        server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        server_thread.start()
+        print("DENIS-SDN Dashboard daemon serving on", self.address)
+        try:
+            while not self.stop_flag.is_set():
+                # Every change of the model counts, also the link metrics that change no view flag
+                version = self.core.model.version
+                updates = self.core.poll()
+                if any(updates.values()) or self.core.model.version != version:
+                    self.generation += 1
+                if not self.run_commands():
+                    time.sleep(POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+        self.server.shutdown()
+        self.server.server_close()
+        self.core.close()
+
+    def stop(self):
+        self.stop_flag.set()
+
+    # Run the queued requests, returns True when there were any
+    def run_commands(self):
+        ran = False
+        while True:
+            try:
+                function, args, future = self.commands.get_nowait()
+            except queue.Empty:
+                return ran
+            ran = True
+            try:
+                future.set_result(function(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    # Run a function in the poll loop and wait for its result, called by the request threads
+    def call(self, function, *args):
+        future = Future()
+        self.commands.put((function, args, future))
+        return future.result(timeout=REQUEST_TIMEOUT)
+
+    # JSON of a GET request, cached until the core changes
+    def cached(self, path, function):
+        generation = self.generation
+        entry = self.cache.get(path)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+        body = json.dumps(self.call(function)).encode()
+        self.cache[path] = (generation, body)
+        return body
+
+    def slices(self):
+        return {'slices': dict(self.core.G.nodes(data='slice', default=1)),
+                'pending': dict(self.core.slice_pusher.dirty)}
+
+    # Time series of a link or node metric
+    def metrics(self, kind, query):
+        store = self.core.model.metrics
+        since = float(query['since']) if 'since' in query else None
+        max_points = int(query['max_points']) if 'max_points' in query else None
+        if kind == 'link':
+            times, values = store.link_series(query['u'], query['v'], query.get('field', 'LQI'), since, max_points)
+        else:
+            times, values = store.node_series(query['node'], query.get('field', 'ENG'), since, max_points)
+        return {'time': times.tolist(), 'values': [None if v != v else v for v in values.tolist()]}
+
+    # Links whose recent mean of a metric fell by more than drop below their earlier mean
+    def degrading_links(self, query):
+        links = self.core.model.metrics.degrading_links(query.get('field', 'LQI'), float(query.get('drop', 10.0)))
+        return [{'source': u, 'target': v, 'earlier': earlier, 'recent': recent} for (u, v), earlier, recent in links]
+
+    # Slice assignment by nodes or by a rule, marked for the next push
+    def assign_slices(self, request):
+        if 'assignment' in request:
+            assignment = {node: int(slice_no) for node, slice_no in request['assignment'].items()}
+            self.core.apply_slice_assignment(assignment)
+        else:
+            assignment = self.core.bulk_assignment(request['rule'], str(request.get('value', '')).strip(), int(request['slice']))
+        self.generation += 1
+        return {'assigned': None if assignment is None else len(assignment)}
+
+    def push_slices(self, request):
+        self.core.push_slices(request.get('type', "Logically-Sliced"))
+        self.generation += 1
+        return {'pending': len(self.core.slice_pusher.dirty)}
+
+    def run_CODET_now(self, request):
+        self.core.run_CODET_now()
+        return {'started': True}
+
+    # The report of the profile when it stops
+    def toggle_profiler(self, request):
+        report = self.core.toggle_profiler(request.get('path'))
+        return {'profiling': report is None, 'report': report}
+
+class RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        dashboard = self.server.dashboard
+        core = dashboard.core
+        url = urlparse(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        routes = {
+            '/status': core.status,
+            '/topology': core.topology,
+            '/codet': core.connectivity,
+            '/density': core.density,
+            '/regions': core.regions,
+            '/slices': dashboard.slices,
+        }
+        try:
+            if url.path in routes:
+                self.reply(200, dashboard.cached(url.path, routes[url.path]))
+            elif url.path == '/instrumentation':
+                self.reply(200, json.dumps(core.instruments.summary()).encode())
+            elif url.path in ('/metrics/link', '/metrics/node'):
+                result = dashboard.call(dashboard.metrics, url.path.rsplit('/', 1)[1], query)
+                self.reply(200, json.dumps(result).encode())
+            elif url.path == '/metrics/degrading':
+                self.reply(200, json.dumps(dashboard.call(dashboard.degrading_links, query)).encode())
+            else:
+                self.error(404, "unknown path " + url.path)
+        except (KeyError, ValueError) as e:
+            self.error(400, "bad request: " + str(e))
+
+    def do_POST(self):
+        dashboard = self.server.dashboard
+        routes = {
+            '/slices': dashboard.assign_slices,
+            '/slices/push': dashboard.push_slices,
+            '/codet/run': dashboard.run_CODET_now,
+            '/profiler': dashboard.toggle_profiler,
+        }
+        path = urlparse(self.path).path
+        if path not in routes:
+            self.error(404, "unknown path " + path)
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            result = dashboard.call(routes[path], request)
+            self.reply(200, json.dumps(result).encode())
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            self.error(400, "bad request: " + str(e))
+
+    def reply(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def error(self, status, message):
+        self.reply(status, json.dumps({'error': message}).encode())
+
+    # Unix socket clients have no address
+    def address_string(self):
+        return self.client_address[0] if self.client_address else "unix"
+
+    # The requests are not logged, viewers poll often
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,432 @@
+"""
+DENIS-SDN Dashboard core
+The processing of the dashboard without any user interface: the controller
+link, the topology model, the layout, the Node Density Classifier, CODET, the
+slice assignment and push, the regions of the border routers and the snapshot
+of the dashboard. It imports
+neither tkinter nor matplotlib, so it runs on servers without a display; the
+Tk dashboard (gui.py) and the headless daemon (daemon.py) are two front ends
+of the same core.
+All the changes go through one thread, the thread that calls poll() (the
+tkinter main loop, or the loop of the daemon). The worker threads post their
+results to `results`, and poll() applies them.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import queue
+import threading
+import time
+
+from controller_io import ControllerLink
+from slice_push import SlicePusher
+from model import TopologyModel
+from link_metrics import MetricsStore
+from snapshot_store import SnapshotWriter, load_snapshot_async
+from density_classifier import DensityClassifier
+from layout import GraphLayout
+from slice_assign import assign, auto_partition, select_by_class, select_by_color, select_by_id_range, slice_sizes
+from CODET import run_CODET_per_slice, run_CODET_weighted
+from codet_scheduler import CODETScheduler
+from federation import region_density, region_members, run_CODET_regions
+from instrumentation import Instruments
+
+# Time (s) poll may spend on a burst of messages
+UPDATES_BUDGET = 0.03
+
+# Links with a lower LQI are weak, a node behind them is reported
+WEAK_LINK_QUALITY = 70
+
+# Default period (min) of the CODET checks
+CODET_REFRESH_TIME = 10
+
+# Snapshot of the dashboard, saved every SNAPSHOT_INTERVAL s when it changed
+SNAPSHOT_PATH = "dashboard_snapshot.npz"
+SNAPSHOT_INTERVAL = 30
+
+# The instrumentation summary is written every INSTRUMENTATION_INTERVAL s
+INSTRUMENTATION_INTERVAL = 10
+
+# Densest nodes of every region in the regions view
+DENSITY_TOP = 10
+
+class DashboardCore:
+    def __init__(self, tN="00.00", host='localhost', port=8993, metrics_path=None, snapshot_path=SNAPSHOT_PATH,
+                 instrumentation_path=None):
+        self.tN = tN  # Target Node, the first border router
+
+        # Latency of the stages, message sizes, queue depth and redraw rate
+        self.instruments = Instruments()
+        self.instrumentation_path = instrumentation_path  # JSON file of the summary, optional
+        self.last_export = time.monotonic()
+
+        # Controller and border router feeds, and the channel for the slice commands
+        self.controller_link = ControllerLink(host, port, instruments=self.instruments)
+
+        # The link and node metrics of the NB messages are kept in the metrics store
+        self.model = TopologyModel(tN, metrics=MetricsStore(metrics_path))
+        self.G = self.model.G
+
+        # Positions of the Graph nodes, kept stable between updates
+        self.layout = GraphLayout()
+        self.pos = self.layout.pos
+        self.positions_changed = False  # nodes moved since the last snapshot
+
+        # Node degrees of the Node Density Classifier, updated with every topology message
+        self.density_classifier = DensityClassifier(self.G)
+        self.neighbors = []    # (node, degree, color) sorted from the node with most neighbors
+        self.node_colors = {}
+
+        # Changed slice assignments for the controller
+        self.slice_pusher = SlicePusher(self.controller_link)
+
+        # Results of the worker threads, as (kind, result)
+        self.results = queue.Queue()
+
+        # Periodic, topology triggered and on-demand CODET runs
+        self.codet_scheduler = CODETScheduler(self.model, self.execute_CODET, self.post_CODET_result,
+                                              interval=CODET_REFRESH_TIME * 60)
+        self.codet = None                # (SDN, report, duration) of the last CODET run
+        self.codet_disconnected = set()  # disconnected nodes of the last CODET run
+
+        self.snapshot_writer = SnapshotWriter(snapshot_path) if snapshot_path else None
+        self.snapshot_path = snapshot_path
+        self.saved_version = self.model.version
+        self.last_save = time.monotonic()
+
+    # Start the controller link and CODET
+    def start(self):
+        self.controller_link.start()
+        self.codet_scheduler.start()
+
+    def stop(self):
+        self.controller_link.stop()
+        self.codet_scheduler.stop()
+
+    # Stop, and save the metrics and the snapshot
+    def close(self):
+        self.stop()
+        self.model.metrics.flush()
+        self.save_snapshot(wait=True)
+        self.export_instrumentation()
+
+    # Apply the messages of the controller link and the results of the worker threads
+    # Returns what changed: topology (nodes or links), nodes (slice configurator rows),
+    # connectivity (nodes disconnected or reconnected), codet (a new CODET result),
+    # positions (nodes placed, moved or removed), redraw (positions or colors),
+    # slices (slice configuration batches acknowledged or dropped)
+    def poll(self, budget=UPDATES_BUDGET):
+        updates = {'topology': False, 'nodes': False, 'connectivity': False, 'codet': False, 'positions': False,
+                   'redraw': False, 'slices': False}
+        start = time.perf_counter()
+        deadline = start + budget
+        instruments = self.instruments
+        instruments.gauge('queue', self.controller_link.updates.qsize())
+
+        # Messages of the controller and border router feeds
+        while time.perf_counter() < deadline:
+            try:
+                peer, message = self.controller_link.updates.get_nowait()
+            except queue.Empty:
+                break
+
+            # A malformed message is dropped, it never stops the update loop
+            try:
+                # Acknowledgements of the slice configuration
+                if self.slice_pusher.ack(message):
+                    updates['slices'] = True
+                    continue
+
+                self.apply_message(message, updates)
+            except Exception as e:
+                print("JSON message from", peer, "dropped:", repr(e))
+                instruments.count('bad messages')
+
+        # Resend the slice configuration batches that were not acknowledged
+        if self.slice_pusher.poll():
+            updates['slices'] = True
+
+        # Results of the worker threads
+        while True:
+            try:
+                kind, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'codet':
+                self.codet = result
+                SDN = result[0]
+                self.codet_disconnected = set(node for slice_DN in SDN.values() for node in slice_DN)
+                updates['codet'] = True
+                updates['redraw'] = True
+            elif kind == 'slices':
+                self.apply_slice_assignment(result)
+                updates['nodes'] = True
+            elif kind == 'restore':
+                self.restore_snapshot(result, updates)
+
+        if updates['topology']:
+            self.codet_scheduler.trigger()
+            with instruments.timer('classifier'):
+                self.density_classifier.classify()
+                self.neighbors = self.density_classifier.neighbors_list()
+            updates['redraw'] = True
+
+        # Positions of a finished background layout, or a few more layout iterations
+        layout_start = time.perf_counter()
+        if self.layout.collect() or self.layout.run(self.G):
+            instruments.record('layout', time.perf_counter() - layout_start)
+            self.positions_changed = True
+            updates['positions'] = True
+            updates['redraw'] = True
+
+        if updates['redraw']:
+            self.node_colors = self.set_node_colors()
+
+        if any(updates.values()):
+            instruments.record('poll', time.perf_counter() - start)
+        now = time.monotonic()
+        if now - self.last_save >= SNAPSHOT_INTERVAL:
+            self.save_snapshot()
+        if now - self.last_export >= INSTRUMENTATION_INTERVAL:
+            self.export_instrumentation()
+        return updates
+
+    # Apply a topology snapshot or event to the graph, the layout and the classifier
+    def apply_message(self, message, updates):
+        with self.instruments.timer('process'):
+            changes = self.model.apply(message)
+
+        # Place the new nodes, the rest of the graph keeps its positions
+        with self.instruments.timer('place'):
+            self.layout.apply_changes(self.G, changes)
+            self.density_classifier.apply_changes(self.G, changes)
+
+        if changes['snapshot'] or changes['added_nodes'] or changes['removed_nodes'] or changes['added_links'] or changes['removed_links']:
+            updates['topology'] = True
+        if changes['snapshot'] or changes['added_nodes'] or changes['removed_nodes'] or changes['updated_nodes']:
+            updates['nodes'] = True
+        if changes['snapshot'] or changes['added_nodes'] or changes['removed_nodes']:
+            updates['positions'] = True
+        if changes['disconnected'] or changes['reconnected']:
+            updates['connectivity'] = True
+        if changes['miss_routes']:
+            self.instruments.count('miss routes', len(changes['miss_routes']))
+        return changes
+
+    # Colors of the Graph nodes, the nodes found disconnected by the last CODET run are gray
+    def set_node_colors(self):
+        node_colors = self.density_classifier.node_colors()
+        for node in self.codet_disconnected:
+            if node in node_colors:
+                node_colors[node] = 'gray'
+        return node_colors
+
+    # Connectivity Detector CODET
+    # #######################################################
+    # CODET runs on a consistent copy of the graph, in the scheduler thread
+    # The weighted CODET adds the best path quality and the redundancy of every node
+    # A node is connected when it reaches any border router; every region is also
+    # checked towards its own border router
+    def execute_CODET(self, snapshot):
+        border_routers = self.model.border_routers()
+        SDN = run_CODET_per_slice(snapshot, border_routers)
+        report = run_CODET_weighted(snapshot, border_routers, metric='LQI', min_quality=WEAK_LINK_QUALITY, per_slice=True)
+        report['regions'] = run_CODET_regions(snapshot, self.model.regions())
+        return SDN, report
+
+    # The result is applied by poll
+    def post_CODET_result(self, result, version, duration, reason):
+        SDN, report = result
+        self.instruments.record('codet', duration)
+        self.results.put(('codet', (SDN, report, duration)))
+
+    def run_CODET_now(self):
+        self.codet_scheduler.run_now()
+
+    # New period (min) of the CODET checks
+    def set_CODET_refresh_time(self, minutes):
+        self.codet_scheduler.set_interval(minutes * 60)
+
+    # Slices
+    # #######################################################
+    # Change the slice of a node
+    def set_slice(self, node, slice_no):
+        self.model.set_slice(node, slice_no)
+        self.slice_pusher.mark(node, slice_no)
+
+    # Apply an assignment node -> slice to the graph and mark it for the controller
+    def apply_slice_assignment(self, assignment):
+        print("Slice assignment of", len(assignment), "node(s):", slice_sizes(assignment))
+        self.model.set_slices(assignment)
+        for node, slice_no in assignment.items():
+            if node in self.G:
+                self.slice_pusher.mark(node, slice_no)
+
+    # Bulk slice assignment by a rule, or an automatic balanced partition
+    # Class: a node class, ID range: first-last, Color: density colors separated by commas,
+    # Auto: slice_no is the number of slices
+    # Returns the assignment, or None when it runs in the background (Auto) or the rule is wrong
+    def bulk_assignment(self, rule, value, slice_no):
+        if rule == "Auto":
+            # Runs on a snapshot, the result is applied by poll
+            version, snapshot = self.model.snapshot()
+            border_routers = self.model.border_routers()
+            def work():
+                assignment, unreachable = auto_partition(snapshot, slice_no, border_routers)
+                if unreachable:
+                    print("Not connected to any border router, not assigned:", unreachable)
+                self.results.put(('slices', assignment))
+            threading.Thread(target=work, daemon=True).start()
+            return None
+
+        if rule == "Class":
+            nodes = select_by_class(self.G, value)
+        elif rule == "ID range":
+            try:
+                first, last = value.split('-')
+            except ValueError:
+                print("ID range must be first-last, e.g. 02.00-10.00")
+                return None
+            nodes = select_by_id_range(self.G, first.strip(), last.strip())
+        elif rule == "Color":
+            nodes = select_by_color(self.node_colors, [color.strip() for color in value.split(',')])
+        else:
+            print("Unknown slice assignment rule:", rule)
+            return None
+        assignment = assign(nodes, slice_no, self.model.border_routers())
+        self.apply_slice_assignment(assignment)
+        return assignment
+
+    # Send the changed slice assignments to the controller
+    def push_slices(self, slice_type):
+        return self.slice_pusher.push(self.G, slice_type)
+
+    # Snapshot of the dashboard
+    # #######################################################
+    # Save the topology, the positions, the slice edits and the CODET result when they changed
+    def save_snapshot(self, wait=False):
+        self.last_save = time.monotonic()
+        if self.snapshot_writer is None:
+            return
+        if self.model.version == self.saved_version and not self.positions_changed:
+            return
+        version, snapshot = self.model.snapshot()
+        state = (snapshot, dict(self.pos), set(self.layout.pinned), set(self.slice_pusher.dirty),
+                 set(self.codet_disconnected))
+        if wait:
+            self.snapshot_writer.save(*state)
+        elif not self.snapshot_writer.save_async(*state):
+            return  # the previous save is still running, try again later
+        self.saved_version = version
+        self.positions_changed = False
+
+    # Read the last snapshot in the background, poll shows it
+    def load_snapshot(self):
+        if self.snapshot_path:
+            return load_snapshot_async(self.snapshot_path, lambda snapshot: self.results.put(('restore', snapshot)))
+        return None
+
+    # Show the last saved topology until the controller sends its own
+    def restore_snapshot(self, snapshot, updates):
+        print("Restoring the snapshot of", time.ctime(snapshot['saved']))
+        # Known positions first, so the nodes are not placed again
+        for node, xy in snapshot['pos'].items():
+            self.pos.setdefault(node, xy)
+        if self.G.number_of_nodes() == 0:
+            self.apply_message(snapshot['message'], updates)
+        for node in snapshot['pinned']:
+            if node in self.pos:
+                self.layout.pin(node, self.pos[node])
+        for node, slice_no in snapshot['dirty'].items():
+            if node in self.G:
+                self.slice_pusher.mark(node, slice_no)
+        self.codet_disconnected = set(node for node in snapshot['disconnected'] if node in self.G)
+        updates['positions'] = True
+        updates['redraw'] = True
+
+    # Instrumentation
+    # #######################################################
+    def export_instrumentation(self):
+        self.last_export = time.monotonic()
+        if self.instrumentation_path is None:
+            return
+        try:
+            self.instruments.export(self.instrumentation_path)
+        except OSError as e:
+            print("Instrumentation", self.instrumentation_path, "cannot be written:", e)
+
+    # Switch the profiler of the calling thread on or off
+    # Returns None when it starts, the report of the profile when it stops
+    def toggle_profiler(self, path=None):
+        return self.instruments.toggle_profiler(path)
+
+    # Machine-readable state, plain JSON types
+    # #######################################################
+    def status(self):
+        return {
+            'version': self.model.version,
+            'nodes': self.G.number_of_nodes(),
+            'links': self.G.number_of_edges(),
+            'disconnected': len(self.model.tracker.disconnected()),
+            'border_routers': self.model.border_routers(),
+            'codet_duration': None if self.codet is None else self.codet[2],
+            'slice_push_pending': len(self.slice_pusher.dirty),
+        }
+
+    def topology(self):
+        nodes = []
+        for node, attr in self.G.nodes(data=True):
+            xy = self.pos.get(node)
+            nodes.append({'id': node, 'desc': attr.get('desc', node), 'slice': attr.get('slice', 1),
+                          'class': attr.get('n_class', "Node"), 'color': self.node_colors.get(node),
+                          'x': None if xy is None else float(xy[0]), 'y': None if xy is None else float(xy[1])})
+        links = [dict(attr, source=u, target=v) for u, v, attr in self.G.edges(data=True)]
+        return {'version': self.model.version, 'nodes': nodes, 'links': links}
+
+    def density(self):
+        return [{'id': node, 'neighbors': int(degree), 'color': color} for node, degree, color in self.neighbors]
+
+    def connectivity(self):
+        result = {'disconnected': self.model.tracker.disconnected(), 'border_routers': self.model.border_routers()}
+        if self.codet is not None:
+            SDN, report, duration = self.codet
+            result['codet'] = {
+                'duration': duration,
+                'slices': {str(node_slice): summary for node_slice, summary in report['slices'].items()},
+                'disconnected': {str(node_slice): slice_DN for node_slice, slice_DN in SDN.items()},
+                'bridges': report['bridges'],
+                'articulation_points': report['articulation_points'],
+                'regions': {str(BID): {str(node_slice): slice_DN for node_slice, slice_DN in region_SDN.items()}
+                            for BID, region_SDN in report['regions'].items()},
+            }
+        return result
+
+    # The region of every border router: its nodes, the disconnected nodes of the
+    # last CODET run towards its own border router, and its densest nodes
+    def regions(self):
+        region = self.model.regions()
+        SDN = {} if self.codet is None else self.codet[1]['regions']
+        density = region_density(self.G, region, DENSITY_TOP)
+        result = {}
+        for BID, nodes in region_members(region).items():
+            result[str(BID)] = {
+                'nodes': len(nodes),
+                'disconnected': sorted(set(node for slice_DN in SDN.get(BID, {}).values() for node in slice_DN)),
+                'density': [{'id': node, 'neighbors': degree, 'color': color} for node, degree, color in density.get(BID, [])],
+            }
+        return result
@@ -0,0 +1,143 @@
+"""
+Node Density Classifier
+Categorizes the network nodes by their number of neighbors with the traffic
+light RAG rating: the 25% of the nodes with the most neighbors are red, the
+next 25% orange, then yellow, and the 25% with the fewest neighbors green.
+The node degrees are kept in a NumPy array that is updated by the link
+add/remove events, the thresholds are found with np.partition and all the
+nodes are colored in one vectorized step.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+
+# Colors from the lowest to the highest adjacency load
+COLORS = np.array(['green', 'yellow', 'orange', 'red'])
+
+# Share of the nodes (sorted from the most neighbors) above each threshold
+SPLITS = (0.25, 0.50, 0.75)
+
+# Thresholds (yellow_n, orange_n, red_n) of the node degrees
+def degree_thresholds(degrees):
+    n = len(degrees)
+    # Position of each split in the degrees sorted from the most neighbors,
+    # counted from the end of the ascending order
+    kth = [n - 1 - int(n * split) for split in SPLITS]
+    part = np.partition(degrees, sorted(set(kth)))
+    red_n, orange_n, yellow_n = part[kth]
+    return np.array([yellow_n, orange_n, red_n])
+
+# Color of every degree, same rules as the original classifier:
+# degree <= yellow_n green, <= orange_n yellow, <= red_n orange, else red
+def classify_degrees(degrees):
+    if len(degrees) == 0:
+        return np.array([], dtype=COLORS.dtype)
+    return COLORS[np.searchsorted(degree_thresholds(degrees), degrees, side='left')]
+
+class DensityClassifier:
+    def __init__(self, G=None):
+        self.rebuild(G)
+
+    # Reload all the node degrees from the graph
+    def rebuild(self, G=None):
+        nodes = list(G.nodes) if G is not None else []
+        self.nodes = nodes                                   # row -> node
+        self.index = {node: i for i, node in enumerate(nodes)}  # node -> row
+        self.degrees = np.zeros(max(len(nodes), 16), dtype=np.int64)
+        if nodes:
+            self.degrees[:len(nodes)] = [d for _, d in G.degree(nodes)]
+        self.colors = np.full(len(self.degrees), '', dtype=COLORS.dtype)
+
+    def add_node(self, node):
+        if node in self.index:
+            return
+        row = len(self.nodes)
+        if row == len(self.degrees):
+            # Grow the columns by doubling
+            self.degrees = np.concatenate([self.degrees, np.zeros(row, dtype=np.int64)])
+            self.colors = np.concatenate([self.colors, np.full(row, '', dtype=COLORS.dtype)])
+        self.index[node] = row
+        self.nodes.append(node)
+        self.degrees[row] = 0
+        self.colors[row] = ''
+
+    def remove_node(self, node):
+        row = self.index.pop(node, None)
+        if row is None:
+            return
+        # Move the last row in the free one
+        last = len(self.nodes) - 1
+        last_node = self.nodes.pop()
+        if row != last:
+            self.nodes[row] = last_node
+            self.index[last_node] = row
+            self.degrees[row] = self.degrees[last]
+            self.colors[row] = self.colors[last]
+
+    def add_edge(self, u, v):
+        self.add_node(u)
+        self.add_node(v)
+        self.degrees[self.index[u]] += 1
+        self.degrees[self.index[v]] += 1
+
+    def remove_edge(self, u, v):
+        for node in (u, v):
+            if node in self.index:
+                self.degrees[self.index[node]] -= 1
+
+    # Update the degrees with the changes of a topology message
+    def apply_changes(self, G, changes):
+        if changes['snapshot']:
+            self.rebuild(G)
+            return
+        for node in changes['added_nodes']:
+            self.add_node(node)
+        for u, v in changes['added_links']:
+            self.add_edge(u, v)
+        for u, v in changes['removed_links']:
+            self.remove_edge(u, v)
+        for node in changes['removed_nodes']:
+            self.remove_node(node)
+
+    # Recolor all the nodes, returns the nodes whose color changed
+    def classify(self):
+        n = len(self.nodes)
+        colors = classify_degrees(self.degrees[:n])
+        changed = np.nonzero(colors != self.colors[:n])[0]
+        self.colors[:n] = colors
+        return [self.nodes[i] for i in changed]
+
+    def degree(self, node):
+        return int(self.degrees[self.index[node]])
+
+    def color(self, node):
+        return str(self.colors[self.index[node]])
+
+    # (node, degree, color) sorted from the node with most neighbors
+    def neighbors_list(self):
+        n = len(self.nodes)
+        order = np.argsort(-self.degrees[:n], kind='stable')
+        degrees = self.degrees[order].tolist()
+        colors = self.colors[order].tolist()
+        return [(self.nodes[i], d, c) for i, d, c in zip(order.tolist(), degrees, colors)]
+
+    # {node: color}
+    def node_colors(self):
+        n = len(self.nodes)
+        return dict(zip(self.nodes, self.colors[:n].tolist()))
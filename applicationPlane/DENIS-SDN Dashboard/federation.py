@@ -0,0 +1,89 @@
+"""
+Border router federation
+A network with several border routers is split in regions, one per border
+router ID (BID). Every node belongs to the region of the border router whose
+BID tagged its last NN or NB report, or its snapshot entry; a node that was
+never tagged belongs to the first border router. The regions live in the one
+topology model of the dashboard, as the BID attribute of the nodes, so every
+message is applied once, in place, whatever its region.
+The federated view, where a node is connected when it reaches any border
+router, is kept by the model with all the border routers as CODET targets.
+Every region is also checked on its own:
+  run_CODET_regions   CODET of every region towards its own border router, over
+                      the links inside the region
+  region_density      Node Density Classifier of every region, the degrees and
+                      the thresholds come from the links inside the region only
+run_CODET_regions runs in the CODET scheduler thread, outside the update loop.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import networkx as nx
+
+from CODET import run_CODET_single_pass
+from density_classifier import classify_degrees
+
+# Nodes of every region, {BID: [nodes]}, region: node -> BID
+def region_members(region):
+    members = {}
+    for node, BID in region.items():
+        members.setdefault(BID, []).append(node)
+    return members
+
+# CODET of every region towards its own border router, {BID: {slice: [disconnected nodes]}}
+# snapshot: graph or CompactTopology, region: node -> BID (TopologyModel.regions)
+# Only the links inside a region are used
+def run_CODET_regions(snapshot, region):
+    slices = dict(snapshot.nodes(data='slice', default=1))
+    jobs = {BID: ([], []) for BID in set(region.values())}
+    for node, node_slice in slices.items():
+        BID = region.get(node)
+        if BID is not None:
+            jobs[BID][0].append((node, node_slice))
+    for u, v in snapshot.edges():
+        BID = region.get(u)
+        if BID is not None and BID == region.get(v):
+            jobs[BID][1].append((u, v))
+    return {BID: CODET_region(BID, nodes, links) for BID, (nodes, links) in jobs.items()}
+
+# CODET of a single region, {slice: [disconnected nodes]}
+def CODET_region(BID, nodes, links):
+    H = nx.Graph()
+    H.add_nodes_from((node, {'slice': node_slice}) for node, node_slice in nodes)
+    H.add_edges_from(links)
+    return run_CODET_single_pass(H, BID, per_slice=True)[1]
+
+# Node Density Classifier of every region, {BID: [(node, degree, color)]} sorted
+# from the node with most neighbors, at most top nodes per region
+# The degree of a node counts only its links inside its own region
+def region_density(G, region, top=None):
+    members = region_members(region)
+    degrees = {node: 0 for node in region}
+    for u, v in G.edges():
+        BID = region.get(u)
+        if BID is not None and BID == region.get(v) and u != v:
+            degrees[u] += 1
+            degrees[v] += 1
+    result = {}
+    for BID, nodes in members.items():
+        region_degrees = np.array([degrees[node] for node in nodes], dtype=np.int64)
+        colors = classify_degrees(region_degrees)
+        order = np.argsort(-region_degrees, kind='stable')[:top]
+        result[BID] = [(nodes[i], int(region_degrees[i]), str(colors[i])) for i in order.tolist()]
+    return result
@@ -0,0 +1,337 @@
+"""
+DENIS-SDN Dashboard GUI
+The tkinter window of the dashboard: the Slice Configurator, the Real-time
+Slice Manager, the Network Density Visualizer, CODET and the Node Density
+Classifier. All the processing is done by the DashboardCore; the window polls
+it from the tkinter main loop and refreshes the lists and the graph once per
+burst of changes. tkinter and matplotlib are imported only by this module.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import tkinter as tk
+from tkinter import ttk
+
+from renderer import GraphRenderer
+from spatial_index import SpatialIndex, pixel_size
+from node_lists import SliceConfiguratorList, DensityClassifierList, NUMBER_OF_SLICES
+from dashboard_core import CODET_REFRESH_TIME
+
+# Period (ms) of the update loop, one redraw per period at most
+UPDATES_INTERVAL = 50
+
+# Nodes picked within PICK_PIXELS on the screen
+PICK_PIXELS = 12
+
+# Period (ms) of the instrumentation panel
+PANEL_INTERVAL = 1000
+
+# Profile of the tkinter main loop, written when the profiler is switched off
+PROFILE_PATH = "dashboard.prof"
+
+class DashboardWindow:
+    def __init__(self, core):
+        self.core = core
+        self.G = core.G
+        self.pos = core.pos
+
+        # Create the main window
+        self.window = tk.Tk()
+        self.window.iconbitmap('NetIco.ico')
+        self.window.title("DENIS-SDN Dashboard")
+        self.window.geometry("1220x670")
+        window = self.window
+
+        # #####################################################################################################
+        #                                           Slice Configurator                                        #
+        # #####################################################################################################
+        heading1 = tk.Label(window, text="Slice Configurator", font=('Arial',14, 'bold'), background="Light Gray", relief=tk.RAISED, borderwidth=3)
+        heading1.grid(row=0, column=0, padx=10, sticky="nwe")
+
+        # Create the Slice Configurator list
+        self.slice_list = SliceConfiguratorList(window, self.on_combobox_change)
+        self.slice_list.grid(row=1, column=0, padx=10, pady=10, sticky="nw")
+
+        # #####################################################################################################
+        #                                  Real-time Slice Manager                                            #
+        # #####################################################################################################
+        heading3 = tk.Label(window, text="Real-time Slice Manager", font=('Arial', 14, 'bold'), background="Light Gray", relief=tk.RAISED, borderwidth=3)
+        heading3.grid(row=2, column=0, padx=10, sticky="nwe")
+
+        buttons_frame = tk.Frame(window)
+        buttons_frame.grid(row=3, column=0, padx=10, pady=10, sticky="nw")
+
+        # Create the radio buttons
+        self.var = tk.StringVar()
+        self.var.set("Logically-Sliced")  # Set the initial selection
+        radio1 = tk.Radiobutton(buttons_frame, text="Logically-Sliced", variable=self.var, value="Logically-Sliced", font=('Arial',12))
+        radio2 = tk.Radiobutton(buttons_frame, text="Physically-Sliced", variable=self.var, value="Physically-Sliced", font=('Arial',12))
+        radio1.pack(anchor="w")
+        radio2.pack(anchor="w")
+
+        slicer_button = tk.Button(buttons_frame, text="Update Network Slices",font=('Arial',14), command=self.send_slice_configuration)
+        slicer_button.pack(anchor="center")  #side="left"
+
+        bulk_frame = tk.Frame(buttons_frame)
+        bulk_frame.pack(anchor="w", pady=5)
+        self.bulk_rule = ttk.Combobox(bulk_frame, values=["Class", "ID range", "Color", "Auto"], state="readonly", font=('Arial', 10), width=8)
+        self.bulk_rule.set("Auto")
+        self.bulk_rule.pack(side="left")
+        self.bulk_value = tk.Entry(bulk_frame, font=('Arial', 10), width=12)
+        self.bulk_value.pack(side="left", padx=2)
+        self.bulk_slice = ttk.Combobox(bulk_frame, values=list(range(1, NUMBER_OF_SLICES + 1)), state="readonly", font=('Arial', 10), width=3)
+        self.bulk_slice.set("4")
+        self.bulk_slice.pack(side="left")
+        bulk_button = tk.Button(bulk_frame, text="Assign", font=('Arial', 10), command=self.apply_bulk_assignment)
+        bulk_button.pack(side="left", padx=2)
+
+        # #####################################################################################################
+        #                                 Network Density Visualizer                                          #
+        # #####################################################################################################
+        heading2 = tk.Label(window, text="Network Density Visualizer", font=('Arial', 14, 'bold'), background="Light Gray", relief=tk.RAISED, borderwidth=3)
+        heading2.grid(row=0, column=1, padx=10, sticky="nwe")
+
+        # Create the network graph
+        network_graph_frame = tk.Frame(window)
+        network_graph_frame.grid(row=1, column=1, padx=10, pady=10)
+
+        # Enable drag and drop
+        self.drag_node = None
+
+        # Grid buckets of the node positions for picking the dragged node
+        self.node_index = SpatialIndex()
+
+        # Create the canvas for the network graph
+        figure = plt.gcf()
+        canvas = FigureCanvasTkAgg(figure, master=network_graph_frame)
+
+        # Persistent artists of the graph, redrawn at most TARGET_FPS times per second
+        self.renderer = GraphRenderer(figure, canvas)
+
+        figure.canvas.mpl_connect('button_press_event', self.on_press)
+        figure.canvas.mpl_connect('button_release_event', self.on_release)
+        figure.canvas.mpl_connect('motion_notify_event', self.on_motion)
+        figure.canvas.mpl_connect('scroll_event', self.on_scroll)
+        # Every full redraw of the canvas, for the redraw rate
+        figure.canvas.mpl_connect('draw_event', lambda event: self.core.instruments.event('frames'))
+        canvas.get_tk_widget().pack()
+
+        # #####################################################################################################
+        #                                 Connectivity Detector CODET                                         #
+        # #####################################################################################################
+        heading4 = tk.Label(window, text="Connectivity Detector - (CODET)", font=('Arial', 14, 'bold'), background="Light Gray", relief=tk.RAISED, borderwidth=3)
+        heading4.grid(row=2, column=1, padx=10, sticky="nwe")
+
+        codet_frame = tk.Frame(window)
+        codet_frame.grid(row=3, column=1, padx=10, pady=10, sticky="nwe")
+
+        self.codet_message = tk.Label(codet_frame, text="", font=('Arial',12), fg="Red", background="Light Yellow", relief=tk.SUNKEN, borderwidth=3, wraplength=250)
+        self.codet_message.grid(row=0, column=0, sticky="nwe", columnspan=5)
+
+        codet_Label = tk.Label(codet_frame, text="                                   CODET Refresh time (min): ", font=('Arial',12))
+        codet_Label.grid(row=1, column=0, padx=10, pady=5, sticky="nwe")
+
+        minutes = [1,2,3,4,5,6,7,8,10,11,12,13,14,15,16,17,18,19,20,30,40,50,60]
+        self.codet_combobox = ttk.Combobox(codet_frame, values=minutes, state="readonly", font=('Arial', 12), width=5)
+        self.codet_combobox.grid(row=1, column=1, padx=10, pady=5, sticky="nwe")
+        self.codet_combobox.set(str(CODET_REFRESH_TIME))
+
+        codet_button = tk.Button(codet_frame, text="Update Refresh time",padx=10,font=('Arial',12), width=15, command=self.update_refresh_time)
+        codet_button.grid(row=1, column=3, padx=10, pady=2, sticky="nwe")
+
+        codet_run_button = tk.Button(codet_frame, text="Run now",padx=10,font=('Arial',12), width=8, command=self.core.run_CODET_now)
+        codet_run_button.grid(row=1, column=4, padx=10, pady=2, sticky="nwe")
+
+        self.codet_time = tk.Label(codet_frame, text="", font=('Arial',10))
+        self.codet_time.grid(row=2, column=0, padx=10, sticky="nw", columnspan=5)
+
+        # #####################################################################################################
+        #                                     Node Density Classifier                                         #
+        # #####################################################################################################
+        heading5 = tk.Label(window, text="Node Density Classifier", font=('Arial', 14, 'bold'), background="Light Gray", relief=tk.RAISED, borderwidth=3)
+        heading5.grid(row=0, column=3, padx=10, sticky="nwe")
+
+        # Create the Node Density Classifier list
+        self.density_list = DensityClassifierList(window)
+        self.density_list.grid(row=1, column=3, padx=10, pady=10, sticky="nw")
+
+        # GUI Control
+        # #######################################################
+        heading6 = tk.Label(window, text="DENIS-SDN Control", font=('Arial', 14, 'bold'), background="Light Gray", relief=tk.RAISED, borderwidth=3)
+        heading6.grid(row=2, column=3, padx=10, sticky="nwe")
+
+        control_frame = tk.Frame(window)
+        control_frame.grid(row=3, column=3, padx=10, pady=10, sticky="nw")
+        buttons2_frame = tk.Frame(control_frame)
+        buttons2_frame.pack(anchor="w")
+
+        # Create the buttons
+        start_button = tk.Button(buttons2_frame, text="Start", font=('Arial',14), width=5, command=self.start_Dashboard)
+        start_button.pack(side="left")
+
+        stop_button = tk.Button(buttons2_frame, text="Stop",padx=10,font=('Arial',14), width=5, command=self.stop_Dashboard)
+        stop_button.pack(side="left", padx=10)
+
+        close_button = tk.Button(buttons2_frame, text="Close",padx=10,font=('Arial',14), width=5, command=self.close_application)
+        close_button.pack(side="right")
+
+        # Instrumentation panel, the slowest stages first
+        self.instrumentation_panel = tk.Label(control_frame, text="", font=('Courier', 8), justify="left", anchor="nw")
+        self.instrumentation_panel.pack(anchor="w", pady=5)
+        profiling = self.core.instruments.profiler is not None
+        self.profile_button = tk.Button(control_frame, text="Stop profiler" if profiling else "Start profiler", font=('Arial', 10), command=self.toggle_profiler)
+        self.profile_button.pack(anchor="w")
+
+    # Show the last snapshot and start the update loop
+    def mainloop(self):
+        self.core.load_snapshot()
+        self.window.after(UPDATES_INTERVAL, self.receive_json_messages)
+        self.window.after(PANEL_INTERVAL, self.show_instrumentation)
+        self.window.mainloop()
+
+    # Update pipeline, runs in the tkinter main loop
+    # The core drains the messages of the controller link and the results of the
+    # worker threads, then the lists and the graph are refreshed once for the whole burst
+    def receive_json_messages(self):
+        updates = self.core.poll()
+
+        if updates['connectivity']:
+            self.codet_message.config(text=("Warning!!!\n Node(s) "+str(self.core.model.tracker.disconnected())+" are disconnected"))
+        if updates['codet']:
+            self.show_CODET_result(*self.core.codet)
+        if updates['nodes']:
+            self.show_slice_configurator()
+        if updates['topology']:
+            self.renderer.topology_changed()
+            self.show_desnsity_classifier(self.core.neighbors)
+        # The picking index is rebuilt on the next click only when nodes were placed, moved or removed
+        if updates['positions']:
+            self.node_index.dirty = True
+        # Update the graph visualization
+        if updates['redraw']:
+            self.draw_graph()
+
+        self.window.after(UPDATES_INTERVAL, self.receive_json_messages)
+
+    def draw_graph(self):
+        # Only the positions and colors of the persistent artists are updated
+        with self.core.instruments.timer('draw'):
+            self.renderer.draw(self.G, self.pos, self.core.node_colors)
+
+    # Drag and drop nodes
+    def on_press(self, event):
+        if event.inaxes is None:
+            return
+        if self.node_index.dirty:
+            self.node_index.rebuild(self.pos)
+        # Nearest node within PICK_PIXELS on the screen
+        sx, sy = pixel_size(event.inaxes)
+        node = self.node_index.nearest(event.xdata, event.ydata, PICK_PIXELS * sx, PICK_PIXELS * sy)
+        if node is not None and self.renderer.begin_drag(node):
+            self.drag_node = node
+        elif not self.renderer.detail:
+            # A click on the aggregate glyphs expands them
+            self.renderer.zoom(event.xdata, event.ydata, 3)
+
+    def on_release(self, event):
+        if self.drag_node is not None:
+            self.node_index.move(self.drag_node, self.pos[self.drag_node])
+            self.core.positions_changed = True
+            self.drag_node = None
+            self.renderer.end_drag()
+            self.renderer.draw(self.G, self.pos, self.core.node_colors)
+
+    # Zoom with the mouse wheel, the glyphs expand into their nodes
+    def on_scroll(self, event):
+        if event.inaxes is not None:
+            self.renderer.zoom(event.xdata, event.ydata, event.step)
+
+    def on_motion(self, event):
+        if self.drag_node is not None and event.inaxes is not None:
+            # The node stays where the user leaves it
+            self.core.layout.pin(self.drag_node, (event.xdata, event.ydata))
+
+            self.renderer.move_drag((event.xdata, event.ydata))
+
+    # Display the Slice Configurator list, the rows are updated in place
+    def show_slice_configurator(self):
+        self.slice_list.update(self.G)
+
+    # Change the slice of a node using the combobox
+    def on_combobox_change(self, node_id, slice_no):
+        print(f"Node {node_id} - Selected value: Slice {slice_no}")
+        self.core.set_slice(node_id, slice_no)
+
+    # Send SLice COnfiguration Data to DENIS-SDN Controller
+    # Only the slice assignments changed since the last push are sent, in batches
+    def send_slice_configuration(self):
+        self.core.push_slices(str(self.var.get()))
+
+    # Bulk slice assignment by a rule, or an automatic balanced partition (applied by the update loop)
+    def apply_bulk_assignment(self):
+        assignment = self.core.bulk_assignment(self.bulk_rule.get(), self.bulk_value.get().strip(), int(self.bulk_slice.get()))
+        if assignment is not None:
+            self.show_slice_configurator()
+
+    # Show the disconnected nodes of a CODET run
+    def show_CODET_result(self, SDN, report, duration):
+        warnings = ["Slice "+str(node_slice)+": "+str(slice_DN) for node_slice, slice_DN in sorted(SDN.items()) if slice_DN]
+        text = "Warning!!!\n Node(s) "+(", ".join(warnings) or "[]")+" are disconnected"
+
+        # Nodes with a single path (behind a bridge) or behind a weak link
+        for node_slice, summary in sorted(report['slices'].items()):
+            if summary['single_path'] or summary['weak']:
+                text += "\nSlice {}: {} single path, {} weak".format(node_slice, len(summary['single_path']), len(summary['weak']))
+        self.codet_message.config(text=text)
+        self.codet_time.config(text="Last check: {:.1f} ms, {} bridges, {} articulation points".format(
+            duration * 1000, len(report['bridges']), len(report['articulation_points'])))
+
+    # Button update refresh time, the scheduler wakes up with the new period
+    def update_refresh_time(self):
+        self.core.set_CODET_refresh_time(int(self.codet_combobox.get()))
+
+    # Display the density classifier list, the rows are updated in place
+    def show_desnsity_classifier(self, neighbors):
+        self.density_list.update(neighbors)
+
+    # Instrumentation
+    # #######################################################
+    def show_instrumentation(self):
+        self.instrumentation_panel.config(text=self.core.instruments.report())
+        self.window.after(PANEL_INTERVAL, self.show_instrumentation)
+
+    # Profile the tkinter main loop, the report is printed when it stops
+    def toggle_profiler(self):
+        report = self.core.toggle_profiler(PROFILE_PATH)
+        if report is None:
+            self.profile_button.config(text="Stop profiler")
+        else:
+            print(report)
+            self.profile_button.config(text="Start profiler")
+
+    def close_application(self):
+        self.core.close()
+        self.window.destroy()
+
+    def start_Dashboard(self):
+        self.core.start()
+
+    def stop_Dashboard(self):
+        self.core.stop()
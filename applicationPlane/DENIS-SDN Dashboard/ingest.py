@@ -0,0 +1,228 @@
+"""
+Streaming JSON ingest
+Splits the byte stream received from the DENIS-SDN Controller into complete
+JSON messages, whatever the size of the socket reads. Three framings are supported:
+  auto    - messages are found by tracking the nesting of {} and [] outside strings,
+            so unframed, newline delimited and pretty-printed messages all work
+  newline - one message per line (the format of the border router UART JSON)
+  length  - every message is preceded by its size as a 4-byte big-endian integer
+Messages larger than max_message_size are dropped, so memory stays bounded.
+orjson is used to parse the messages when it is installed.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import re
+import struct
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Default upper limit for a single JSON message (64 MB)
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+# Complete JSON strings, characters that change the nesting, and the
+# opening quote of a string that is not complete yet
+STRUCTURE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]|"', re.DOTALL)
+
+# The rest of a string up to its closing quote (or up to the end of the buffer)
+STRING_TAIL = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+QUOTE = ord('"')
+OPEN = (ord('{'), ord('['))
+
+# Parse a complete JSON message
+def parse_json(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+class JSONStreamDecoder:
+    def __init__(self, framing="auto", max_message_size=MAX_MESSAGE_SIZE):
+        if framing not in ("auto", "newline", "length"):
+            raise ValueError("Unknown JSON framing: " + str(framing))
+        self.framing = framing
+        self.max_message_size = max_message_size
+        self.reset()
+
+    # Forget any partial message
+    def reset(self):
+        self.buffer = bytearray()
+        self.scan_pos = 0     # next byte of the buffer to scan
+        self.start = None     # start of the current message in the buffer
+        self.depth = 0        # nesting of {} and [] in the current message
+        self.in_string = False  # the scan stopped inside a string
+        self.discard = 0      # the current message is oversized and is being dropped
+        self.dropped = 0      # number of dropped messages
+        self.sizes = []       # sizes (bytes) of the messages of the last feed
+
+    # Add the bytes of a socket read, returns the list of complete messages
+    def feed(self, data):
+        if self.framing == "newline":
+            return self.feed_newline(data)
+        if self.framing == "length":
+            return self.feed_length(data)
+        return self.feed_auto(data)
+
+    def feed_auto(self, data):
+        buf = self.buffer
+        buf += data
+        raw_messages = []
+
+        pos = self.scan_pos
+        if self.in_string:
+            pos = STRING_TAIL.match(buf, pos).end()
+            if pos < len(buf) and buf[pos] == QUOTE:
+                self.in_string = False
+                pos += 1
+
+        if self.in_string:
+            self.scan_pos = pos
+        else:
+            for m in STRUCTURE.finditer(buf, pos):
+                i = m.start()
+                c = buf[i]
+                if c == QUOTE:
+                    if m.end() - i == 1:
+                        # The string continues in the next read
+                        self.in_string = True
+                        self.scan_pos = STRING_TAIL.match(buf, i + 1).end()
+                        break
+                elif c in OPEN:
+                    if self.depth == 0:
+                        self.start = i
+                    self.depth += 1
+                elif self.depth > 0:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        if self.discard:
+                            self.discard = 0
+                        elif i + 1 - self.start > self.max_message_size:
+                            print("JSON message larger than", self.max_message_size, "bytes dropped")
+                            self.dropped += 1
+                        else:
+                            raw_messages.append(bytes(buf[self.start:i + 1]))
+                        self.start = None
+                # Anything outside a message is ignored until the next object or array
+            else:
+                self.scan_pos = len(buf)
+
+        # Drop the consumed bytes, keep only the current partial message
+        if self.start is None or self.discard:
+            consumed = self.scan_pos
+        else:
+            consumed = self.start
+            self.start = 0
+        del buf[:consumed]
+        self.scan_pos -= consumed
+
+        if len(buf) > self.max_message_size:
+            # Keep tracking the nesting of the message but drop its bytes
+            print("JSON message larger than", self.max_message_size, "bytes dropped")
+            self.dropped += 1
+            self.discard = 1
+            del buf[:self.scan_pos]
+            self.scan_pos = 0
+
+        return self.parse(raw_messages)
+
+    def feed_newline(self, data):
+        buf = self.buffer
+        buf += data
+        raw_messages = []
+
+        start = 0
+        while True:
+            end = buf.find(b"\n", self.scan_pos)
+            if end < 0:
+                break
+            if self.discard:
+                # End of an oversized line, already counted
+                self.discard = 0
+            elif end - start > self.max_message_size:
+                print("JSON message larger than", self.max_message_size, "bytes dropped")
+                self.dropped += 1
+            elif end > start:
+                raw_messages.append(bytes(buf[start:end]))
+            start = end + 1
+            self.scan_pos = start
+
+        del buf[:start]
+        self.scan_pos = len(buf)
+
+        if self.discard:
+            # The rest of an oversized line
+            del buf[:]
+            self.scan_pos = 0
+        elif len(buf) > self.max_message_size:
+            print("JSON message larger than", self.max_message_size, "bytes dropped")
+            del buf[:]
+            self.scan_pos = 0
+            self.discard = 1
+            self.dropped += 1
+
+        return self.parse([raw for raw in raw_messages if raw.strip()])
+
+    def feed_length(self, data):
+        buf = self.buffer
+        buf += data
+        raw_messages = []
+
+        pos = 0
+        while True:
+            if self.discard:
+                skip = min(self.discard, len(buf) - pos)
+                self.discard -= skip
+                pos += skip
+                if self.discard:
+                    break
+            if len(buf) - pos < 4:
+                break
+            size = struct.unpack_from(">I", buf, pos)[0]
+            if size > self.max_message_size:
+                print("JSON message larger than", self.max_message_size, "bytes dropped")
+                self.discard = size
+                self.dropped += 1
+                pos += 4
+                continue
+            if len(buf) - pos - 4 < size:
+                break
+            raw_messages.append(bytes(buf[pos + 4:pos + 4 + size]))
+            pos += 4 + size
+
+        del buf[:pos]
+        return self.parse(raw_messages)
+
+    def parse(self, raw_messages):
+        self.sizes = [len(raw) for raw in raw_messages]
+        messages = []
+        for raw in raw_messages:
+            try:
+                messages.append(parse_json(raw))
+            except ValueError as e:  # json.JSONDecodeError and orjson.JSONDecodeError
+                print('Error decoding JSON:', e)
+                self.dropped += 1
+        return messages
+
+# Frame a message for the length framing
+def frame_length(message):
+    data = json.dumps(message, separators=(',', ':')).encode()
+    return struct.pack(">I", len(data)) + data
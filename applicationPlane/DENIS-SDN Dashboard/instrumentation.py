@@ -0,0 +1,210 @@
+"""
+Instrumentation
+Low-overhead measurements of the hot paths of the dashboard:
+  stages    latency of ingest, message processing, layout, classifier, CODET,
+            drawing (p50, p99, max of the last SAMPLES runs)
+  samples   other distributions, e.g. the message sizes in bytes
+  counters  totals, e.g. messages and bytes received
+  gauges    last and highest value, e.g. the depth of the updates queue
+  events    rates per second over the last RATE_WINDOW seconds, e.g. frames
+Every distribution is a ring buffer in a NumPy array, so recording costs a few
+perf_counter() calls and the memory stays bounded. The summary is shown in the
+dashboard panel, served by the daemon at /instrumentation and written to a
+JSON file. An optional cProfile profiler can be switched on and off at runtime;
+it profiles the thread that starts it (the tkinter main loop or the poll loop
+of the daemon).
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import numpy as np
+
+# Values kept per distribution
+SAMPLES = 1024
+
+# Seconds over which the event rates are measured
+RATE_WINDOW = 5.0
+
+# Functions listed by the profiler report
+PROFILE_LINES = 25
+
+# Ring buffer of the last SAMPLES values of a distribution
+class Distribution:
+    def __init__(self, capacity=SAMPLES):
+        self.values = np.zeros(capacity)
+        self.head = 0
+        self.count = 0     # values recorded since start
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.values[self.head] = value
+        self.head = (self.head + 1) % len(self.values)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self):
+        if self.count == 0:
+            return {'count': 0}
+        recent = self.values[:min(self.count, len(self.values))]
+        p50, p99 = np.percentile(recent, [50, 99]).tolist()
+        return {'count': self.count, 'mean': self.total / self.count, 'p50': p50, 'p99': p99, 'max': self.max}
+
+# Context manager that records the time of a stage
+class Timer:
+    def __init__(self, instruments, name):
+        self.instruments = instruments
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instruments.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class Instruments:
+    def __init__(self):
+        self.lock = threading.Lock()  # recorded from the controller link and the worker threads
+        self.started = time.time()
+        self.stages = {}      # name -> Distribution of seconds
+        self.samples = {}     # name -> Distribution of values
+        self.counters = {}    # name -> total
+        self.gauges = {}      # name -> [last, highest]
+        self.events = {}      # name -> Distribution of event times
+        self.profiler = None
+
+    # with instruments.timer('layout'): ...
+    def timer(self, name):
+        return Timer(self, name)
+
+    # Time (s) of a stage
+    def record(self, name, seconds):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = Distribution()
+            stage.record(seconds)
+
+    def sample(self, name, value):
+        with self.lock:
+            distribution = self.samples.get(name)
+            if distribution is None:
+                distribution = self.samples[name] = Distribution()
+            distribution.record(value)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        with self.lock:
+            gauge = self.gauges.get(name)
+            if gauge is None:
+                self.gauges[name] = [value, value]
+            else:
+                gauge[0] = value
+                gauge[1] = max(gauge[1], value)
+
+    # An event, e.g. a frame, for its rate per second
+    def event(self, name):
+        with self.lock:
+            events = self.events.get(name)
+            if events is None:
+                events = self.events[name] = Distribution()
+            events.record(time.perf_counter())
+
+    def rate(self, name):
+        events = self.events.get(name)
+        if events is None or events.count == 0:
+            return 0.0
+        recent = events.values[:min(events.count, len(events.values))]
+        return int((recent >= time.perf_counter() - RATE_WINDOW).sum()) / RATE_WINDOW
+
+    # All the measurements, plain JSON types
+    def summary(self):
+        with self.lock:
+            return {
+                'uptime': time.time() - self.started,
+                'stages': {name: stage.summary() for name, stage in self.stages.items()},
+                'samples': {name: distribution.summary() for name, distribution in self.samples.items()},
+                'counters': dict(self.counters),
+                'gauges': {name: {'last': last, 'max': highest} for name, (last, highest) in self.gauges.items()},
+                'rates': {name: self.rate(name) for name in self.events},
+                'profiling': self.profiler is not None,
+            }
+
+    # Lines of the dashboard panel, the slowest stage (p99) first
+    def report(self):
+        summary = self.summary()
+        lines = []
+        stages = sorted(summary['stages'].items(), key=lambda item: -item[1].get('p99', 0))
+        for name, stage in stages:
+            lines.append("{:<10} p50 {:7.1f} ms  p99 {:7.1f} ms  n={}".format(
+                name, stage['p50'] * 1000, stage['p99'] * 1000, stage['count']))
+        for name, value in sorted(summary['rates'].items()):
+            lines.append("{:<10} {:.1f}/s".format(name, value))
+        for name, gauge in sorted(summary['gauges'].items()):
+            lines.append("{:<10} {} (max {})".format(name, gauge['last'], gauge['max']))
+        for name, distribution in sorted(summary['samples'].items()):
+            if distribution['count']:
+                lines.append("{:<10} p50 {:.0f}  p99 {:.0f}".format(name, distribution['p50'], distribution['p99']))
+        return "\n".join(lines)
+
+    # Write the summary to a JSON file, through a temporary file
+    def export(self, path):
+        temp = path + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(self.summary(), f, indent=1)
+        os.replace(temp, path)
+
+    # Profiler
+    # #######################################################
+    def start_profiler(self):
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    # Stop the profiler, the statistics are written to path (.prof) when given
+    # Returns the functions with the highest cumulative time
+    def stop_profiler(self, path=None):
+        if self.profiler is None:
+            return ""
+        profiler, self.profiler = self.profiler, None
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        return text.getvalue()
+
+    def toggle_profiler(self, path=None):
+        if self.profiler is None:
+            self.start_profiler()
+            return None
+        return self.stop_profiler(path)
@@ -0,0 +1,262 @@
+"""
+Graph layout
+Keeps the positions of the Network Density Visualizer stable between topology
+updates. The layout is warm-started from the previous positions, only the new
+nodes are placed (next to their neighbors), and the nodes dragged by the user
+are pinned. The force-directed engine (Fruchterman-Reingold) runs on NumPy
+arrays with a time budget, inline for small networks and in a background
+worker for large ones. Two repulsion engines are available:
+  exact - all node pairs, O(N^2) per iteration, for small networks
+  grid  - nodes are binned in a grid and repelled by the cell centers of mass,
+          O(N*C) per iteration, for networks with thousands of nodes
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import queue
+import threading
+import time
+import numpy as np
+
+# Networks with more nodes use the grid engine in the 'auto' mode
+GRID_ENGINE_NODES = 1000
+
+# Networks with more nodes are laid out in the background worker
+BACKGROUND_NODES = 500
+
+# Time budget (s) of a layout run
+INLINE_BUDGET = 0.05
+BACKGROUND_BUDGET = 2.0
+
+# Iterations between two checks of the time budget
+CHUNK = 5
+
+# Size of the layout, the optimal distance of the nodes is set for a 2x2 square
+LAYOUT_SIZE = 2.0
+
+# Starting temperature, as a share of the layout size, for a new and a warm layout
+NEW_TEMPERATURE = 0.1
+WARM_TEMPERATURE = 0.005
+
+# Cooling per iteration and temperature (share of the layout size) of a finished layout
+COOLING = 0.95
+MIN_TEMPERATURE = 0.001
+
+# Repulsive displacement of every node from all the other nodes
+def exact_repulsion(xy, k):
+    n = len(xy)
+    disp = np.zeros_like(xy)
+    # Blocks of rows keep the memory at O(block*N)
+    block = max(1, 4000000 // max(n, 1))
+    for start in range(0, n, block):
+        delta = xy[start:start + block, None, :] - xy[None, :, :]
+        dist2 = np.maximum((delta ** 2).sum(axis=2), 1e-9)
+        disp[start:start + block] = (delta * (k * k / dist2)[:, :, None]).sum(axis=1)
+    return disp
+
+# Repulsive displacement from the centers of mass of a grid of cells
+def grid_repulsion(xy, k):
+    n = len(xy)
+    side = max(2, int(round(n ** (1 / 3))))
+    lo = xy.min(axis=0)
+    size = np.maximum(xy.max(axis=0) - lo, 1e-9)
+    cell = np.minimum((((xy - lo) / size) * side).astype(np.int64), side - 1)
+    cell_id = cell[:, 0] * side + cell[:, 1]
+
+    mass = np.bincount(cell_id, minlength=side * side).astype(float)
+    used = np.nonzero(mass)[0]
+    center = np.stack([np.bincount(cell_id, weights=xy[:, 0], minlength=side * side)[used],
+                       np.bincount(cell_id, weights=xy[:, 1], minlength=side * side)[used]], axis=1)
+    center /= mass[used, None]
+    mass = mass[used]
+
+    # Softening of the size of a cell, the nodes of the same cell do not explode
+    soft = (size.max() / side) ** 2 / 4
+    disp = np.zeros_like(xy)
+    block = max(1, 4000000 // max(len(used), 1))
+    for start in range(0, n, block):
+        delta = xy[start:start + block, None, :] - center[None, :, :]
+        dist2 = (delta ** 2).sum(axis=2) + soft
+        disp[start:start + block] = (delta * (mass * k * k / dist2)[:, :, None]).sum(axis=1)
+    return disp
+
+REPULSION = {'exact': exact_repulsion, 'grid': grid_repulsion}
+
+# Fruchterman-Reingold iterations on arrays, returns the new positions and temperature
+# xy positions (N,2), edges (E,2) rows of xy, fixed boolean mask of pinned rows
+def force_directed(xy, edges, fixed, iterations, temperature, engine='exact'):
+    n = len(xy)
+    if n < 2:
+        return xy, temperature * COOLING ** iterations
+    xy = xy.copy()
+    k = LAYOUT_SIZE / np.sqrt(n)  # optimal distance of two nodes
+    repulsion = REPULSION[engine]
+
+    for _ in range(iterations):
+        disp = repulsion(xy, k)
+        if len(edges):
+            delta = xy[edges[:, 0]] - xy[edges[:, 1]]
+            dist = np.sqrt(np.maximum((delta ** 2).sum(axis=1), 1e-9))
+            force = delta * (dist / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] -= np.bincount(edges[:, 0], weights=force[:, axis], minlength=n)
+                disp[:, axis] += np.bincount(edges[:, 1], weights=force[:, axis], minlength=n)
+        length = np.sqrt(np.maximum((disp ** 2).sum(axis=1), 1e-9))
+        step = disp * (np.minimum(length, temperature) / length)[:, None]
+        step[fixed] = 0
+        xy += step
+        temperature *= COOLING
+    return xy, temperature
+
+class GraphLayout:
+    def __init__(self, engine='auto', seed=None):
+        self.engine = engine          # 'auto', 'exact' or 'grid'
+        self.pos = {}                 # node -> (x, y), shared with the visualizer
+        self.pinned = set()           # nodes placed by the user
+        self.temperature = 0.0        # share of the layout size
+        self.generation = 0           # increased by every topology change
+        self.random = np.random.default_rng(seed)
+        self.results = queue.Queue()  # finished background layouts
+        self.worker = None
+
+    def engine_for(self, n):
+        if self.engine != 'auto':
+            return self.engine
+        return 'grid' if n > GRID_ENGINE_NODES else 'exact'
+
+    # Pin a node at the position set by the user
+    def pin(self, node, xy):
+        self.pos[node] = (float(xy[0]), float(xy[1]))
+        self.pinned.add(node)
+
+    # Follow the changes of a topology message, returns True when the layout has to run
+    def apply_changes(self, G, changes):
+        if changes['snapshot']:
+            # Keep the position of every node that is still in the network
+            for node in list(self.pos):
+                if node not in G:
+                    del self.pos[node]
+        for node in changes['removed_nodes']:
+            self.pos.pop(node, None)
+        self.pinned.intersection_update(self.pos)
+
+        new_nodes = [node for node in changes['added_nodes'] if node in G and node not in self.pos]
+        self.place(G, new_nodes)
+
+        if new_nodes and len(new_nodes) == G.number_of_nodes():
+            self.temperature = NEW_TEMPERATURE
+        elif new_nodes or changes['added_links'] or changes['removed_links'] or changes['removed_nodes']:
+            self.temperature = max(self.temperature, WARM_TEMPERATURE)
+        else:
+            return False
+        self.generation += 1
+        return True
+
+    # Place the new nodes next to their placed neighbors
+    def place(self, G, nodes):
+        pending = list(nodes)
+        jitter = 0.05
+        # New nodes next to new nodes are placed in the following rounds
+        while pending:
+            left = []
+            for node in pending:
+                placed = [self.pos[n] for n in G.neighbors(node) if n in self.pos]
+                if placed:
+                    x, y = np.mean(placed, axis=0) + self.random.uniform(-jitter, jitter, 2)
+                    self.pos[node] = (float(x), float(y))
+                else:
+                    left.append(node)
+            if len(left) == len(pending):
+                for node in left:
+                    x, y = self.random.uniform(-1, 1, 2)
+                    self.pos[node] = (float(x), float(y))
+                break
+            pending = left
+
+    # Arrays of the current layout for the force-directed engine
+    def arrays(self, G):
+        nodes = [node for node in G if node in self.pos]
+        index = {node: i for i, node in enumerate(nodes)}
+        xy = np.array([self.pos[node] for node in nodes], dtype=float).reshape(-1, 2)
+        edges = np.array([(index[u], index[v]) for u, v in G.edges() if u in index and v in index and u != v],
+                         dtype=np.int64).reshape(-1, 2)
+        fixed = np.array([node in self.pinned for node in nodes], dtype=bool)
+        return nodes, xy, edges, fixed
+
+    # Run the layout in the tkinter main loop or in the background worker
+    # Returns True when the positions have already been updated
+    def run(self, G):
+        if self.temperature < MIN_TEMPERATURE or self.busy():
+            return False
+        if G.number_of_nodes() > BACKGROUND_NODES:
+            self.run_in_background(G)
+            return False
+        self.relax(G, INLINE_BUDGET)
+        return True
+
+    # A background layout is running
+    def busy(self):
+        return self.worker is not None and self.worker.is_alive()
+
+    # Force-directed iterations until the layout is cool or the budget is over
+    def relax(self, G, budget):
+        nodes, xy, edges, fixed = self.arrays(G)
+        xy, self.temperature = self.iterate(xy, edges, fixed, self.temperature, budget, self.generation)
+        for node, (x, y) in zip(nodes, xy.tolist()):
+            if node not in self.pinned:
+                self.pos[node] = (x, y)
+
+    def iterate(self, xy, edges, fixed, temperature, budget, generation):
+        engine = self.engine_for(len(xy))
+        t = temperature * LAYOUT_SIZE
+        deadline = time.perf_counter() + budget
+        while t > MIN_TEMPERATURE * LAYOUT_SIZE and time.perf_counter() < deadline:
+            if generation != self.generation:
+                break  # a newer layout is coming
+            xy, t = force_directed(xy, edges, fixed, CHUNK, t, engine)
+        return xy, t / LAYOUT_SIZE
+
+    # Layout of the arrays in a worker thread, the result is put in self.results
+    def run_in_background(self, G):
+        arrays = self.arrays(G)
+        generation = self.generation
+        temperature = self.temperature
+
+        def work():
+            nodes, xy, edges, fixed = arrays
+            xy, temperature_left = self.iterate(xy, edges, fixed, temperature, BACKGROUND_BUDGET, generation)
+            self.results.put((generation, nodes, xy, temperature_left))
+
+        self.worker = threading.Thread(target=work, daemon=True)
+        self.worker.start()
+
+    # Apply the finished background layouts, returns True when the positions changed
+    def collect(self):
+        changed = False
+        while True:
+            try:
+                generation, nodes, xy, temperature = self.results.get_nowait()
+            except queue.Empty:
+                return changed
+            if generation != self.generation:
+                continue  # the topology changed while it was running
+            self.temperature = temperature
+            for node, (x, y) in zip(nodes, xy.tolist()):
+                if node in self.pos and node not in self.pinned:
+                    self.pos[node] = (x, y)
+            changed = True
@@ -0,0 +1,282 @@
+"""
+Link-quality metrics store
+Time series of the metrics the border router reports in the NB packets:
+  links - RSS, SSS, LQI of every link
+  nodes - ENG (energy) of every node
+Every series is a ring buffer in NumPy arrays, so the memory is bounded however
+long the dashboard runs, and the series of a link or node are dropped when it
+leaves the graph. Two tiers are kept: the raw samples and a downsampled
+tier where the samples of every BUCKET seconds are averaged into one slot, so
+the history covers hours with the same memory. With a path the arrays are
+memory-mapped .npy files, and the series keys are written next to them by
+flush(), so the history survives a restart. The links whose quality keeps
+falling are served by the daemon at /metrics/degrading.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import time
+import numpy as np
+
+from topology import LINK_METRICS
+
+NODE_METRICS = ('ENG',)
+
+# Samples kept per series in the raw and the downsampled tier
+RAW_SAMPLES = 256
+DOWNSAMPLED_SAMPLES = 256
+
+# Seconds averaged into one slot of the downsampled tier
+BUCKET = 60.0
+
+# Series allocated at start, the arrays double when they are full
+INITIAL_SERIES = 64
+
+# Ring buffers of many series of the same fields
+# time (S,C) float64, values (S,C,F) float32, head and count (S) per series
+# With bucket > 0 the samples of the same bucket are averaged into one slot
+class RingSeries:
+    def __init__(self, fields, capacity, bucket=0.0, path=None):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.bucket = bucket
+        self.path = path      # prefix of the .npy files, None in memory
+        self.keys = []        # row -> series key
+        self.index = {}       # series key -> row
+        self.load()
+
+    def files(self):
+        return {name: self.path + '.' + name + '.npy' for name in ('time', 'values', 'head', 'count', 'samples')}
+
+    # Open the memory-mapped arrays of a previous run, or allocate new ones
+    def load(self):
+        if self.path is not None and os.path.exists(self.path + '.keys.json'):
+            try:
+                with open(self.path + '.keys.json') as f:
+                    keys = [tuple(key) if isinstance(key, list) else key for key in json.load(f)]
+                arrays = {name: np.load(file, mmap_mode='r+') for name, file in self.files().items()}
+                if arrays['values'].shape[1:] == (self.capacity, len(self.fields)):
+                    self.__dict__.update(arrays)
+                    self.keys = keys
+                    self.index = {key: row for row, key in enumerate(keys)}
+                    return
+                print("Metrics history", self.path, "has another shape, starting a new one")
+            except (OSError, ValueError) as e:
+                print("Metrics history", self.path, "cannot be loaded:", e)
+        self.allocate(INITIAL_SERIES)
+
+    # Arrays for n series, the existing series are copied
+    def allocate(self, n):
+        shapes = {
+            'time': ((n, self.capacity), np.float64),
+            'values': ((n, self.capacity, len(self.fields)), np.float32),
+            'head': ((n,), np.int64),
+            'count': ((n,), np.int64),
+            'samples': ((n,), np.int64),  # samples averaged in the newest slot
+        }
+        old = {name: getattr(self, name, None) for name in shapes}
+        for name, (shape, dtype) in shapes.items():
+            if self.path is None:
+                array = np.zeros(shape, dtype=dtype)
+            else:
+                file = self.files()[name]
+                temp = file + '.new'
+                array = np.lib.format.open_memmap(temp, mode='w+', dtype=dtype, shape=shape)
+            if old[name] is not None:
+                array[:len(old[name])] = old[name]
+            if self.path is not None:
+                array.flush()
+                del array
+                os.replace(temp, file)
+                array = np.load(file, mmap_mode='r+')
+            setattr(self, name, array)
+
+    def row(self, key):
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.head):
+                self.allocate(2 * row)
+            self.keys.append(key)
+            self.index[key] = row
+        return row
+
+    # Drop a series, the last row is moved in its place so the rows stay 0..S-1
+    def remove(self, key):
+        row = self.index.pop(key, None)
+        if row is None:
+            return
+        last = len(self.keys) - 1
+        last_key = self.keys.pop()
+        names = ('time', 'values', 'head', 'count', 'samples')
+        if row != last:
+            self.keys[row] = last_key
+            self.index[last_key] = row
+            for name in names:
+                array = getattr(self, name)
+                array[row] = array[last]
+        for name in names:
+            getattr(self, name)[last] = 0
+
+    # Add a sample, values in the order of the fields (NaN for a missing field)
+    def append(self, key, t, values):
+        row = self.row(key)
+        count = self.count[row]
+        last = (self.head[row] - 1) % self.capacity
+        if self.bucket > 0 and count and t // self.bucket == self.time[row, last] // self.bucket:
+            # Same bucket, running mean of the slot
+            n = self.samples[row] + 1
+            old = self.values[row, last]
+            new = np.where(np.isnan(values), old, values)
+            self.values[row, last] = np.where(np.isnan(old), new, old + (new - old) / n)
+            self.samples[row] = n
+            return
+        head = self.head[row]
+        self.time[row, head] = t
+        self.values[row, head] = values
+        self.head[row] = (head + 1) % self.capacity
+        self.count[row] = min(count + 1, self.capacity)
+        self.samples[row] = 1
+
+    # (times, values) of a series from the oldest sample, values (n, F)
+    def series(self, key, since=None):
+        row = self.index.get(key)
+        if row is None:
+            return np.zeros(0), np.zeros((0, len(self.fields)), dtype=np.float32)
+        count = self.count[row]
+        order = (self.head[row] - count + np.arange(count)) % self.capacity
+        times = np.array(self.time[row, order])
+        values = np.array(self.values[row, order])
+        if since is not None:
+            keep = times >= since
+            times, values = times[keep], values[keep]
+        return times, values
+
+    # Write the memory-mapped arrays and the series keys
+    def flush(self):
+        if self.path is None:
+            return
+        for name in ('time', 'values', 'head', 'count', 'samples'):
+            getattr(self, name).flush()
+        with open(self.path + '.keys.json', 'w') as f:
+            json.dump([list(key) if isinstance(key, tuple) else key for key in self.keys], f)
+
+class MetricsStore:
+    # path: directory of the memory-mapped history, None to keep it in memory
+    def __init__(self, path=None):
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        prefix = (lambda name: os.path.join(path, name)) if path is not None else (lambda name: None)
+        self.links = RingSeries(LINK_METRICS, RAW_SAMPLES, path=prefix('links'))
+        self.links_downsampled = RingSeries(LINK_METRICS, DOWNSAMPLED_SAMPLES, BUCKET, prefix('links_ds'))
+        self.nodes = RingSeries(NODE_METRICS, RAW_SAMPLES, path=prefix('nodes'))
+        self.nodes_downsampled = RingSeries(NODE_METRICS, DOWNSAMPLED_SAMPLES, BUCKET, prefix('nodes_ds'))
+
+    # Record the metrics of an NB (or NN) message
+    def record(self, message, t=None):
+        if t is None:
+            t = time.time()
+        if message.get('PTY') == 'NB' and 'NID' in message and 'NBR' in message:
+            values = metric_values(message, LINK_METRICS)
+            if values is not None:
+                key = link_key(message['NID'], message['NBR'])
+                self.links.append(key, t, values)
+                self.links_downsampled.append(key, t, values)
+        if message.get('PTY') in ('NB', 'NN') and 'NID' in message:
+            values = metric_values(message, NODE_METRICS)
+            if values is not None:
+                self.nodes.append(message['NID'], t, values)
+                self.nodes_downsampled.append(message['NID'], t, values)
+
+    # Drop the series of the links and nodes that left the graph, so the store
+    # follows the size of the network however many links come and go
+    def evict(self, G, changes):
+        link_tiers = (self.links, self.links_downsampled)
+        node_tiers = (self.nodes, self.nodes_downsampled)
+        if changes['snapshot']:
+            # Also the series of a previous run that are not in the new graph
+            removed = [(series, [key for key in series.keys if not G.has_edge(*key)]) for series in link_tiers]
+            removed += [(series, [key for key in series.keys if key not in G]) for series in node_tiers]
+        else:
+            links = [link_key(u, v) for u, v in changes['removed_links']]
+            removed = [(series, links) for series in link_tiers]
+            removed += [(series, changes['removed_nodes']) for series in node_tiers]
+        for series, keys in removed:
+            for key in keys:
+                series.remove(key)
+
+    # (times, values) of a link metric, the raw samples followed by the older
+    # downsampled history, at most max_points (averaged in equal groups)
+    def link_series(self, u, v, field='LQI', since=None, max_points=None):
+        return self.series(self.links, self.links_downsampled, link_key(u, v), field, since, max_points)
+
+    def node_series(self, node, field='ENG', since=None, max_points=None):
+        return self.series(self.nodes, self.nodes_downsampled, node, field, since, max_points)
+
+    def series(self, raw, downsampled, key, field, since, max_points):
+        column = raw.fields.index(field)
+        raw_t, raw_v = raw.series(key, since)
+        old_t, old_v = downsampled.series(key, since)
+        if len(raw_t):
+            keep = old_t < raw_t[0]
+            old_t, old_v = old_t[keep], old_v[keep]
+        times = np.concatenate([old_t, raw_t])
+        values = np.concatenate([old_v[:, column], raw_v[:, column]])
+        if max_points is not None and len(times) > max_points:
+            groups = np.array_split(np.arange(len(times)), max_points)
+            times = np.array([times[g].mean() for g in groups])
+            values = np.array([np.nanmean(values[g]) if not np.all(np.isnan(values[g])) else np.nan for g in groups])
+        return times, values
+
+    # Links whose recent mean of a metric fell by more than `drop` below their
+    # earlier mean over the whole history, [(link, earlier, recent)] worst first
+    def degrading_links(self, field='LQI', drop=10.0):
+        result = []
+        for key in self.links.keys:
+            times, values = self.series(self.links, self.links_downsampled, key, field, None, None)
+            values = values[~np.isnan(values)]
+            if len(values) < 8:
+                continue
+            half = len(values) // 2
+            earlier = float(values[:half].mean())
+            recent = float(values[half:].mean())
+            if earlier - recent > drop:
+                result.append((key, earlier, recent))
+        return sorted(result, key=lambda item: item[2] - item[1])
+
+    def flush(self):
+        for series in (self.links, self.links_downsampled, self.nodes, self.nodes_downsampled):
+            series.flush()
+
+# A link is stored once, whatever node reports it
+def link_key(u, v):
+    return (u, v) if str(u) <= str(v) else (v, u)
+
+# Float values of the fields of a message, NaN when missing, None when all are missing
+def metric_values(message, fields):
+    values = []
+    for field in fields:
+        try:
+            values.append(float(message[field]))
+        except (KeyError, TypeError, ValueError):
+            values.append(np.nan)
+    if all(np.isnan(values)):
+        return None
+    return np.array(values, dtype=np.float32)
@@ -0,0 +1,99 @@
+"""
+Topology model
+The network graph of the DENIS-SDN Dashboard behind a lock. Only the tkinter
+main loop changes the graph (through apply and set_slice); worker threads such
+as CODET never read the live graph, they take a frozen snapshot that stays
+consistent while the ingest keeps going. Every change increases the model
+version, so a snapshot is copied at most once per version.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import networkx as nx
+
+from CODET import IncrementalCODET
+from compact_topology import CompactTopology, COMPACT_NODES
+from topology import apply_topology_message, has_changes, invalid_message, new_changes
+
+class TopologyModel:
+    def __init__(self, tN="00.00", metrics=None):  # tN Target Node, the border router
+        self.G = nx.Graph()
+        self.tN = tN
+        self.lock = threading.RLock()
+        # Connectivity to the border router, updated with every change
+        self.tracker = IncrementalCODET(self.G, tN)
+        self.metrics = metrics  # MetricsStore of the link and node metrics, optional
+        self.version = 0
+        self.frozen = None  # (version, frozen copy of G)
+
+    # Apply a topology snapshot or event, returns the changes
+    # A malformed message is rejected before anything changes
+    def apply(self, message):
+        with self.lock:
+            reason = invalid_message(message)
+            if reason is not None:
+                print('JSON message is not a topology:', reason)
+                return new_changes()
+            changes = apply_topology_message(self.tracker, message)
+            if self.metrics is not None:
+                self.metrics.record(message)
+                self.metrics.evict(self.G, changes)
+            if has_changes(changes):
+                self.version += 1
+            return changes
+
+    # The border routers, the targets of the connectivity
+    def border_routers(self):
+        with self.lock:
+            return sorted(self.tracker.targets)
+
+    # Region of every node, node -> BID of its border router
+    # The nodes that no border router tagged belong to the first one
+    def regions(self):
+        with self.lock:
+            region = dict(self.G.nodes(data='BID', default=self.tracker.tN))
+            for node in self.tracker.targets:
+                if node in region:
+                    region[node] = node
+            return region
+
+    # Change the slice of a node
+    def set_slice(self, node, slice_no):
+        with self.lock:
+            self.G.nodes[node]['slice'] = slice_no
+            self.version += 1
+
+    # Change the slices of many nodes, assignment: node -> slice
+    def set_slices(self, assignment):
+        with self.lock:
+            for node, slice_no in assignment.items():
+                if node in self.G:
+                    self.G.nodes[node]['slice'] = slice_no
+            self.version += 1
+
+    # (version, read-only copy of the graph) for the worker threads
+    # Large networks are copied to a CompactTopology, a fraction of the memory of a graph copy
+    def snapshot(self):
+        with self.lock:
+            if self.frozen is None or self.frozen[0] != self.version:
+                if self.G.number_of_nodes() >= COMPACT_NODES:
+                    self.frozen = (self.version, CompactTopology.from_graph(self.G))
+                else:
+                    self.frozen = (self.version, nx.freeze(self.G.copy()))
+            return self.frozen
@@ -0,0 +1,155 @@
+"""
+Node lists of the DENIS-SDN Dashboard
+The Slice Configurator and the Node Density Classifier lists are ttk.Treeview
+widgets: Tk draws only the visible rows, and every refresh updates the rows in
+place (rows are inserted, moved or deleted only when the network changes), so
+the memory stays flat however many topology messages arrive.
+The slice of a node is edited with a single combobox that is placed over the
+clicked row.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+NUMBER_OF_SLICES = 16
+
+# Visible rows of the lists
+LIST_ROWS = 18
+
+# Treeview style of the dashboard lists
+def list_style():
+    style = ttk.Style()
+    style.configure("Dashboard.Treeview", font=('Arial', 12), rowheight=24)
+    style.configure("Dashboard.Treeview.Heading", font=('Arial', 12), background="Light Gray", relief=tk.RAISED)
+    return "Dashboard.Treeview"
+
+class NodeList:
+    def __init__(self, parent, columns, headings, widths):
+        self.frame = tk.Frame(parent, highlightthickness=1, highlightbackground="black")
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", height=LIST_ROWS,
+                                 style=list_style(), selectmode="browse")
+        for column, heading, width in zip(columns, headings, widths):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor="w")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.tree.pack(side="left", fill="y")
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.nodes = {}   # row id -> node
+        self.rows = {}    # row id -> values shown
+        self.order = []   # row ids in the shown order
+
+    def grid(self, **kw):
+        self.frame.grid(**kw)
+
+    # Insert, update and delete rows so that the list shows `rows`
+    # rows: list of (node, values, tags) in the wanted order
+    def sync(self, rows):
+        tree = self.tree
+        wanted = {}
+        for node, values, tags in rows:
+            wanted[str(node)] = (node, values, tags)
+
+        for iid in [iid for iid in self.rows if iid not in wanted]:
+            tree.delete(iid)
+            del self.rows[iid]
+            del self.nodes[iid]
+
+        order = []
+        for index, (node, values, tags) in enumerate(rows):
+            iid = str(node)
+            order.append(iid)
+            shown = self.rows.get(iid)
+            if shown is None:
+                tree.insert("", index, iid=iid, values=values, tags=tags)
+                self.nodes[iid] = node
+            elif shown != (values, tags):
+                tree.item(iid, values=values, tags=tags)
+            self.rows[iid] = (values, tags)
+
+        # Move only the rows that are not in their place
+        if order != self.order:
+            current = list(tree.get_children(""))
+            if current != order:
+                for index, iid in enumerate(order):
+                    if current[index] != iid:
+                        tree.move(iid, "", index)
+                        current.remove(iid)
+                        current.insert(index, iid)
+        self.order = order
+
+class SliceConfiguratorList(NodeList):
+    def __init__(self, parent, on_change):
+        NodeList.__init__(self, parent, ("node", "slice"), ("Network Nodes", "Network Slice"), (120, 120))
+        self.on_change = on_change  # on_change(node, slice_no)
+        self.slices = ["Slice {}".format(i) for i in range(1, NUMBER_OF_SLICES + 1)]
+
+        # The combobox used to edit the slice of the clicked row
+        self.editor = ttk.Combobox(self.tree, values=self.slices, state="readonly", font=('Arial', 12), width=10)
+        self.editor.bind("<<ComboboxSelected>>", self.on_selected)
+        self.editor_row = None
+        self.tree.bind("<ButtonRelease-1>", self.on_click)
+        self.tree.bind("<MouseWheel>", lambda e: self.hide_editor(), add="+")
+        self.scrollbar.bind("<B1-Motion>", lambda e: self.hide_editor(), add="+")
+
+    def update(self, G):
+        self.sync([(node, ("Node {}".format(node), "Slice {}".format(attr.get('slice', 1))), ())
+                   for node, attr in G.nodes(data=True)])
+        if self.editor_row is not None and self.editor_row not in self.rows:
+            self.hide_editor()
+
+    def on_click(self, event):
+        iid = self.tree.identify_row(event.y)
+        if not iid or self.tree.identify_column(event.x) != "#2":
+            self.hide_editor()
+            return
+        x, y, width, height = self.tree.bbox(iid, "slice")
+        self.editor_row = iid
+        self.editor.set(self.tree.set(iid, "slice"))
+        self.editor.place(x=x, y=y, width=width, height=height)
+        self.editor.focus_set()
+
+    def hide_editor(self):
+        self.editor.place_forget()
+        self.editor_row = None
+
+    def on_selected(self, event):
+        iid = self.editor_row
+        selected_value = self.editor.get()
+        self.hide_editor()
+        if iid is None or iid not in self.nodes:
+            return
+        slice_no = int(selected_value[6:])  # remove the word Slice
+        values = (self.rows[iid][0][0], selected_value)
+        self.tree.item(iid, values=values)
+        self.rows[iid] = (values, ())
+        self.on_change(self.nodes[iid], slice_no)
+
+class DensityClassifierList(NodeList):
+    def __init__(self, parent):
+        NodeList.__init__(self, parent, ("node", "neighbors"), ("Network Nodes", "# Neighbors"), (120, 100))
+        for color in ('green', 'yellow', 'orange', 'red', 'gray'):
+            self.tree.tag_configure(color, background=color)
+
+    # neighbors: (node, degree, color) sorted from the node with most neighbors
+    def update(self, neighbors):
+        self.sync([(node, ("Node {}".format(node), degree), (color,) if color else ())
+                   for node, degree, color in neighbors])
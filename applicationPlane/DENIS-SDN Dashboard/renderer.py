@@ -0,0 +1,331 @@
+"""
+Network Density Visualizer renderer
+Draws the network graph with persistent matplotlib artists: one PathCollection
+for the nodes, one LineCollection for the links and a small pool of Text
+labels. Every frame draws only what is in view, with a level of detail:
+  - when more than DETAIL_NODES nodes are in view, the view is split in cells
+    of CLUSTER_PIXELS and the nodes of every cell are drawn as one aggregate
+    glyph, sized by its number of nodes and colored by the density color most
+    of them have; the links are drawn between the glyphs
+  - zooming in (mouse wheel) expands the glyphs into their nodes
+  - labels are shown only when at most LABEL_NODES nodes are in view
+  - at most MAX_EDGES links are drawn, evenly sampled
+so the cost of a frame depends on what is visible, not on the size of the
+network. Full redraws are throttled to a target frame rate. While a node is
+dragged, only the node, its links and its label are redrawn on top of a cached
+background (blitting).
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import time
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+
+from spatial_index import pixel_size
+
+# Target frame rate of the redraws
+TARGET_FPS = 30
+
+# Look of the graph, same as the networkx drawing functions used before
+NODE_SIZE = 500
+NODE_ALPHA = 0.7
+EDGE_COLOR = 'k'
+FONT_SIZE = 12
+DEFAULT_COLOR = 'lightblue'
+
+# Space around the graph, as a share of its size
+MARGIN = 0.1
+
+# Level of detail
+DETAIL_NODES = 400      # nodes in view drawn one by one
+DETAIL_SIZE = 120       # size of the nodes when they are too many for labels
+LABEL_NODES = 60        # labels shown when at most this many nodes are in view
+CLUSTER_PIXELS = 30     # screen cell of an aggregate glyph
+GLYPH_SIZE = 60         # size of a glyph of one node, grows with the square root of its nodes
+MAX_EDGES = 3000        # links drawn per frame
+
+# Zoom of one mouse wheel step
+ZOOM_STEP = 1.25
+
+class GraphRenderer:
+    def __init__(self, figure, canvas, fps=TARGET_FPS):
+        self.figure = figure
+        self.canvas = canvas
+        self.frame = 1.0 / fps
+        self.figure.clf()
+        self.ax = figure.add_subplot(111)
+        self.ax.axis("off")
+
+        self.nodes = []                 # row -> node
+        self.index = {}                 # node -> row
+        self.xy = np.zeros((0, 2))      # node positions
+        self.edges = np.zeros((0, 2), dtype=np.int64)  # rows of the linked nodes
+        self.topology_dirty = True
+
+        # Colors by row, as codes of the palette
+        self.palette = [DEFAULT_COLOR]
+        self.codes = {DEFAULT_COLOR: 0}
+        self.colors = np.zeros(0, dtype=np.int64)
+        self.node_colors = None         # the colors of the last update
+
+        # What the last frame shows
+        self.detail = True              # nodes drawn one by one
+        self.glyph = np.zeros(0, dtype=np.int64)  # row -> glyph, -1 out of view
+        self.shown_edges = np.zeros((0, 2), dtype=np.int64)  # rows of the links drawn (detail)
+        self.labels = []                # pool of Text artists
+        self.label_of = {}              # row -> label shown
+
+        self.node_artist = self.ax.scatter([], [], s=NODE_SIZE, alpha=NODE_ALPHA, zorder=2)
+        self.edge_artist = LineCollection([], colors=EDGE_COLOR, zorder=1)
+        self.ax.add_collection(self.edge_artist)
+
+        self.last_draw = 0.0
+        self.draw_timer = None
+        self.drag = None                # state of the node being dragged
+
+    # The nodes or links changed, the next draw rebuilds the artists
+    def topology_changed(self):
+        self.topology_dirty = True
+
+    # Draw the graph, the node rows are rebuilt only when the topology changed
+    def draw(self, G, pos, node_colors):
+        if self.drag is not None:
+            return
+        if self.topology_dirty:
+            self.set_graph(G, pos)
+            self.topology_dirty = False
+            self.node_colors = None
+            self.autoscale()
+        else:
+            self.update_positions(pos)
+        self.update_colors(node_colors)
+        self.request_draw()
+
+    def set_graph(self, G, pos):
+        self.nodes = [node for node in G if node in pos]
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.edges = np.array([(self.index[u], self.index[v]) for u, v in G.edges()
+                               if u in self.index and v in self.index], dtype=np.int64).reshape(-1, 2)
+        self.update_positions(pos)
+
+    def update_positions(self, pos):
+        self.xy = np.array([pos[node] for node in self.nodes], dtype=float).reshape(-1, 2)
+
+    def update_colors(self, node_colors):
+        if node_colors is self.node_colors and len(self.colors) == len(self.nodes):
+            return  # same colors as the last update
+        self.node_colors = node_colors
+        codes = self.codes
+        for color in set(node_colors.values()):
+            if color not in codes:
+                codes[color] = len(self.palette)
+                self.palette.append(color)
+        self.colors = np.array([codes[node_colors.get(node, DEFAULT_COLOR)] for node in self.nodes],
+                               dtype=np.int64)
+
+    # Fit the view to the graph
+    def autoscale(self):
+        if len(self.xy) == 0:
+            return
+        lo = self.xy.min(axis=0)
+        hi = self.xy.max(axis=0)
+        pad = np.maximum(hi - lo, 0.1) * MARGIN
+        self.ax.set_xlim(lo[0] - pad[0], hi[0] + pad[0])
+        self.ax.set_ylim(lo[1] - pad[1], hi[1] + pad[1])
+
+    # Zoom around (x, y), steps > 0 zoom in
+    def zoom(self, x, y, steps):
+        if self.drag is not None:
+            return
+        scale = ZOOM_STEP ** -steps
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        self.ax.set_xlim(x - (x - x0) * scale, x + (x1 - x) * scale)
+        self.ax.set_ylim(y - (y - y0) * scale, y + (y1 - y) * scale)
+        self.request_draw()
+
+    # True when the node is drawn on its own, not inside a glyph
+    def shown(self, node):
+        row = self.index.get(node)
+        return self.detail and row is not None and row < len(self.glyph) and self.glyph[row] >= 0
+
+    # Level of detail
+    # #######################################################
+    # Set the artists to what is in view
+    def render_view(self):
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        xy = self.xy
+        n = len(xy)
+        colors = self.colors if len(self.colors) == n else np.zeros(n, dtype=np.int64)
+        rows = np.nonzero((xy[:, 0] >= x0) & (xy[:, 0] <= x1) & (xy[:, 1] >= y0) & (xy[:, 1] <= y1))[0]
+        self.glyph = np.full(n, -1, dtype=np.int64)
+        self.detail = len(rows) <= DETAIL_NODES
+
+        if self.detail:
+            # Every node in view, and the links with a node in view
+            self.glyph[rows] = np.arange(len(rows))
+            offsets = xy[rows]
+            glyph_colors = colors[rows]
+            sizes = np.full(len(rows), NODE_SIZE if len(rows) <= LABEL_NODES else DETAIL_SIZE)
+            edges = self.edges[(self.glyph[self.edges] >= 0).any(axis=1)] if len(self.edges) else self.edges
+            edges = sample(edges, MAX_EDGES)
+            self.shown_edges = edges
+            segments = xy[edges]
+        else:
+            # One glyph per screen cell, at the mean position of its nodes
+            sx, sy = pixel_size(self.ax)
+            cell = np.array([CLUSTER_PIXELS * sx, CLUSTER_PIXELS * sy])
+            ij = np.floor((xy[rows] - [x0, y0]) / cell).astype(np.int64)
+            keys = ij[:, 0] * (int(np.ceil((y1 - y0) / cell[1])) + 1) + ij[:, 1]
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            inverse = inverse.reshape(-1)
+            self.glyph[rows] = inverse
+            offsets = np.stack([np.bincount(inverse, xy[rows, 0]), np.bincount(inverse, xy[rows, 1])], axis=1) / counts[:, None]
+            # Color most of the nodes of the glyph have
+            k = len(self.palette)
+            votes = np.bincount(inverse * k + colors[rows], minlength=len(counts) * k).reshape(-1, k)
+            glyph_colors = votes.argmax(axis=1)
+            sizes = np.minimum(GLYPH_SIZE * np.sqrt(counts), NODE_SIZE)
+            # Links between different glyphs, once per pair of glyphs
+            self.shown_edges = np.zeros((0, 2), dtype=np.int64)
+            ends = self.glyph[self.edges] if len(self.edges) else np.zeros((0, 2), dtype=np.int64)
+            ends = ends[(ends >= 0).all(axis=1) & (ends[:, 0] != ends[:, 1])]
+            ends = np.sort(ends, axis=1)
+            pairs = np.unique(ends[:, 0] * len(counts) + ends[:, 1])
+            ends = np.stack([pairs // len(counts), pairs % len(counts)], axis=1)
+            segments = offsets[sample(ends, MAX_EDGES)]
+
+        self.node_artist.set_offsets(offsets.reshape(-1, 2))
+        self.node_artist.set_sizes(sizes)
+        self.node_artist.set_facecolor([to_rgba(self.palette[code]) for code in glyph_colors.tolist()] or DEFAULT_COLOR)
+        self.edge_artist.set_segments(segments.reshape(-1, 2, 2))
+        self.set_labels(rows if self.detail and len(rows) <= LABEL_NODES else ())
+
+    # Show the labels of the rows, the Text artists are reused
+    def set_labels(self, rows):
+        self.label_of = {}
+        for i, row in enumerate(rows):
+            if i == len(self.labels):
+                self.labels.append(self.ax.text(0, 0, "", fontsize=FONT_SIZE, ha='center', va='center',
+                                                zorder=3, clip_on=True))
+            label = self.labels[i]
+            label.set_text(str(self.nodes[row]))
+            label.set_position(self.xy[row])
+            label.set_visible(True)
+            self.label_of[int(row)] = label
+        for label in self.labels[len(rows):]:
+            label.set_visible(False)
+
+    # Redraw at most once per frame
+    def request_draw(self):
+        wait = self.last_draw + self.frame - time.perf_counter()
+        if wait <= 0:
+            self.draw_now()
+        elif self.draw_timer is None:
+            self.draw_timer = self.canvas.new_timer(interval=int(wait * 1000) + 1)
+            self.draw_timer.single_shot = True
+            self.draw_timer.add_callback(self.draw_now)
+            self.draw_timer.start()
+
+    def draw_now(self):
+        if self.draw_timer is not None:
+            self.draw_timer.stop()
+            self.draw_timer = None
+        self.last_draw = time.perf_counter()
+        if self.drag is None:
+            self.render_view()
+        self.canvas.draw_idle()
+
+    # Drag and drop with blitting
+    # The dragged node, its links and its label are moved to animated artists
+    # and the rest of the graph is cached as the background
+    # Only a node drawn on its own can be dragged, returns False for the nodes inside a glyph
+    def begin_drag(self, node):
+        if not self.shown(node) or self.drag is not None:
+            return False
+        row = self.index[node]
+        incident = self.edges[(self.edges == row).any(axis=1)]
+        others = self.shown_edges[~(self.shown_edges == row).any(axis=1)]
+
+        sizes = self.node_artist.get_sizes().copy()
+        size = sizes[self.glyph[row]] if len(sizes) > 1 else NODE_SIZE
+        sizes[self.glyph[row]] = 0
+        self.node_artist.set_sizes(sizes)
+        self.edge_artist.set_segments(self.xy[others].reshape(-1, 2, 2))
+        if row in self.label_of:
+            self.label_of[row].set_visible(False)
+
+        color = to_rgba(self.palette[self.colors[row]] if row < len(self.colors) else DEFAULT_COLOR)
+        point = self.ax.scatter([self.xy[row, 0]], [self.xy[row, 1]], s=size,
+                                color=[color[:3]], alpha=NODE_ALPHA, zorder=2, animated=True)
+        links = LineCollection(self.xy[incident].reshape(-1, 2, 2), colors=EDGE_COLOR, zorder=1, animated=True)
+        self.ax.add_collection(links)
+        label = self.ax.text(self.xy[row, 0], self.xy[row, 1], str(node), fontsize=FONT_SIZE,
+                             ha='center', va='center', zorder=3, animated=True,
+                             visible=row in self.label_of)
+
+        self.canvas.draw()
+        self.drag = {
+            'node': node,
+            'row': row,
+            'incident': incident,
+            'point': point,
+            'links': links,
+            'label': label,
+            'background': self.canvas.copy_from_bbox(self.ax.bbox),
+            'last': 0.0,
+        }
+        self.blit()
+        return True
+
+    def move_drag(self, xy):
+        if self.drag is None:
+            return
+        row = self.drag['row']
+        self.xy[row] = xy
+        self.drag['point'].set_offsets([xy])
+        self.drag['links'].set_segments(self.xy[self.drag['incident']].reshape(-1, 2, 2))
+        self.drag['label'].set_position(xy)
+        if time.perf_counter() - self.drag['last'] >= self.frame:
+            self.blit()
+
+    def blit(self):
+        self.drag['last'] = time.perf_counter()
+        self.canvas.restore_region(self.drag['background'])
+        self.ax.draw_artist(self.drag['links'])
+        self.ax.draw_artist(self.drag['point'])
+        self.ax.draw_artist(self.drag['label'])
+        self.canvas.blit(self.ax.bbox)
+
+    def end_drag(self):
+        if self.drag is None:
+            return
+        drag = self.drag
+        self.drag = None
+        for artist in ('point', 'links', 'label'):
+            drag[artist].remove()
+        self.draw_now()
+
+# At most limit rows, evenly spaced so the same links stay drawn between frames
+def sample(rows, limit):
+    if len(rows) <= limit:
+        return rows
+    return rows[np.linspace(0, len(rows) - 1, limit).astype(np.int64)]
@@ -0,0 +1,138 @@
+"""
+Bulk slice assignment
+Assigns slices to many nodes at once, either by rules or by an automatic
+partition of the network. Every function returns an assignment, a dict
+node -> slice, that is applied with TopologyModel.set_slices and pushed to the
+controller with SlicePusher.
+Rules select the nodes by class, by ID range or by density color.
+The automatic partition grows all the slices together from the neighbors of the
+border router, one BFS layer at a time: every node joins the slice of one of its
+neighbors in the previous layer, the slice with the smallest expected size
+(the nodes already in it plus the nodes behind them in a spanning tree). A few
+refinement passes re-estimate the sizes with the tree of the previous pass.
+Every slice stays connected to the border router, which belongs to all of them,
+and every pass runs in O(N + E), so it scales to large networks. Slices can be
+balanced only as far as the network allows: a border router with d neighbors
+serves at most d slices, and the nodes behind a cut node share its slice.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from collections import deque
+
+from topology import border_routers
+
+# Refinement passes of the automatic partition
+PARTITION_PASSES = 4
+
+# Sort key of a node ID, "02.10" -> (2, 10)
+def node_key(node):
+    try:
+        return tuple(int(part) for part in str(node).split('.'))
+    except ValueError:
+        return (str(node),)
+
+# Nodes of a class, e.g. "Node" or "Border Router"
+def select_by_class(G, n_class):
+    return [node for node, attr in G.nodes(data=True) if attr.get('n_class') == n_class]
+
+# Nodes with IDs from first to last, both included, e.g. ("02.00", "10.00")
+def select_by_id_range(G, first, last):
+    first, last = node_key(first), node_key(last)
+    return [node for node in G if first <= node_key(node) <= last]
+
+# Nodes with the given density colors, node_colors from the DensityClassifier
+def select_by_color(node_colors, colors):
+    return [node for node, color in node_colors.items() if color in colors]
+
+# Assignment of the selected nodes to one slice, the border routers are left out
+def assign(nodes, slice_no, tN=None):
+    targets = set(border_routers(tN))
+    return {node: slice_no for node in nodes if node not in targets}
+
+# Balanced partition of the nodes connected to tN into n_slices slices (1..n_slices)
+# tN is one border router or a list of them, a node may be connected to any of them
+# Returns the assignment and the nodes that are not connected to tN
+def auto_partition(G, n_slices, tN="00.00", passes=PARTITION_PASSES):
+    targets = [node for node in border_routers(tN) if node in G]
+    if not targets or n_slices < 1:
+        excluded = set(border_routers(tN))
+        return {}, [node for node in G if node not in excluded]
+
+    # BFS layers from the border routers
+    depth = dict.fromkeys(targets, 0)
+    parent = {}  # spanning tree used to estimate the nodes behind a node
+    order = []
+    queue = deque(targets)
+    while queue:
+        node = queue.popleft()
+        for n in G.neighbors(node):
+            if n not in depth:
+                depth[n] = depth[node] + 1
+                parent[n] = node
+                order.append(n)
+                queue.append(n)
+    # Neighbors one layer closer to the border router
+    parents = {node: [n for n in G.neighbors(node) if depth.get(n) == depth[node] - 1] for node in order}
+    first = [node for node in order if depth[node] == 1]
+    rest = [node for node in order if depth[node] > 1]
+    all_slices = range(1, n_slices + 1)
+
+    best = None
+    for _ in range(passes):
+        # Nodes behind every node in the spanning tree
+        weight = dict.fromkeys(order, 1)
+        for node in reversed(rest):
+            weight[parent[node]] += weight[node]
+
+        # Every node joins the slice of one of its parents, so it is connected
+        # to tN inside its slice, the one with the smallest expected size
+        assignment = {}
+        expected = [0] * (n_slices + 1)
+        for node in sorted(first, key=lambda n: -weight[n]) + rest:
+            w = weight[node]
+            if depth[node] == 1:
+                options = all_slices
+                current = None
+            else:
+                options = set(assignment[n] for n in parents[node])
+                current = assignment[parent[node]]
+            slice_no = min(options, key=lambda s: (expected[s] - (w if s == current else 0), s))
+            if slice_no != current:
+                # The node and the nodes behind it move to the new slice
+                if current is not None:
+                    expected[current] -= w
+                    parent[node] = next(n for n in parents[node] if assignment[n] == slice_no)
+                expected[slice_no] += w
+            assignment[node] = slice_no
+
+        # The next pass estimates the sizes with the tree of this assignment
+        largest = max(slice_sizes(assignment).values(), default=0)
+        if best is not None and largest >= best[0]:
+            break
+        best = (largest, assignment)
+
+    unreachable = [node for node in G if node not in depth]
+    return best[1], unreachable
+
+# Sizes of the slices of an assignment
+def slice_sizes(assignment):
+    sizes = {}
+    for slice_no in assignment.values():
+        sizes[slice_no] = sizes.get(slice_no, 0) + 1
+    return sizes
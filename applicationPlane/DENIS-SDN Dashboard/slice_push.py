@@ -0,0 +1,188 @@
+"""
+Slice configuration push
+Sends to the DENIS-SDN Controller only the slice assignments that changed since
+the last acknowledged push, as compact JSON batches:
+  SC - slice configuration   {"PTY":"SC","SEQ":7,"ST":"Logically-Sliced","S":{"02.00":3,"05.00":1}}
+  SA - acknowledgement       {"PTY":"SA","SEQ":7}
+ST (the slicing type) is sent only when it changed. At most WINDOW batches are
+waiting for their acknowledgement, so a reslicing of thousands of nodes is
+paced by the controller instead of flooding the control channel and the
+bandwidth-limited border router. Batches that are not acknowledged in
+ACK_TIMEOUT seconds are sent again.
+A controller that never acknowledged any batch does not speak SC/SA: when a
+batch is dropped before the first SA, the pusher falls back to the original
+full push, the node-link data of the whole graph with its "sliceType", and
+keeps using it. The protocol is described in applicationPlane/README.md.
+All the methods run in the thread that polls the dashboard core.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import time
+
+# Slice assignments per SC message
+SLICE_BATCH = 64
+
+# SC messages waiting for their acknowledgement
+WINDOW = 4
+
+# Seconds before an SC message is sent again, and attempts before it is dropped
+ACK_TIMEOUT = 5.0
+ACK_RETRIES = 3
+
+# JSON without spaces or indentation, one message per line
+def compact_json(data):
+    return json.dumps(data, separators=(',', ':')) + "\n"
+
+# Full slice configuration of the controllers without SC/SA, the node-link data
+# of the graph (networkx json_graph format) and the slicing type
+def full_configuration(G, slice_type):
+    return {'directed': False, 'multigraph': False, 'graph': {},
+            'nodes': [dict(attr, id=node) for node, attr in G.nodes(data=True)],
+            'links': [dict(attr, source=u, target=v) for u, v, attr in G.edges(data=True)],
+            'sliceType': str(slice_type)}
+
+class SlicePusher:
+    def __init__(self, link):
+        self.link = link          # ControllerLink
+        self.dirty = {}           # node -> slice changed by the user, not acknowledged yet
+        self.acked = {}           # node -> slice acknowledged by the controller
+        self.slice_type = None    # slicing type acknowledged by the controller
+        self.queued = []          # SC messages waiting to be sent
+        self.in_flight = {}       # SEQ -> [message, sent time, attempts]
+        self.pending = {}         # node -> (SEQ, slice) of its last queued or in-flight assignment
+        self.seq = 0
+        self.protocol = None      # None until known, "SC" after the first SA, "full" after the fallback
+        self.G = None             # graph of the last push, for the fallback
+
+    # The user changed the slice of a node
+    # It is up to date only when the controller has it and no other slice is on the way,
+    # a node reverted while another slice is in flight stays dirty
+    def mark(self, node, slice_no):
+        pending = self.pending.get(node)
+        if self.acked.get(node) == slice_no and (pending is None or pending[1] == slice_no):
+            self.dirty.pop(node, None)
+        else:
+            self.dirty[node] = slice_no
+
+    # Queue the changed assignments of the nodes still in G, returns the number queued
+    def push(self, G, slice_type):
+        self.G = G
+        for node in [node for node in self.dirty if node not in G]:
+            del self.dirty[node]
+        if self.protocol == "full":
+            return self.push_full(slice_type)
+        # Assignments already queued or in flight are not sent twice
+        changed = [(node, slice_no) for node, slice_no in self.dirty.items()
+                   if self.pending.get(node, (None, None))[1] != slice_no]
+        new_type = slice_type != self.slice_type and not any('ST' in message for message in self.queued)
+
+        if not changed and not new_type:
+            print("Slice configuration is up to date")
+            return 0
+        for start in range(0, max(len(changed), 1), SLICE_BATCH):
+            self.seq += 1
+            message = {'PTY': 'SC', 'SEQ': self.seq, 'S': dict(changed[start:start + SLICE_BATCH])}
+            if new_type and start == 0:
+                message['ST'] = slice_type
+            for node, slice_no in message['S'].items():
+                self.pending[node] = (self.seq, slice_no)
+            self.queued.append(message)
+        print("Slice configuration:", len(changed), "node(s) in", -(-len(changed) // SLICE_BATCH), "batch(es)")
+        self.send_window()
+        return len(changed)
+
+    # Send queued messages while the window has room
+    def send_window(self):
+        while self.queued and len(self.in_flight) < WINDOW:
+            message = self.queued[0]
+            if self.link.send(compact_json(message)) is None:
+                return  # not connected, kept for the next poll
+            self.queued.pop(0)
+            self.in_flight[message['SEQ']] = [message, time.monotonic(), 1]
+
+    # An acknowledgement of the controller, returns True when the message was an SA
+    def ack(self, message):
+        if not isinstance(message, dict) or message.get('PTY') != 'SA':
+            return False
+        self.protocol = "SC"
+        entry = self.in_flight.pop(message.get('SEQ'), None)
+        if entry is not None:
+            sent = entry[0]
+            self.settle(sent)
+            for node, slice_no in sent['S'].items():
+                self.acked[node] = slice_no
+                if self.dirty.get(node) == slice_no:
+                    del self.dirty[node]
+            if 'ST' in sent:
+                self.slice_type = sent['ST']
+            self.send_window()
+        return True
+
+    # The assignments of an SC message are no longer on the way
+    def settle(self, message):
+        for node in message['S']:
+            if self.pending.get(node, (None,))[0] == message['SEQ']:
+                del self.pending[node]
+
+    # Resend the messages that timed out, called periodically
+    # Returns True when a message was dropped
+    def poll(self):
+        now = time.monotonic()
+        dropped = False
+        for seq, entry in list(self.in_flight.items()):
+            message, sent, attempts = entry
+            if now - sent < ACK_TIMEOUT:
+                continue
+            if attempts >= ACK_RETRIES:
+                print("Slice configuration", seq, "was not acknowledged, dropped")
+                del self.in_flight[seq]  # the nodes stay dirty for the next push
+                self.settle(message)
+                dropped = True
+                if self.protocol is None:
+                    self.fall_back(message.get('ST', self.slice_type))
+                    return dropped
+                continue
+            if self.link.send(compact_json(message)) is not None:
+                entry[1] = now
+                entry[2] = attempts + 1
+        self.send_window()
+        return dropped
+
+    # The controller never acknowledged a batch, switch to the full push
+    def fall_back(self, slice_type):
+        print("The controller does not acknowledge the slice configuration batches, sending the full configuration")
+        self.protocol = "full"
+        self.queued = []
+        self.in_flight = {}
+        self.pending = {}
+        if self.G is not None:
+            self.push_full(slice_type)
+
+    # Send the whole graph, there is no acknowledgement: the nodes are up to date once it is sent
+    # Returns the number of changed nodes sent
+    def push_full(self, slice_type):
+        if self.link.send(compact_json(full_configuration(self.G, slice_type))) is None:
+            return 0  # not connected, the nodes stay dirty
+        changed = len(self.dirty)
+        self.acked.update(self.dirty)
+        self.dirty = {}
+        self.slice_type = slice_type
+        print("Full slice configuration sent,", changed, "changed node(s)")
+        return changed
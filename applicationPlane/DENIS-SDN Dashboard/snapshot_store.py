@@ -0,0 +1,176 @@
+"""
+Snapshot persistence
+The last known topology, the node positions (and the nodes pinned by the user),
+the slice assignments, the slice edits not yet acknowledged by the controller
+and the result of the last CODET run are saved in one NumPy .npz file:
+  ids, descs, classes  JSON of the node IDs, descriptions and class names
+  slices, attrs        JSON of the slice values, and of the other node attributes
+                       (e.g. BID, ENG) as [row, attributes]
+  slice, n_class       node columns by row, indexes in slices and classes
+  edges                (E,2) rows of the linked nodes, with the link metrics
+  xy, placed, pinned   node positions by row
+  dirty, disconnected  masks by row
+The file is written to a temporary file and renamed, so a crash never leaves a
+broken snapshot. At startup the snapshot is read in a background thread and fed
+to the dashboard as a node-link snapshot message, so the view appears
+immediately; the live messages of the controller reconcile it afterwards.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import threading
+import time
+import numpy as np
+
+from compact_topology import CompactTopology
+
+SNAPSHOT_VERSION = 2
+
+# Save the graph and the dashboard state
+# G: graph or CompactTopology, pos: {node: (x, y)}, pinned, dirty, disconnected: sets of nodes
+def save_snapshot(path, G, pos, pinned=(), dirty=(), disconnected=()):
+    T = G if isinstance(G, CompactTopology) else CompactTopology.from_graph(G)
+    ids = T.ids
+    xy = np.array([pos.get(node, (np.nan, np.nan)) for node in ids], dtype=np.float64).reshape(-1, 2)
+    edges = T.edge_array()
+    keep = np.repeat(np.arange(len(ids)), np.diff(T.indptr)) < T.indices
+    arrays = {
+        'version': np.array(SNAPSHOT_VERSION),
+        'saved': np.array(time.time()),
+        'ids': np.array(json.dumps(ids)),
+        'descs': np.array(json.dumps([T.descs.get(node, node) for node in ids])),
+        'classes': np.array(json.dumps(T.classes)),
+        'slices': np.array(json.dumps(plain(T.slice_values))),
+        'attrs': np.array(json.dumps(plain([[T.index[node], attr] for node, attr in T.attrs.items()]))),
+        'slice': T.slice,
+        'n_class': T.n_class,
+        'edges': edges.astype(np.int32),
+        'xy': xy,
+        'placed': ~np.isnan(xy).any(axis=1),
+        'pinned': np.array([node in pinned for node in ids], dtype=bool),
+        'dirty': np.array([node in dirty for node in ids], dtype=bool),
+        'disconnected': np.array([node in disconnected for node in ids], dtype=bool),
+    }
+    for metric, values in T.link_metrics.items():
+        arrays['link_' + metric] = values[keep]
+
+    temp = path + '.tmp'
+    with open(temp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(temp, path)
+
+# NumPy numbers as Python numbers, for JSON
+def plain(value):
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+# Read a snapshot, returns None when there is none or it cannot be read
+# The result has the node-link 'message' and the 'pos', 'pinned', 'dirty',
+# 'disconnected' and 'saved' state of the dashboard
+def load_snapshot(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            if int(data['version']) != SNAPSHOT_VERSION:
+                print("Snapshot", path, "has another version, ignored")
+                return None
+            ids = json.loads(str(data['ids']))
+            descs = json.loads(str(data['descs']))
+            classes = json.loads(str(data['classes']))
+            slice_values = json.loads(str(data['slices']))
+            attrs = {ids[row]: attr for row, attr in json.loads(str(data['attrs']))}
+            slices = [slice_values[code] for code in data['slice'].tolist()]
+            n_class = data['n_class'].tolist()
+            edges = data['edges'].tolist()
+            metrics = {name[5:]: data[name].tolist() for name in data.files if name.startswith('link_')}
+            xy = data['xy'].tolist()
+            placed = data['placed']
+            pinned = data['pinned']
+            dirty = data['dirty']
+            disconnected = data['disconnected']
+            saved = float(data['saved'])
+    except (OSError, KeyError, ValueError) as e:
+        print("Snapshot", path, "cannot be read:", e)
+        return None
+
+    nodes = [dict(attrs.get(node, {}), id=node, desc=desc, slice=node_slice, **{'class': classes[code]})
+             for node, desc, node_slice, code in zip(ids, descs, slices, n_class)]
+    links = []
+    for i, (u, v) in enumerate(edges):
+        link = {'source': ids[u], 'target': ids[v]}
+        for metric, values in metrics.items():
+            if values[i] == values[i]:  # not NaN
+                link[metric] = values[i]
+        links.append(link)
+    return {
+        'message': {'nodes': nodes, 'links': links},
+        'pos': {node: tuple(p) for node, p, ok in zip(ids, xy, placed.tolist()) if ok},
+        'pinned': set(node for node, ok in zip(ids, pinned.tolist()) if ok),
+        'dirty': {node: node_slice for node, node_slice, ok in zip(ids, slices, dirty.tolist()) if ok},
+        'disconnected': set(node for node, ok in zip(ids, disconnected.tolist()) if ok),
+        'saved': saved,
+    }
+
+# Read the snapshot in a background thread, on_loaded(snapshot) is called with the result
+def load_snapshot_async(path, on_loaded):
+    def work():
+        snapshot = load_snapshot(path)
+        if snapshot is not None:
+            on_loaded(snapshot)
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    return thread
+
+# Save in a background thread, at most one save at a time
+class SnapshotWriter:
+    def __init__(self, path):
+        self.path = path
+        self.worker = None
+
+    def busy(self):
+        return self.worker is not None and self.worker.is_alive()
+
+    # Returns False when a save is already running
+    def save_async(self, G, pos, pinned=(), dirty=(), disconnected=()):
+        if self.busy():
+            return False
+        def work():
+            try:
+                save_snapshot(self.path, G, pos, pinned, dirty, disconnected)
+            except OSError as e:
+                print("Snapshot", self.path, "cannot be written:", e)
+        self.worker = threading.Thread(target=work, daemon=True)
+        self.worker.start()
+        return True
+
+    # Wait for a running save, then save in this thread
+    def save(self, G, pos, pinned=(), dirty=(), disconnected=()):
+        if self.busy():
+            self.worker.join()
+        try:
+            save_snapshot(self.path, G, pos, pinned, dirty, disconnected)
+        except OSError as e:
+            print("Snapshot", self.path, "cannot be written:", e)
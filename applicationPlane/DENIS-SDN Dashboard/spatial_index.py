@@ -0,0 +1,91 @@
+"""
+Spatial index of the node positions
+Grid buckets over the positions of the Network Density Visualizer, used to pick
+the node under the mouse. Only the buckets around the mouse are searched, and
+the nearest node is chosen by its distance on the screen, so picking stays
+correct in dense clusters and at any zoom level.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+
+# Data units of one screen pixel in the x and y directions of the axes
+def pixel_size(ax):
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    bbox = ax.get_window_extent()
+    return abs(x1 - x0) / max(bbox.width, 1), abs(y1 - y0) / max(bbox.height, 1)
+
+class SpatialIndex:
+    def __init__(self, pos=None):
+        self.rebuild(pos or {})
+
+    # Bucket all the positions again, about one node per cell
+    def rebuild(self, pos):
+        self.pos = {node: (float(x), float(y)) for node, (x, y) in pos.items()}
+        self.buckets = {}
+        self.dirty = False
+        if not self.pos:
+            self.cell = 1.0
+            return
+        xy = np.array(list(self.pos.values()), dtype=float)
+        extent = max(np.ptp(xy[:, 0]), np.ptp(xy[:, 1]), 1e-6)
+        self.cell = extent / max(np.sqrt(len(xy)), 1)
+        cells = np.floor(xy / self.cell).astype(np.int64).tolist()
+        for node, (i, j) in zip(self.pos, cells):
+            self.buckets.setdefault((i, j), []).append(node)
+
+    def key(self, x, y):
+        return int(np.floor(x / self.cell)), int(np.floor(y / self.cell))
+
+    # Move a single node, e.g. after a drag
+    def move(self, node, xy):
+        old = self.pos.get(node)
+        if old is not None:
+            bucket = self.buckets.get(self.key(*old))
+            if bucket is not None and node in bucket:
+                bucket.remove(node)
+        self.pos[node] = (float(xy[0]), float(xy[1]))
+        self.buckets.setdefault(self.key(*xy), []).append(node)
+
+    # Nearest node to (x, y) inside the ellipse of radii (rx, ry) in data units
+    # The distance is measured in units of the radii, i.e. on the screen
+    def nearest(self, x, y, rx, ry):
+        if not self.pos:
+            return None
+        i0, j0 = self.key(x - rx, y - ry)
+        i1, j1 = self.key(x + rx, y + ry)
+
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self.buckets):
+            # Zoomed out, cheaper to check every bucket
+            candidates = [node for bucket in self.buckets.values() for node in bucket]
+        else:
+            candidates = []
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    candidates.extend(self.buckets.get((i, j), ()))
+        if not candidates:
+            return None
+
+        xy = np.array([self.pos[node] for node in candidates], dtype=float)
+        dist2 = ((xy[:, 0] - x) / rx) ** 2 + ((xy[:, 1] - y) / ry) ** 2
+        best = int(np.argmin(dist2))
+        if dist2[best] > 1.0:
+            return None
+        return candidates[best]
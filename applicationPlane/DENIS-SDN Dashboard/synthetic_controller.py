@@ -0,0 +1,274 @@
+"""
+Synthetic DENIS-SDN Controller
+A local stand-in for the DENIS-SDN Controller, to drive the dashboard without
+a real network. It generates an ultra-dense IoT topology, connects to the
+dashboard feed port (8993), sends the node-link snapshot and the border router
+announcements, and then streams churn events at a given rate:
+  NB  link quality updates and new links
+  RL  removed links
+  NN  new nodes, followed by the NB reports of their links
+  RN  removed nodes
+The slice configuration pushed by the dashboard (SC) on the same connection is
+applied to the generated topology and acknowledged (SA).
+With several border routers every node belongs to the region of its nearest
+border router, and its snapshot entry and events carry that BID.
+
+Usage: python synthetic_controller.py [--nodes 1000] [--degree 12] [--distribution uniform]
+                                      [--slices 4] [--border-routers 1] [--churn 50] [--duration 60]
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from collections import deque
+
+from benchmark_CODET import DISTRIBUTIONS, generate_topology
+from ingest import JSONStreamDecoder
+
+# Share of every kind of churn event
+CHURN_MIX = (('update', 0.70), ('link', 0.10), ('unlink', 0.10), ('join', 0.05), ('leave', 0.05))
+
+# Links of a node that joins the network
+JOIN_LINKS = 4
+
+# Range of the link metrics of the NB reports
+RSS_RANGE = (-90, -40)
+LQI_RANGE = (40, 110)
+
+class SyntheticController:
+    def __init__(self, n_nodes=1000, avg_degree=12, distribution="uniform", n_slices=4, churn=0.0,
+                 host='localhost', port=8993, tN="00.00", seed=1, n_border_routers=1):
+        self.tN = tN  # the first border router
+        self.host = host
+        self.port = port
+        self.churn = churn  # events per second
+        self.rnd = random.Random(seed)
+        self.G = generate_topology(n_nodes, avg_degree, n_slices, seed, distribution)
+        others = [node for node in self.G if node != tN]
+        self.border_routers = [tN] + self.rnd.sample(others, min(n_border_routers - 1, len(others)))
+        for BID in self.border_routers:
+            self.G.nodes[BID]['n_class'] = "Border Router"
+        self.region = self.regions()                   # node -> BID
+        self.nodes = list(self.G)                      # nodes that can be picked
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.next_id = n_nodes
+        self.lock = threading.Lock()  # the reader thread applies the slice configuration
+        self.send_lock = threading.Lock()
+        self.sock = None
+        self.reader = None
+        self.stop_flag = threading.Event()
+        self.sent = 0            # messages sent
+        self.sent_bytes = 0
+        self.slice_batches = 0   # SC messages received
+        self.slice_updates = 0   # slice assignments received
+
+    # Every node reports to its nearest border router, multi-source BFS
+    # The nodes with no path to any border router report to the first one
+    def regions(self):
+        region = {BID: BID for BID in self.border_routers}
+        q = deque(self.border_routers)
+        while q:
+            current = q.popleft()
+            for node in self.G.neighbors(current):
+                if node not in region:
+                    region[node] = region[current]
+                    q.append(node)
+        for node in self.G:
+            region.setdefault(node, self.tN)
+        return region
+
+    # Connect to the dashboard and start reading the slice configuration
+    def connect(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.sock = socket.create_connection((self.host, self.port))
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+        self.reader = threading.Thread(target=self.read_slice_configuration, daemon=True)
+        self.reader.start()
+
+    def close(self):
+        self.stop_flag.set()
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+            self.sock = None
+
+    def send(self, messages):
+        data = "".join(json.dumps(message, separators=(',', ':')) + "\n" for message in messages).encode()
+        with self.send_lock:
+            self.sock.sendall(data)
+            self.sent += len(messages)
+            self.sent_bytes += len(data)
+
+    # Node-link snapshot of the whole topology
+    def snapshot_message(self):
+        with self.lock:
+            nodes = [{'id': node, 'desc': attr['desc'], 'slice': attr['slice'], 'class': attr['n_class'],
+                      'BID': self.region[node]} for node, attr in self.G.nodes(data=True)]
+            links = [dict(attr, source=u, target=v) for u, v, attr in self.G.edges(data=True)]
+        return {'nodes': nodes, 'links': links}
+
+    def send_snapshot(self):
+        self.send([self.snapshot_message()] + [{'PTY': 'BR', 'BID': BID} for BID in self.border_routers])
+
+    # Stream churn events for a number of seconds (None: until close), or a number of events
+    def run(self, duration=None, events=None):
+        start = time.monotonic()
+        sent = 0
+        while not self.stop_flag.is_set():
+            if duration is not None and time.monotonic() - start >= duration:
+                break
+            if events is not None and sent >= events:
+                break
+            if self.churn > 0:
+                # Events due since the start, sent in one write
+                due = int((time.monotonic() - start) * self.churn) - sent
+                if events is not None:
+                    due = min(due, events - sent)
+                if due <= 0:
+                    time.sleep(min(0.05, 1.0 / self.churn))
+                    continue
+            else:
+                due = events - sent if events is not None else 1000
+            messages = []
+            for _ in range(due):
+                messages += self.churn_event()
+            self.send(messages)
+            sent += due
+        return sent
+
+    # Messages of one random churn event
+    def churn_event(self):
+        with self.lock:
+            kind = self.rnd.choices([kind for kind, _ in CHURN_MIX], [share for _, share in CHURN_MIX])[0]
+            if kind == 'update' or kind == 'unlink':
+                node = self.pick()
+                neighbors = list(self.G.neighbors(node))
+                if not neighbors:
+                    kind = 'link'
+                else:
+                    nbr = self.rnd.choice(neighbors)
+                    if kind == 'unlink':
+                        self.G.remove_edge(node, nbr)
+                        return [{'PTY': 'RL', 'NID': node, 'NBR': nbr}]
+                    return [self.neighbor_report(node, nbr)]
+            if kind == 'link':
+                node, nbr = self.pick(), self.pick()
+                if node == nbr:
+                    return []
+                return [self.neighbor_report(node, nbr)]
+            if kind == 'join':
+                node = "{:02d}.00".format(self.next_id)
+                self.next_id += 1
+                anchor = self.pick()
+                nbrs = [anchor] + self.rnd.sample(list(self.G.neighbors(anchor)), min(JOIN_LINKS - 1, self.G.degree(anchor)))
+                self.G.add_node(node, desc=node, slice=1, n_class="Node")
+                self.region[node] = self.region[anchor]
+                self.index[node] = len(self.nodes)
+                self.nodes.append(node)
+                messages = [{'PTY': 'NN', 'BID': self.region[node], 'NID': node, 'ENG': self.rnd.randint(50, 100)}]
+                return messages + [self.neighbor_report(node, nbr) for nbr in nbrs]
+            # leave, the border routers stay
+            node = self.pick()
+            if node in self.region and self.region[node] == node:
+                return []
+            self.G.remove_node(node)
+            del self.region[node]
+            last = self.nodes.pop()
+            if last != node:
+                self.nodes[self.index[node]] = last
+                self.index[last] = self.index[node]
+            del self.index[node]
+            return [{'PTY': 'RN', 'NID': node}]
+
+    def pick(self):
+        return self.rnd.choice(self.nodes)
+
+    # NB report of a link with new metrics, adds the link when it is new
+    def neighbor_report(self, node, nbr):
+        metrics = {'RSS': self.rnd.randint(*RSS_RANGE), 'SSS': self.rnd.randint(*RSS_RANGE),
+                   'LQI': self.rnd.randint(*LQI_RANGE)}
+        self.G.add_edge(node, nbr, **metrics)
+        return dict(metrics, PTY='NB', NID=node, NBR=nbr, BID=self.region[node], ENG=self.rnd.randint(50, 100))
+
+    # SC messages of the dashboard, applied and acknowledged with SA
+    def read_slice_configuration(self):
+        decoder = JSONStreamDecoder()
+        while not self.stop_flag.is_set():
+            try:
+                data = self.sock.recv(65536)
+            except (OSError, AttributeError):
+                break
+            if not data:
+                break
+            for message in decoder.feed(data):
+                if message.get('PTY') != 'SC':
+                    continue
+                with self.lock:
+                    for node, slice_no in message.get('S', {}).items():
+                        if node in self.G:
+                            self.G.nodes[node]['slice'] = slice_no
+                    self.slice_batches += 1
+                    self.slice_updates += len(message.get('S', {}))
+                try:
+                    self.send([{'PTY': 'SA', 'SEQ': message['SEQ']}])
+                except OSError:
+                    break
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic DENIS-SDN Controller")
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--degree", type=int, default=12, help="average node degree")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--slices", type=int, default=4)
+    parser.add_argument("--border-routers", type=int, default=1, help="border routers, every one with its own region")
+    parser.add_argument("--churn", type=float, default=10.0, help="churn events per second")
+    parser.add_argument("--duration", type=float, default=None, help="seconds, until Ctrl+C when not given")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8993, help="feed port of the dashboard")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    controller = SyntheticController(args.nodes, args.degree, args.distribution, args.slices, args.churn,
+                                     args.host, args.port, seed=args.seed, n_border_routers=args.border_routers)
+    print("Topology of", controller.G.number_of_nodes(), "nodes and", controller.G.number_of_edges(), "links")
+    controller.connect()
+    controller.send_snapshot()
+    try:
+        controller.run(args.duration)
+    except (KeyboardInterrupt, OSError):
+        pass
+    print("Sent", controller.sent, "messages,", controller.sent_bytes, "bytes; received",
+          controller.slice_updates, "slice assignments in", controller.slice_batches, "batches")
+    controller.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# The dashboard modules are plain scripts in the parent directory, not a package
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
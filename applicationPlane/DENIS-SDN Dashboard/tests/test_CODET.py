@@ -0,0 +1,188 @@
+"""
+Tests of the CODET engines: every engine, on a graph and on a CompactTopology,
+against the original per-node BFS,
+the per-slice and weighted results against networkx, and IncrementalCODET
+against a full recomputation after every change.
+"""
+
+import random
+
+import networkx as nx
+import pytest
+
+from benchmark_CODET import generate_topology
+from compact_topology import CompactTopology
+from CODET import (IncrementalCODET, run_CODET, run_CODET_compact, run_CODET_per_node, run_CODET_per_slice,
+                   run_CODET_single_pass, run_CODET_weighted)
+
+TN = "00.00"
+
+# Sparse random topology with some links removed, so some nodes are disconnected
+def topology(seed, n_nodes=200, avg_degree=4, removed=60):
+    rnd = random.Random(seed)
+    G = generate_topology(n_nodes, avg_degree, 3, seed, "clustered")
+    G.remove_edges_from(rnd.sample(list(G.edges), min(removed, G.number_of_edges())))
+    return G
+
+# Nodes with no path to any of the targets, computed with networkx
+def expected_disconnected(G, targets):
+    reachable = set()
+    for target in targets:
+        if target in G:
+            reachable |= nx.node_connected_component(G, target)
+    return sorted(node for node in G if node not in targets and node not in reachable)
+
+# Disconnected nodes of every slice, a node is connected only through its own slice and the targets
+def expected_per_slice(G, targets):
+    slices = dict(G.nodes(data='slice'))
+    H = nx.Graph()
+    H.add_nodes_from(G)
+    H.add_edges_from((u, v) for u, v in G.edges if u in targets or v in targets or slices[u] == slices[v])
+    disconnected = expected_disconnected(H, targets)
+    result = {}
+    for node in G:
+        if node not in targets:
+            result.setdefault(slices[node], [])
+    for node in disconnected:
+        result[slices[node]].append(node)
+    return result
+
+def normalized(SDN):
+    return {node_slice: sorted(nodes) for node_slice, nodes in SDN.items()}
+
+@pytest.mark.parametrize("seed", range(5))
+def test_engines_match_the_original_run_CODET(seed):
+    G = topology(seed, n_nodes=80, removed=20)  # the original engine is quadratic
+    expected = sorted(run_CODET_per_node(G, TN))
+    assert sorted(run_CODET(G, TN)) == expected
+    assert sorted(run_CODET_single_pass(G, TN)) == expected
+    assert sorted(run_CODET_compact(CompactTopology.from_graph(G), TN)) == expected
+    assert expected == expected_disconnected(G, [TN])
+
+@pytest.mark.parametrize("seed", range(5))
+def test_per_slice_engines_agree(seed):
+    G = topology(seed)
+    expected = expected_per_slice(G, [TN])
+    assert normalized(run_CODET_per_slice(G, TN)) == expected
+    assert normalized(run_CODET_per_slice(CompactTopology.from_graph(G), TN)) == expected
+    assert normalized(run_CODET_single_pass(G, TN, per_slice=True)[1]) == expected
+
+@pytest.mark.parametrize("seed", range(5))
+def test_several_border_routers(seed):
+    G = topology(seed)
+    targets = random.Random(seed).sample(sorted(G), 3)
+    assert sorted(run_CODET_single_pass(G, targets)) == expected_disconnected(G, targets)
+    assert sorted(run_CODET_compact(CompactTopology.from_graph(G), targets)) == expected_disconnected(G, targets)
+    assert normalized(run_CODET_per_slice(G, targets)) == expected_per_slice(G, targets)
+
+# The read-only view of a CompactTopology is the graph it was built from
+def test_compact_topology_view():
+    G = topology(0, n_nodes=60, removed=10)
+    G.add_edge("00.00", "01.00", LQI=77)
+    T = CompactTopology.from_graph(G)
+    assert T.number_of_nodes() == len(G) and list(T) == list(G)
+    assert sorted(map(sorted, T.edges())) == sorted(map(sorted, G.edges()))
+    assert dict(T.nodes(data='slice')) == dict(G.nodes(data='slice'))
+    assert dict(T.degree()) == dict(G.degree())
+    assert all(sorted(T.neighbors(node)) == sorted(G.neighbors(node)) for node in G)
+    assert T.has_edge("01.00", "00.00") and "zz" not in T
+    # The weighted CODET reads the link metrics of the CSR entries
+    assert run_CODET_weighted(T, TN) == run_CODET_weighted(G, TN)
+
+# The slices keep their values, whatever their type
+def test_compact_slice_values():
+    G = nx.path_graph([TN, "a", "b", "c"])
+    nx.set_node_attributes(G, {TN: 1, "a": "2", "b": 2, "c": "2"}, 'slice')
+    T = CompactTopology.from_graph(G)
+    assert dict(T.nodes(data='slice')) == dict(G.nodes(data='slice'))
+    assert run_CODET_per_slice(T, TN) == run_CODET_per_slice(G, TN) == {"2": ["c"], 2: ["b"]}
+
+def test_target_not_in_graph():
+    G = nx.Graph([("01.00", "02.00")])
+    assert sorted(run_CODET_single_pass(G, TN)) == ["01.00", "02.00"]
+    assert sorted(run_CODET_per_node(G, TN)) == ["01.00", "02.00"]
+
+# A path tN - a - b with a cycle tN - c - d - tN: a and b hang from a bridge
+def test_weighted_paths_and_bridges():
+    G = nx.Graph()
+    G.add_edge(TN, "a", LQI=90)
+    G.add_edge("a", "b", LQI=40)
+    G.add_edge(TN, "c", LQI=80)
+    G.add_edge("c", "d", LQI=70)
+    G.add_edge("d", TN, LQI=60)
+    G.add_node("e")
+    report = run_CODET_weighted(G, TN, min_quality=50)
+    assert report['paths'] == {"a": 1, "b": 1, "c": 2, "d": 2, "e": 0}
+    assert report['quality']["b"] == 40
+    assert report['quality']["d"] == 70
+    assert sorted(tuple(sorted(bridge)) for bridge in report['bridges']) == [(TN, "a"), ("a", "b")]
+    assert sorted(report['articulation_points']) == [TN, "a"]
+    assert report['disconnected'] == ["e"]
+    assert report['weak'] == ["b"]
+
+# Two border routers on the ends of a chain: every node has two disjoint paths to them
+def test_weighted_several_border_routers():
+    G = nx.path_graph(["br1", "a", "b", "br2"])
+    report = run_CODET_weighted(G, ["br1", "br2"])
+    assert report['paths'] == {"a": 2, "b": 2}
+    assert report['bridges'] == []
+
+@pytest.mark.parametrize("seed", range(5))
+def test_weighted_paths_match_max_flow(seed):
+    G = topology(seed, n_nodes=50, avg_degree=4, removed=10)
+    report = run_CODET_weighted(G, TN)
+    # Edge-disjoint paths are the max flow with a unit capacity in both directions of every link
+    D = nx.DiGraph()
+    for u, v in G.edges:
+        D.add_edge(u, v, capacity=1)
+        D.add_edge(v, u, capacity=1)
+    for node in G:
+        if node == TN:
+            continue
+        flow = nx.maximum_flow_value(D, node, TN) if nx.has_path(G, node, TN) else 0
+        assert report['paths'][node] == min(flow, 2), node
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_matches_full_recompute(seed):
+    rnd = random.Random(seed)
+    source = topology(seed, n_nodes=120)
+    targets = [TN] + rnd.sample(sorted(node for node in source if node != TN), 1)
+    G = source.copy()
+    tracker = IncrementalCODET(G, targets)
+    disconnected = set(tracker.disconnected())
+    assert sorted(disconnected) == expected_disconnected(G, targets)
+
+    for step in range(300):
+        r = rnd.random()
+        if r < 0.35 and G.number_of_edges():
+            lost, found = tracker.remove_edge(*rnd.choice(list(G.edges)))
+        elif r < 0.75:
+            # The nodes of a link are added first, like topology.apply_event does
+            u, v = rnd.sample(sorted(source), 2)
+            lost, found = tracker.add_node(u)
+            disconnected = (disconnected | set(lost)) - set(found)
+            lost, found = tracker.add_node(v)
+            disconnected = (disconnected | set(lost)) - set(found)
+            lost, found = tracker.add_edge(u, v)
+        elif r < 0.85 and len(G) > 2:
+            lost, found = tracker.remove_node(rnd.choice(sorted(G)))
+        else:
+            node = rnd.choice(sorted(source))
+            lost, found = tracker.add_node(node)
+        # The reported changes follow the full recomputation
+        disconnected = (disconnected | set(lost)) - set(found)
+        disconnected &= set(G)
+        expected = expected_disconnected(G, targets)
+        assert sorted(tracker.disconnected()) == expected, step
+        assert sorted(disconnected) == expected, step
+
+def test_incremental_add_target():
+    G = nx.Graph([(TN, "a"), ("b", "c")])
+    tracker = IncrementalCODET(G, TN)
+    assert sorted(tracker.disconnected()) == ["b", "c"]
+    assert sorted(tracker.add_target("b")) == ["c"]
+    assert tracker.disconnected() == []
+    # The first border router leaves, its nodes have no other path
+    lost, found = tracker.remove_node(TN)
+    assert lost == ["a"]
+    assert tracker.disconnected() == ["a"]
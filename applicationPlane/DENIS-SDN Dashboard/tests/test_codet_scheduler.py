@@ -0,0 +1,111 @@
+"""
+Tests of the CODET scheduler: a burst of topology changes is coalesced in one
+run, a run of an unchanged graph is skipped unless it is requested, and stop
+cancels the pending runs and ends the worker thread.
+"""
+
+import threading
+import time
+
+from codet_scheduler import CODETScheduler
+
+DEBOUNCE = 0.2
+
+# TopologyModel stand-in, only the version matters
+class Model:
+    def __init__(self):
+        self.version = 0
+
+    def snapshot(self):
+        return self.version, None
+
+class Runs:
+    def __init__(self):
+        self.results = []
+        self.event = threading.Event()
+
+    def on_result(self, result, version, duration, reason):
+        self.results.append((version, reason))
+        self.event.set()
+
+    # Wait for the next result
+    def wait(self, timeout=2.0):
+        ok = self.event.wait(timeout)
+        self.event.clear()
+        return ok
+
+def scheduler(model, runs, run=lambda snapshot: None, interval=3600):
+    scheduler = CODETScheduler(model, run, runs.on_result, interval=interval, debounce=DEBOUNCE)
+    scheduler.start()
+    return scheduler
+
+def test_burst_of_changes_runs_once():
+    model, runs = Model(), Runs()
+    codet = scheduler(model, runs)
+    for _ in range(10):
+        model.version += 1
+        codet.trigger()
+        time.sleep(0.01)
+    assert runs.wait()
+    time.sleep(2 * DEBOUNCE)
+    assert runs.results == [(10, 'topology change')]
+    codet.stop()
+
+def test_unchanged_graph_is_skipped_unless_requested():
+    model, runs = Model(), Runs()
+    codet = scheduler(model, runs)
+    model.version = 1
+    codet.trigger()
+    assert runs.wait()
+    codet.trigger()  # same version
+    assert not runs.wait(2 * DEBOUNCE)
+    codet.run_now()
+    assert runs.wait()
+    assert runs.results == [(1, 'topology change'), (1, 'on demand')]
+    codet.stop()
+
+def test_periodic_runs():
+    model, runs = Model(), Runs()
+    codet = scheduler(model, runs, interval=0.05)
+    assert runs.wait()
+    model.version = 1
+    assert runs.wait()
+    assert runs.results == [(0, 'periodic'), (1, 'periodic')]
+    codet.stop()
+
+def test_stop_cancels_the_pending_run():
+    model, runs = Model(), Runs()
+    codet = scheduler(model, runs)
+    model.version = 1
+    codet.trigger()
+    codet.stop()
+    codet.thread.join(timeout=2)
+    assert not codet.thread.is_alive()
+    time.sleep(2 * DEBOUNCE)
+    assert runs.results == []
+
+def test_stop_during_a_run_and_start_again():
+    model, runs = Model(), Runs()
+    started, release = threading.Event(), threading.Event()
+    def run(snapshot):
+        started.set()
+        release.wait(2)
+    codet = scheduler(model, runs, run=run)
+    codet.run_now()
+    assert started.wait(2)
+    codet.stop()
+    thread = codet.thread
+    release.set()
+    # The running check finishes, then the thread ends
+    assert runs.wait()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    codet.start()
+    assert codet.thread is not thread
+    codet.run_now()
+    assert runs.wait()
+    assert [reason for _, reason in runs.results] == ['on demand', 'on demand']
+    codet.stop()
+    codet.stop()  # stopping twice is harmless
+    codet.thread.join(timeout=2)
+    assert not codet.thread.is_alive()
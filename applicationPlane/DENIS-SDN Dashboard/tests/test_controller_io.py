@@ -0,0 +1,34 @@
+"""
+Tests of ControllerLink start and stop: the link can be stopped any number of
+times, also before it started, and started again after a stop.
+"""
+
+import time
+
+from controller_io import ControllerLink
+
+# Wait until the event loop of the link serves
+def wait_running(link):
+    deadline = time.monotonic() + 5
+    while link.stopped is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert link.stopped is not None
+
+def test_stop_twice():
+    link = ControllerLink(port=0)
+    link.stop()  # not started
+    link.start()
+    wait_running(link)
+    link.stop()
+    assert link.loop is None and link.thread is None
+    link.stop()
+    assert link.send("{}") is None
+
+def test_start_after_stop():
+    link = ControllerLink(port=0)
+    for _ in range(2):
+        link.start()
+        wait_running(link)
+        assert link.loop.is_running()
+        link.stop()
+    assert link.loop is None
@@ -0,0 +1,110 @@
+"""
+Tests of the headless daemon: the cached JSON of the GET requests follows every
+change of the core, and the Unix socket path is removed only when it is a
+stale socket.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from daemon import DashboardDaemon
+from dashboard_core import DashboardCore
+
+# ControllerLink stand-in for the slice pusher, every message is sent
+class Link:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+        return True
+
+@pytest.fixture
+def daemon():
+    core = DashboardCore(port=0, snapshot_path=None)
+    # No CODET runs, their results would also refresh the cache
+    core.codet_scheduler.trigger = lambda: None
+    daemon = DashboardDaemon(core, port=0)
+    thread = threading.Thread(target=daemon.run, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.stop()
+    thread.join(timeout=10)
+
+def get(daemon, path):
+    with urllib.request.urlopen(daemon.address + path, timeout=5) as response:
+        return json.loads(response.read())
+
+def post(daemon, path, request):
+    data = json.dumps(request).encode()
+    with urllib.request.urlopen(urllib.request.Request(daemon.address + path, data), timeout=5) as response:
+        return json.loads(response.read())
+
+def deliver(daemon, message):
+    daemon.core.controller_link.updates.put(('test', message))
+
+# Finish the layout, so only the messages of a test change the core
+def settle(daemon):
+    core = daemon.core
+    def run_layout():
+        while core.layout.run(core.G) or core.layout.collect():
+            pass
+    daemon.call(run_layout)
+    daemon.call(core.poll)
+
+# Poll a GET request until check(result) holds
+def wait_for(daemon, path, check):
+    deadline = time.monotonic() + 5
+    while True:
+        result = get(daemon, path)
+        if check(result) or time.monotonic() > deadline:
+            return result
+        time.sleep(0.02)
+
+def test_link_metric_update_invalidates_the_cache(daemon):
+    deliver(daemon, {"PTY": "NB", "NID": "01.00", "NBR": "00.00", "LQI": 90})
+    topology = wait_for(daemon, '/topology', lambda result: result['links'])
+    assert topology['links'][0]['LQI'] == 90
+    settle(daemon)
+    get(daemon, '/topology')
+    deliver(daemon, {"PTY": "NB", "NID": "01.00", "NBR": "00.00", "LQI": 35})
+    topology = wait_for(daemon, '/topology', lambda result: result['links'][0]['LQI'] == 35)
+    assert topology['links'][0]['LQI'] == 35
+
+def test_acknowledgement_invalidates_the_cache(daemon):
+    link = Link()
+    daemon.call(setattr, daemon.core.slice_pusher, 'link', link)
+    deliver(daemon, {"PTY": "NB", "NID": "01.00", "NBR": "00.00", "LQI": 90})
+    wait_for(daemon, '/status', lambda result: result['nodes'] == 2)
+    settle(daemon)
+    post(daemon, '/slices', {"assignment": {"01.00": 2}})
+    post(daemon, '/slices/push', {"type": "Logically-Sliced"})
+    assert get(daemon, '/slices')['pending'] == {"01.00": 2}
+    assert get(daemon, '/status')['slice_push_pending'] == 1
+    deliver(daemon, {"PTY": "SA", "SEQ": link.sent[-1]['SEQ']})
+    assert wait_for(daemon, '/slices', lambda result: not result['pending'])['pending'] == {}
+    assert get(daemon, '/status')['slice_push_pending'] == 0
+
+def test_unix_socket_path_that_is_not_a_socket(tmp_path):
+    path = str(tmp_path / "dashboard.sock")
+    with open(path, 'w') as f:
+        f.write("data")
+    with pytest.raises(FileExistsError):
+        DashboardDaemon(DashboardCore(snapshot_path=None), unix_socket=path)
+    with open(path) as f:
+        assert f.read() == "data"
+
+def test_stale_unix_socket_is_replaced(tmp_path):
+    path = str(tmp_path / "dashboard.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    daemon = DashboardDaemon(DashboardCore(snapshot_path=None), unix_socket=path)
+    daemon.server.server_close()
+    assert os.path.exists(path)
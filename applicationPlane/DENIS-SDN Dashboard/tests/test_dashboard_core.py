@@ -0,0 +1,82 @@
+"""
+Tests of DashboardCore.poll with the messages put directly in the queue of the
+controller link: malformed messages are dropped without stopping the loop, the
+layout is redrawn only when nodes move, and the regions of several border
+routers.
+"""
+
+import networkx as nx
+import pytest
+
+from dashboard_core import DashboardCore
+from federation import run_CODET_regions
+
+@pytest.fixture
+def core():
+    return DashboardCore(snapshot_path=None)
+
+def deliver(core, *messages):
+    for message in messages:
+        core.controller_link.updates.put(('test', message))
+    return core.poll(budget=5.0)
+
+@pytest.mark.parametrize("message", [
+    {"PTY": "NN"},
+    {"PTY": "NB", "NID": "01.00"},
+    {"PTY": "RL"},
+    {"nodes": "x", "links": []},
+    [1, 2, 3],
+    [{"PTY": "SA"}],
+    "NN",
+    42,
+    None,
+])
+def test_malformed_messages_do_not_stop_poll(core, message):
+    deliver(core, message, {"PTY": "NN", "NID": "02.00"})
+    # The message after the malformed one is applied
+    assert "02.00" in core.G
+    updates = deliver(core, {"PTY": "NB", "NID": "02.00", "NBR": "03.00", "LQI": 90})
+    assert updates['topology'] and core.G.has_edge("02.00", "03.00")
+
+def test_positions_only_when_nodes_move(core):
+    updates = deliver(core, {"PTY": "NB", "NID": "02.00", "NBR": "03.00", "LQI": 90})
+    assert updates['positions']
+    while core.layout.run(core.G) or core.layout.collect():
+        pass
+    updates = deliver(core, {"PTY": "NB", "NID": "02.00", "NBR": "03.00", "LQI": 40})
+    assert not updates['positions']
+
+def test_regions_of_several_border_routers(core):
+    deliver(core,
+            {"PTY": "BR", "BID": "00.00"},
+            {"PTY": "BR", "BID": "10.00"},
+            {"PTY": "NB", "BID": "00.00", "NID": "01.00", "NBR": "00.00"},
+            {"PTY": "NB", "BID": "10.00", "NID": "11.00", "NBR": "10.00"},
+            {"PTY": "NB", "BID": "10.00", "NID": "12.00", "NBR": "11.00"},
+            {"PTY": "NN", "BID": "10.00", "NID": "13.00"},
+            # A link across the regions
+            {"PTY": "NB", "BID": "00.00", "NID": "01.00", "NBR": "11.00"})
+    assert core.model.border_routers() == ["00.00", "10.00"]
+    # Connected to any border router
+    assert core.model.tracker.disconnected() == ["13.00"]
+    assert core.model.regions() == {"00.00": "00.00", "01.00": "00.00", "10.00": "10.00", "11.00": "10.00",
+                                    "12.00": "10.00", "13.00": "10.00"}
+    version, snapshot = core.model.snapshot()
+    SDN, report = core.execute_CODET(snapshot)
+    assert sorted(node for nodes in SDN.values() for node in nodes) == ["13.00"]
+    assert {BID: sorted(node for nodes in region.values() for node in nodes)
+            for BID, region in report['regions'].items()} == {"00.00": [], "10.00": ["13.00"]}
+    core.post_CODET_result((SDN, report), version, 0.0, 'test')
+    core.poll()
+    regions = core.regions()
+    assert regions["10.00"]['nodes'] == 4 and regions["10.00"]['disconnected'] == ["13.00"]
+    # Only the links inside a region count
+    assert [(row['id'], row['neighbors']) for row in regions["00.00"]['density']] == [("00.00", 1), ("01.00", 1)]
+    assert [(row['id'], row['neighbors']) for row in regions["10.00"]['density']][:2] == [("11.00", 2), ("10.00", 1)]
+
+def test_region_CODET_uses_the_links_inside_the_region():
+    G = nx.Graph([("br1", "a"), ("a", "b"), ("br2", "c")])
+    # b reaches br1 only through a, which belongs to br2
+    region = {"br1": "br1", "a": "br2", "b": "br1", "br2": "br2", "c": "br2"}
+    SDN = run_CODET_regions(G, region)
+    assert SDN == {"br1": {1: ["b"]}, "br2": {1: ["a"]}}
@@ -0,0 +1,70 @@
+"""
+Tests of the Node Density Classifier: the np.partition thresholds give the same
+colors as the original sort-based classifier, also after incremental updates.
+"""
+
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from density_classifier import DensityClassifier, classify_degrees
+
+# The original classifier of the dashboard, sorts all the nodes by degree
+def original_neighbors_list(G):
+    neighbors = [(node, degree, '') for node, degree in dict(G.degree()).items()]
+    neighbors.sort(key=lambda x: -x[1])
+    red_n = neighbors[int(G.number_of_nodes()*0.25)][1]
+    orange_n = neighbors[int(G.number_of_nodes()*0.50)][1]
+    yellow_n = neighbors[int(G.number_of_nodes()*0.75)][1]
+    for i in range(len(neighbors)):
+        element = list(neighbors[i])
+        if element[1] <= yellow_n:
+            element[2] = 'green'
+        elif element[1] <= orange_n:
+            element[2] = 'yellow'
+        elif element[1] <= red_n:
+            element[2] = 'orange'
+        else:
+            element[2] = 'red'
+        neighbors[i] = tuple(element)
+    return neighbors
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 5, 7, 50, 301])
+def test_same_colors_as_the_original(seed, n):
+    G = nx.gnm_random_graph(n, random.Random(seed).randint(0, 3 * n), seed=seed)
+    classifier = DensityClassifier(G)
+    classifier.classify()
+    assert classifier.neighbors_list() == original_neighbors_list(G)
+
+def test_equal_degrees():
+    assert classify_degrees(np.array([3, 3, 3, 3])).tolist() == ['green'] * 4
+    assert classify_degrees(np.array([], dtype=np.int64)).tolist() == []
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_updates_match_a_rebuild(seed):
+    rnd = random.Random(seed)
+    G = nx.gnm_random_graph(100, 250, seed=seed)
+    classifier = DensityClassifier(G)
+    for _ in range(300):
+        r = rnd.random()
+        if r < 0.4 and G.number_of_edges():
+            u, v = rnd.choice(list(G.edges))
+            G.remove_edge(u, v)
+            classifier.remove_edge(u, v)
+        elif r < 0.8:
+            u, v = rnd.sample(range(120), 2)
+            if not G.has_edge(u, v):
+                G.add_edge(u, v)
+                classifier.add_edge(u, v)
+        elif len(G) > 2:
+            node = rnd.choice(sorted(G))
+            for other in list(G.neighbors(node)):
+                classifier.remove_edge(node, other)
+            G.remove_node(node)
+            classifier.remove_node(node)
+        classifier.classify()
+        expected = {node: color for node, _, color in original_neighbors_list(G)}
+        assert classifier.node_colors() == expected
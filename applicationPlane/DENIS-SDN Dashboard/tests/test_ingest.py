@@ -0,0 +1,75 @@
+"""
+Tests of JSONStreamDecoder: every framing with the stream split at every
+possible read boundary, strings with brackets and escapes, and the limit on
+the size of a message.
+"""
+
+import json
+
+import pytest
+
+from ingest import JSONStreamDecoder, frame_length
+
+MESSAGES = [
+    {"PTY": "NB", "NID": "02.00", "NBR": "03.00", "LQI": 98},
+    {"PTY": "UN", "NID": "02.00", "desc": "a \"quoted\" {not} [nested] \\ string"},
+    {"nodes": [{"id": "00.00"}, {"id": "01.00"}], "links": [{"source": "00.00", "target": "01.00"}]},
+    [1, 2, {"x": "]"}],
+]
+
+def encoded(framing, messages):
+    if framing == "length":
+        return b"".join(frame_length(message) for message in messages)
+    if framing == "newline":
+        return b"".join(json.dumps(message).encode() + b"\n" for message in messages)
+    # Unframed, pretty-printed and with noise between the messages
+    return b"  junk ".join(json.dumps(message, indent=2).encode() for message in messages)
+
+# Feed the data in reads of `size` bytes
+def feed_all(decoder, data, size):
+    messages = []
+    for start in range(0, len(data), size):
+        messages += decoder.feed(data[start:start + size])
+    return messages
+
+@pytest.mark.parametrize("framing", ["auto", "newline", "length"])
+def test_framing_at_every_read_size(framing):
+    data = encoded(framing, MESSAGES)
+    for size in list(range(1, 40)) + [len(data)]:
+        decoder = JSONStreamDecoder(framing)
+        assert feed_all(decoder, data, size) == MESSAGES, size
+        assert decoder.dropped == 0
+
+def test_sizes_of_the_last_feed():
+    decoder = JSONStreamDecoder("newline")
+    decoder.feed(b'{"a":1}\n{"bb":22}\n')
+    assert decoder.sizes == [7, 9]
+
+def test_invalid_json_is_dropped():
+    decoder = JSONStreamDecoder("newline")
+    assert decoder.feed(b'{"a":\n{"b":2}\n') == [{"b": 2}]
+    assert decoder.dropped == 1
+
+def test_unknown_framing():
+    with pytest.raises(ValueError):
+        JSONStreamDecoder("xml")
+
+# Two oversized messages around a small one, in one read and in small reads
+@pytest.mark.parametrize("framing", ["auto", "newline", "length"])
+@pytest.mark.parametrize("size", [7, 40, 10000])
+def test_oversized_messages_are_dropped_once(framing, size):
+    big = {"PTY": "UN", "NID": "02.00", "desc": "x" * 300}
+    small = {"PTY": "RN", "NID": "03.00"}
+    decoder = JSONStreamDecoder(framing, max_message_size=100)
+    data = encoded(framing, [big, big, small])
+    assert feed_all(decoder, data, size) == [small]
+    assert decoder.dropped == 2
+    # The decoder keeps working after the oversized messages
+    assert decoder.feed(encoded(framing, [small])) == [small]
+
+def test_buffer_stays_bounded():
+    decoder = JSONStreamDecoder("newline", max_message_size=100)
+    for _ in range(50):
+        decoder.feed(b"x" * 64)
+        assert len(decoder.buffer) <= 100
+    assert decoder.dropped == 1
@@ -0,0 +1,52 @@
+"""
+Tests of the link metrics store: the series of the links and nodes that leave
+the graph are dropped, so link churn does not grow the store, and the series
+that stay keep their samples.
+"""
+
+import networkx as nx
+import numpy as np
+
+from link_metrics import MetricsStore, RingSeries
+from topology import new_changes
+
+def test_remove_moves_the_last_row():
+    series = RingSeries(('LQI',), 4)
+    for i, key in enumerate("abc"):
+        for t in range(i + 1):
+            series.append(key, float(t), np.array([10.0 * i + t], dtype=np.float32))
+    series.remove("a")
+    assert series.keys == ["c", "b"] and series.index == {"c": 0, "b": 1}
+    times, values = series.series("c")
+    assert times.tolist() == [0.0, 1.0, 2.0] and values[:, 0].tolist() == [20.0, 21.0, 22.0]
+    # A new series reuses the free row from an empty ring
+    series.append("d", 5.0, np.array([1.0], dtype=np.float32))
+    assert series.series("d")[0].tolist() == [5.0]
+    series.remove("zz")
+    assert len(series.keys) == 3
+
+def test_link_churn_does_not_grow_the_store():
+    store = MetricsStore()
+    G = nx.Graph()
+    for i in range(1000):
+        u, v = "{:02d}.00".format(i), "{:02d}.00".format(i + 1)
+        message = {"PTY": "NB", "NID": u, "NBR": v, "LQI": 90, "ENG": 3}
+        store.record(message, t=float(i))
+        changes = new_changes()
+        changes['removed_links'] = [(v, u)]
+        changes['removed_nodes'] = [u]
+        store.evict(G, changes)
+    assert store.links.keys == [] and store.links_downsampled.keys == []
+    assert store.nodes.keys == [] and store.nodes_downsampled.keys == []
+    assert len(store.links.head) <= 64
+
+def test_snapshot_keeps_only_the_links_of_the_graph():
+    store = MetricsStore()
+    store.record({"PTY": "NB", "NID": "01.00", "NBR": "00.00", "LQI": 90}, t=0.0)
+    store.record({"PTY": "NB", "NID": "02.00", "NBR": "00.00", "LQI": 80}, t=0.0)
+    G = nx.Graph([("00.00", "02.00")])
+    changes = new_changes()
+    changes['snapshot'] = True
+    store.evict(G, changes)
+    assert store.links.keys == [("00.00", "02.00")]
+    assert store.link_series("02.00", "00.00")[1].tolist() == [80.0]
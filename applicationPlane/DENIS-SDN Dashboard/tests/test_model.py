@@ -0,0 +1,48 @@
+"""
+Tests of TopologyModel.apply: a malformed message is rejected before it changes
+the graph, the connectivity or the version, and MR reports change nothing.
+"""
+
+import pytest
+
+from model import TopologyModel
+
+def state(model):
+    return (dict(model.G.nodes(data=True)), sorted(map(sorted, model.G.edges())), model.version,
+            sorted(model.tracker.disconnected()), sorted(model.tracker.targets))
+
+@pytest.fixture
+def model():
+    model = TopologyModel()
+    for message in ({"PTY": "BR", "BID": "00.00"},
+                    {"PTY": "NB", "BID": "00.00", "NID": "01.00", "NBR": "00.00", "LQI": 90},
+                    {"PTY": "NN", "NID": "02.00"}):
+        model.apply(message)
+    return model
+
+@pytest.mark.parametrize("message", [
+    "NB",
+    [{"PTY": "NN", "NID": "03.00"}],
+    {"PTY": ["NN"], "NID": "03.00"},
+    {"PTY": "NB", "NID": "03.00"},
+    {"PTY": "NB", "NID": "03.00", "NBR": {"id": "04.00"}},
+    {"PTY": "NN", "NID": "03.00", "BID": ["00.00"]},
+    {"PTY": "UN", "NID": "01.00", "slice": [2]},
+    {"PTY": "RL", "NBR": "01.00"},
+    {"PTY": "BR"},
+    {"nodes": [{"id": "05.00"}], "links": [{"source": "05.00"}]},
+    {"nodes": [{"id": "05.00"}, "06.00"], "links": []},
+    {"nodes": {"05.00": {}}, "links": []},
+])
+def test_malformed_message_changes_nothing(model, message):
+    before = state(model)
+    changes = model.apply(message)
+    assert not any(changes.values())
+    assert state(model) == before
+
+def test_miss_route_is_reported_not_applied(model, capsys):
+    before = state(model)
+    changes = model.apply({"PTY": "MR", "NID": "01.00", "DID": "02.00"})
+    assert changes['miss_routes'] == [("01.00", "02.00")]
+    assert state(model) == before
+    assert capsys.readouterr().out == ""
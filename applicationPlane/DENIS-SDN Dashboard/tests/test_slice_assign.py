@@ -0,0 +1,75 @@
+"""
+Tests of the automatic slice partition: every slice stays connected to the
+border routers inside the slice, and the slice sizes stay within the balance
+bound wherever the border router has a neighbor for every slice.
+"""
+
+import math
+
+import networkx as nx
+import pytest
+
+from benchmark_CODET import generate_topology
+from CODET import run_CODET_per_slice, run_CODET_single_pass
+from slice_assign import assign, auto_partition, select_by_id_range, slice_sizes
+
+TN = "00.00"
+
+# Largest slice allowed: the even share of the nodes, 10% more and one node
+def balance_bound(n_nodes, n_slices):
+    return math.ceil(1.1 * n_nodes / n_slices) + 1
+
+# Every assigned node reaches a border router inside its own slice
+def check_connected(G, assignment, unreachable, targets):
+    nx.set_node_attributes(G, assignment, 'slice')
+    assert sorted(unreachable) == sorted(run_CODET_single_pass(G, targets))
+    disconnected = [node for nodes in run_CODET_per_slice(G, targets).values() for node in nodes]
+    assert sorted(disconnected) == sorted(unreachable)
+    assert set(assignment) | set(unreachable) | set(targets) == set(G)
+
+@pytest.mark.parametrize("seed", [0, 1, 3, 5])
+@pytest.mark.parametrize("n_nodes, n_slices", [(200, 2), (500, 4), (1000, 3), (1000, 8)])
+def test_slices_are_connected_and_balanced(seed, n_nodes, n_slices):
+    G = generate_topology(n_nodes, 6, 3, seed, "clustered")
+    assert G.degree(TN) >= n_slices
+    assignment, unreachable = auto_partition(G, n_slices, TN)
+    check_connected(G, assignment, unreachable, [TN])
+    sizes = slice_sizes(assignment)
+    assert sorted(sizes) == list(range(1, n_slices + 1))
+    assert max(sizes.values()) <= balance_bound(len(assignment), n_slices)
+
+def test_grid_from_the_center():
+    G = nx.grid_2d_graph(30, 30)
+    G = nx.relabel_nodes(G, {xy: "{:02d}.{:02d}".format(*xy) for xy in G})
+    assignment, unreachable = auto_partition(G, 4, "15.15")
+    check_connected(G, assignment, unreachable, ["15.15"])
+    assert unreachable == []
+    assert max(slice_sizes(assignment).values()) <= balance_bound(len(assignment), 4)
+
+# A border router with d neighbors serves at most d slices
+def test_fewer_neighbors_than_slices():
+    G = nx.Graph([(TN, "01.00"), (TN, "02.00")])
+    nx.add_path(G, ["01.00"] + ["1{}.00".format(i) for i in range(5)])
+    nx.add_path(G, ["02.00"] + ["2{}.00".format(i) for i in range(5)])
+    G.add_node("99.00")
+    assignment, unreachable = auto_partition(G, 4, TN)
+    check_connected(G, assignment, unreachable, [TN])
+    assert unreachable == ["99.00"]
+    assert sorted(slice_sizes(assignment).values()) == [6, 6]
+
+def test_several_border_routers():
+    G = nx.path_graph(["br1", "a", "b", "c", "d", "br2", "e", "f"])
+    G.add_edge("x", "y")
+    assignment, unreachable = auto_partition(G, 2, ["br1", "br2"])
+    check_connected(G, assignment, unreachable, ["br1", "br2"])
+    assert sorted(unreachable) == ["x", "y"]
+
+def test_no_border_router():
+    G = nx.path_graph(["01.00", "02.00"])
+    assert auto_partition(G, 2, TN) == ({}, ["01.00", "02.00"])
+
+def test_rules():
+    G = nx.path_graph([TN, "01.00", "02.05", "02.10", "10.00"])
+    nodes = select_by_id_range(G, "00.00", "02.05")
+    assert nodes == [TN, "01.00", "02.05"]
+    assert assign(nodes, 3, TN) == {"01.00": 3, "02.05": 3}
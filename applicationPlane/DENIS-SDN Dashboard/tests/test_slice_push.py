@@ -0,0 +1,139 @@
+"""
+Tests of SlicePusher: the SC batches and their acknowledgement, the window,
+retries and drops, a node reverted while a batch is in flight, and the full
+push fallback for controllers without SA.
+"""
+
+import json
+
+import networkx as nx
+import pytest
+
+import slice_push
+from slice_push import SLICE_BATCH, WINDOW, SlicePusher
+
+# ControllerLink stand-in that records the sent messages
+class Link:
+    def __init__(self, connected=True):
+        self.connected = connected
+        self.sent = []
+
+    def send(self, data):
+        if not self.connected:
+            return None
+        # One compact message per line
+        assert data.endswith("\n") and data.count("\n") == 1
+        self.sent.append(json.loads(data))
+        return True
+
+def graph(n):
+    G = nx.Graph()
+    G.add_nodes_from(("{:02d}.00".format(i), {'slice': 1}) for i in range(n))
+    return G
+
+def ack(pusher, message):
+    return pusher.ack({'PTY': 'SA', 'SEQ': message['SEQ']})
+
+@pytest.fixture
+def no_timeout(monkeypatch):
+    monkeypatch.setattr(slice_push, 'ACK_TIMEOUT', 0.0)
+
+def test_only_changed_nodes_are_sent_and_acked():
+    link = Link()
+    pusher = SlicePusher(link)
+    pusher.mark("01.00", 2)
+    pusher.mark("02.00", 3)
+    assert pusher.push(graph(3), "Logically-Sliced") == 2
+    message = link.sent[0]
+    assert message['PTY'] == 'SC' and message['S'] == {"01.00": 2, "02.00": 3}
+    assert message['ST'] == "Logically-Sliced"
+    assert ack(pusher, message)
+    assert pusher.dirty == {} and pusher.acked == {"01.00": 2, "02.00": 3}
+    # Nothing changed, nothing is sent
+    assert pusher.push(graph(3), "Logically-Sliced") == 0
+    assert len(link.sent) == 1
+    # Marking the acknowledged slice again is not a change
+    pusher.mark("01.00", 2)
+    assert pusher.dirty == {}
+
+def test_window_and_batches():
+    link = Link()
+    pusher = SlicePusher(link)
+    n = SLICE_BATCH * (WINDOW + 2)
+    for i in range(n):
+        pusher.mark("{:02d}.00".format(i), 2)
+    pusher.push(graph(n), "Logically-Sliced")
+    assert len(link.sent) == WINDOW
+    while pusher.in_flight:
+        ack(pusher, pusher.in_flight[min(pusher.in_flight)][0])
+    assert len(link.sent) == WINDOW + 2
+    assert pusher.dirty == {} and len(pusher.acked) == n
+
+def test_not_connected_keeps_the_batches():
+    link = Link(connected=False)
+    pusher = SlicePusher(link)
+    pusher.mark("01.00", 2)
+    pusher.push(graph(2), "Logically-Sliced")
+    assert len(pusher.queued) == 1 and not pusher.in_flight
+    link.connected = True
+    pusher.poll()
+    assert len(link.sent) == 1 and len(pusher.in_flight) == 1
+
+def test_retry_then_drop_keeps_the_node_dirty(no_timeout):
+    link = Link()
+    pusher = SlicePusher(link)
+    pusher.protocol = "SC"  # the controller acknowledged before
+    pusher.mark("01.00", 2)
+    pusher.push(graph(2), "Logically-Sliced")
+    for _ in range(slice_push.ACK_RETRIES):
+        pusher.poll()
+    assert len(link.sent) == slice_push.ACK_RETRIES
+    assert not pusher.in_flight and not pusher.pending
+    assert pusher.dirty == {"01.00": 2}
+    # The next push sends it again
+    assert pusher.push(graph(2), "Logically-Sliced") == 1
+
+def test_revert_while_in_flight_stays_dirty():
+    link = Link()
+    pusher = SlicePusher(link)
+    pusher.mark("01.00", 2)
+    pusher.push(graph(2), "Logically-Sliced")
+    ack(pusher, link.sent[-1])
+    pusher.mark("01.00", 3)
+    pusher.push(graph(2), "Logically-Sliced")
+    in_flight = link.sent[-1]
+    pusher.mark("01.00", 2)  # back to the acknowledged slice while 3 is in flight
+    ack(pusher, in_flight)
+    assert pusher.acked == {"01.00": 3}
+    assert pusher.dirty == {"01.00": 2}
+    assert pusher.push(graph(2), "Logically-Sliced") == 1
+    ack(pusher, link.sent[-1])
+    assert pusher.acked == {"01.00": 2} and pusher.dirty == {}
+
+def test_ack_ignores_other_messages():
+    pusher = SlicePusher(Link())
+    assert not pusher.ack([1, 2])
+    assert not pusher.ack("SA")
+    assert not pusher.ack({'PTY': 'NB'})
+    assert pusher.ack({'PTY': 'SA', 'SEQ': 99})  # unknown SEQ, still an SA
+
+def test_full_push_fallback_without_SA(no_timeout):
+    link = Link()
+    pusher = SlicePusher(link)
+    G = graph(3)
+    G.add_edge("00.00", "01.00", LQI=90)
+    G.nodes["01.00"]['slice'] = 2
+    pusher.mark("01.00", 2)
+    pusher.push(G, "Physically-Sliced")
+    for _ in range(slice_push.ACK_RETRIES):
+        pusher.poll()
+    full = link.sent[-1]
+    assert pusher.protocol == "full"
+    assert full['sliceType'] == "Physically-Sliced"
+    assert {node['id']: node['slice'] for node in full['nodes']}["01.00"] == 2
+    assert full['links'] == [{"source": "00.00", "target": "01.00", "LQI": 90}]
+    assert pusher.dirty == {} and pusher.acked == {"01.00": 2}
+    # Later pushes are full pushes
+    pusher.mark("02.00", 3)
+    assert pusher.push(G, "Physically-Sliced") == 1
+    assert 'sliceType' in link.sent[-1]
@@ -0,0 +1,58 @@
+"""
+Tests of the snapshot persistence: a saved snapshot, from a graph or from a
+CompactTopology, restores the same graph (node attributes, regions, link
+metrics) and the same dashboard state (positions, pinned and dirty nodes).
+"""
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from compact_topology import CompactTopology
+from dashboard_core import DashboardCore
+from snapshot_store import load_snapshot, save_snapshot
+
+def topology():
+    G = nx.Graph()
+    G.add_node("00.00", desc="00.00", slice=1, n_class="Border Router", BID="00.00")
+    G.add_node("10.00", desc="BR 2", slice=1, n_class="Border Router", BID="10.00")
+    G.add_node("01.00", desc="01.00", slice="3", n_class="Node", BID="00.00", ENG=42.5)
+    G.add_node("02.00", desc="kitchen", slice=2, n_class="Node", BID="00.00")
+    G.add_node("11.00", desc="11.00", slice=2, n_class="Node", BID="10.00", ENG="low")
+    G.add_node("12.00", desc="12.00", slice=1, n_class="Node")
+    G.add_edge("00.00", "01.00", LQI=90, RSS=-60)
+    G.add_edge("01.00", "02.00", LQI=55)
+    G.add_edge("10.00", "11.00")
+    return G
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_round_trip(tmp_path, compact):
+    G = topology()
+    path = str(tmp_path / "snapshot.npz")
+    pos = {"00.00": (0.0, 0.0), "01.00": (0.5, -0.25), "02.00": (1.0, 1.0), "11.00": (-1.0, 0.5)}
+    save_snapshot(path, CompactTopology.from_graph(G) if compact else G, pos,
+                  pinned={"01.00"}, dirty={"01.00", "02.00"}, disconnected={"12.00"})
+
+    core = DashboardCore(snapshot_path=None)
+    updates = {}
+    core.restore_snapshot(load_snapshot(path), updates)
+    assert updates['positions']
+    assert dict(core.G.nodes(data=True)) == dict(G.nodes(data=True))
+    assert sorted(map(sorted, core.G.edges())) == sorted(map(sorted, G.edges()))
+    assert core.G.edges["00.00", "01.00"] == {'LQI': 90, 'RSS': -60}
+    assert core.G.edges["10.00", "11.00"] == {}
+    for node, xy in pos.items():
+        assert tuple(core.pos[node]) == xy
+    assert set(core.layout.pinned) == {"01.00"}
+    assert core.slice_pusher.dirty == {"01.00": "3", "02.00": 2}
+    assert core.codet_disconnected == {"12.00"}
+    # The regions of the border routers survive the restart
+    assert core.model.border_routers() == ["00.00", "10.00"]
+    assert core.model.regions() == {"00.00": "00.00", "10.00": "10.00", "01.00": "00.00", "02.00": "00.00",
+                                    "11.00": "10.00", "12.00": "00.00"}
+
+def test_missing_or_older_snapshot(tmp_path):
+    assert load_snapshot(str(tmp_path / "missing.npz")) is None
+    path = str(tmp_path / "snapshot.npz")
+    np.savez(path, version=np.array(1))
+    assert load_snapshot(path) is None
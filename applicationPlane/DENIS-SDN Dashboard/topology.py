@@ -0,0 +1,254 @@
+"""
+Topology messages
+Applies the JSON messages of the DENIS-SDN Controller and the border router to
+the dashboard graph in place. A message is either a full snapshot with 'nodes'
+and 'links' (sent at startup or on resync) or a single event:
+  BR - border router announcement          {"PTY":"BR","BID":"01.00"}
+  NN - new node                             {"PTY":"NN","BID":"01.00","NID":"02.00","ENG":"..."}
+  NB - neighbor report, adds/updates a link {"PTY":"NB","NID":..,"NBR":..,"BID":..,"RSS":..,"SSS":..,"LQI":..,"ENG":..}
+  MR - miss route, no topology change       {"PTY":"MR","NID":..,"DID":..}
+  UN - node update                          {"PTY":"UN","NID":..,"desc":..,"slice":..,"class":..}
+  RL - link removed                         {"PTY":"RL","NID":..,"NBR":..}
+  RN - node removed                         {"PTY":"RN","NID":..}
+All the changes go through an IncrementalCODET tracker, so the connectivity to
+the border routers is kept up to date with every message; every border router
+announced with BR is a target of the tracker. A malformed message is rejected
+by invalid_message before it changes anything. The BID of the NN and NB reports
+(and of the snapshot nodes) is kept as the BID attribute of the node, the
+region of the node in a network with several border routers.
+
+Author: Tryfon Theodorou
+Website: www.theodorou.edu.gr
+GitHub: tryfonthe
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# Link quality values of the NB packets
+LINK_METRICS = ('RSS', 'SSS', 'LQI')
+
+# The border routers of tN, a node or a list of nodes when there are several
+def border_routers(tN):
+    if isinstance(tN, (list, tuple, set, frozenset)):
+        return list(tN)
+    return [tN]
+
+# Empty record of the changes made by a message
+def new_changes():
+    return {
+        'snapshot': False,
+        'added_nodes': [],
+        'removed_nodes': [],
+        'updated_nodes': [],
+        'added_links': [],
+        'removed_links': [],
+        'updated_links': [],
+        'disconnected': [],
+        'reconnected': [],
+        'miss_routes': [],  # (NID, DID) of the MR reports, no topology change
+    }
+
+# True when a message changed the graph
+def has_changes(changes):
+    return changes['snapshot'] or any(changes[key] for key in
+        ('added_nodes', 'removed_nodes', 'updated_nodes', 'added_links', 'removed_links', 'updated_links'))
+
+# Fields of the events that name a node
+EVENT_NODES = {'BR': ('BID',), 'NN': ('NID',), 'NB': ('NID', 'NBR'), 'UN': ('NID',), 'RL': ('NID', 'NBR'),
+               'RN': ('NID',)}
+
+# A JSON value that can be a node ID, a BID or a slice
+def is_scalar(value):
+    return isinstance(value, (str, int, float))
+
+# Why a message cannot be applied, None when it can
+# Checked before the graph is changed, so a bad message never leaves it half updated
+def invalid_message(message):
+    if not isinstance(message, dict):
+        return "not a JSON object"
+    if 'nodes' in message and 'links' in message:
+        if not isinstance(message['nodes'], list) or not isinstance(message['links'], list):
+            return "nodes and links are not lists"
+        for node in message['nodes']:
+            if not isinstance(node, dict):
+                return "node is not a JSON object"
+            for key in ('id', 'slice', 'BID'):
+                if key in node and not is_scalar(node[key]):
+                    return "node " + key + " is not a value"
+        for link in message['links']:
+            if not isinstance(link, dict) or not is_scalar(link.get('source')) or not is_scalar(link.get('target')):
+                return "link without source and target"
+        return None
+    if 'PTY' in message:
+        if not is_scalar(message['PTY']):
+            return "PTY is not a value"
+        for key in EVENT_NODES.get(message['PTY'], ()):
+            if not is_scalar(message.get(key)):
+                return message['PTY'] + " without " + key
+        for key in ('BID', 'slice'):
+            if key in message and not is_scalar(message[key]):
+                return key + " is not a value"
+    return None
+
+# Node attributes of a snapshot node, with the defaults of the dashboard
+def node_attributes(node):
+    if 'id' in node:
+        node_id = node['id']
+    else:
+        print("JSON message contains node with no ID")
+        node_id = 0
+    if 'desc' in node:
+        node_desc = node['desc']
+    else:
+        node_desc = node_id
+    if 'slice' in node:
+        node_slice = node['slice']
+    else:
+        node_slice = 1
+    if 'class' in node:
+        node_class = node['class']
+    else:
+        node_class = "Node"
+    attr = {'desc': node_desc, 'slice': node_slice, 'n_class': node_class}
+    for key in ('BID', 'ENG'):
+        if key in node:
+            attr[key] = node[key]
+    return node_id, attr
+
+# Apply a snapshot or an event message, returns the changes
+def apply_topology_message(tracker, message):
+    if 'nodes' in message and 'links' in message:
+        return apply_snapshot(tracker, message)
+    if 'PTY' in message:
+        return apply_event(tracker, message)
+    print("Unknown JSON message:", message)
+    return new_changes()
+
+# Replace the whole graph with a snapshot
+def apply_snapshot(tracker, message):
+    G = tracker.G
+    changes = new_changes()
+    changes['snapshot'] = True
+
+    G.clear()
+    for node in message['nodes']:
+        node_id, attr = node_attributes(node)
+        G.add_node(node_id, **attr)
+    for link in message['links']:
+        G.add_edge(link['source'], link['target'], **{key: link[key] for key in LINK_METRICS if key in link})
+
+    # The border routers of the snapshot are targets before their BR announcement
+    tracker.targets.update(node for node, n_class in G.nodes(data='n_class') if n_class == "Border Router")
+    tracker.rebuild()
+    changes['added_nodes'] = list(G.nodes)
+    changes['added_links'] = list(G.edges)
+    changes['disconnected'] = tracker.disconnected()
+    return changes
+
+# Add a node announced by an event, with the default attributes
+def add_event_node(tracker, changes, node_id):
+    if node_id in tracker.G:
+        return
+    disconnected, reconnected = tracker.add_node(node_id, desc=node_id, slice=1, n_class="Node")
+    changes['added_nodes'].append(node_id)
+    changes['disconnected'] += disconnected
+    changes['reconnected'] += reconnected
+
+# The region of a node is the border router that reported it, a border router is its own region
+def tag_region(tracker, changes, message, node_id):
+    if 'BID' in message and node_id not in tracker.targets:
+        attr = tracker.G.nodes[node_id]
+        if attr.get('BID') != message['BID']:
+            attr['BID'] = message['BID']
+            if node_id not in changes['added_nodes']:
+                changes['updated_nodes'].append(node_id)
+
+# Apply a single event
+def apply_event(tracker, message):
+    G = tracker.G
+    changes = new_changes()
+    pty = message['PTY']
+
+    if pty == 'BR':
+        add_event_node(tracker, changes, message['BID'])
+        if G.nodes[message['BID']]['n_class'] == "Node":
+            G.nodes[message['BID']]['n_class'] = "Border Router"
+        G.nodes[message['BID']]['BID'] = message['BID']
+        changes['reconnected'] += tracker.add_target(message['BID'])
+
+    elif pty == 'NN':
+        add_event_node(tracker, changes, message['NID'])
+        tag_region(tracker, changes, message, message['NID'])
+        if 'ENG' in message:
+            G.nodes[message['NID']]['ENG'] = message['ENG']
+
+    elif pty == 'NB':
+        node_id = message['NID']
+        nbr_id = message['NBR']
+        add_event_node(tracker, changes, node_id)
+        add_event_node(tracker, changes, nbr_id)
+        tag_region(tracker, changes, message, node_id)
+        metrics = {key: message[key] for key in LINK_METRICS if key in message}
+        if G.has_edge(node_id, nbr_id):
+            if metrics:
+                G.edges[node_id, nbr_id].update(metrics)
+                changes['updated_links'].append((node_id, nbr_id))
+        else:
+            disconnected, reconnected = tracker.add_edge(node_id, nbr_id, **metrics)
+            changes['added_links'].append((node_id, nbr_id))
+            changes['disconnected'] += disconnected
+            changes['reconnected'] += reconnected
+        if 'ENG' in message:
+            G.nodes[node_id]['ENG'] = message['ENG']
+
+    elif pty == 'UN':
+        node_id = message['NID']
+        add_event_node(tracker, changes, node_id)
+        attr = G.nodes[node_id]
+        for key, name in (('desc', 'desc'), ('slice', 'slice'), ('class', 'n_class')):
+            if key in message:
+                attr[name] = message[key]
+        changes['updated_nodes'].append(node_id)
+
+    elif pty == 'RL':
+        node_id = message['NID']
+        nbr_id = message['NBR']
+        if G.has_edge(node_id, nbr_id):
+            disconnected, reconnected = tracker.remove_edge(node_id, nbr_id)
+            changes['removed_links'].append((node_id, nbr_id))
+            changes['disconnected'] += disconnected
+            changes['reconnected'] += reconnected
+
+    elif pty == 'RN':
+        node_id = message['NID']
+        if node_id in G:
+            links = [(node_id, n) for n in G.neighbors(node_id)]
+            disconnected, reconnected = tracker.remove_node(node_id)
+            changes['removed_nodes'].append(node_id)
+            changes['removed_links'] += links
+            changes['disconnected'] += disconnected
+            changes['reconnected'] += reconnected
+
+    elif pty == 'MR':
+        changes['miss_routes'].append((message.get('NID'), message.get('DID')))
+
+    else:
+        print("Unknown JSON message type:", pty)
+
+    # A node added and connected by the same message is not reported
+    disconnected = set(changes['disconnected'])
+    reconnected = set(changes['reconnected'])
+    changes['disconnected'] = [n for n in changes['disconnected'] if n not in reconnected]
+    changes['reconnected'] = [n for n in changes['reconnected'] if n not in disconnected]
+    return changes